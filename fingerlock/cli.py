@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 """FingerLock – Point d'entrée CLI"""
-import argparse, sys, os
+import argparse, sys, os, time
 from pathlib import Path
-import yaml
 
 BANNER = r"""
   ███████╗██╗███╗   ██╗ ██████╗ ███████╗██████╗     ██╗      ██████╗  ██████╗██╗  ██╗
@@ -24,9 +23,13 @@ def get_config_dir():
     return config_dir
 
 def load_user_config():
+    from fingerlock.utils.config_cache import load_yaml_cached
+
     config_file = get_config_dir() / "config.yaml"
 
     if not config_file.exists():
+        import yaml
+
         # Premier lancement : setup complet
         print(BANNER)
         print("  🎉 Bienvenue dans FingerLock !\n")
@@ -41,26 +44,88 @@ def load_user_config():
         print(f"  📁 Fichier : {config_file}\n")
         return config
 
-    with open(config_file, 'r') as f:
-        config = yaml.safe_load(f) or {}
+    # Instantané JSON tant que config.yaml n'a pas changé (yaml non importé)
+    config = load_yaml_cached(config_file)
 
     config.setdefault("lock_delay_seconds", 10)
     config.setdefault("platform_lock", "auto")
     config.setdefault("log_path", str(get_config_dir() / "fingerlock.log"))
+    config.setdefault("journal", False)
+    config.setdefault("log_max_bytes", 10 * 1024 * 1024)
+    config.setdefault("log_rotate_daily", True)
+    config.setdefault("log_backup_count", 10)
+    config.setdefault("log_compression", "gzip")
+    config.setdefault("gallery_path", str(get_config_dir() / "gallery.npz"))
     return config
 
 def cmd_start(args):
     from fingerlock.core.watch import run_watch
-    from fingerlock.utils.logger import setup_logger
+    from fingerlock.utils.logger import setup_logger_from_config
 
     config = load_user_config()
 
+    # Options CLI : prioritaires sur le fichier, rechargements compris
+    overrides = {}
     if hasattr(args, 'delay') and args.delay:
-        config["lock_delay_seconds"] = args.delay
+        overrides["lock_delay_seconds"] = args.delay
+    config.update(overrides)
+
+    if getattr(args, 'daemon', False):
+        from fingerlock.core.control import daemonize, ping
+        if ping():
+            print("\n  ⚠️  Un watcher est déjà actif (fingerlock status).\n")
+            return
+        print("\n  🚀 Surveillance lancée en arrière-plan")
+        print("  Contrôle : fingerlock status | lock | pause N | resume | reload | metrics | stop\n")
+        daemonize()
+    else:
+        print(BANNER)
+
+    setup_logger_from_config(config)
+    config_file = get_config_dir() / "config.yaml"
+    run_watch(config, config_loader=lambda: _reload_user_config(overrides), config_file=str(config_file))
+
+def _reload_user_config(overrides=None):
+    """Relecture pour le watcher : jamais d'assistant de premier lancement, options CLI réappliquées."""
+    if not (get_config_dir() / "config.yaml").exists():
+        raise FileNotFoundError("config.yaml introuvable")
+    config = load_user_config()
+    config.update(overrides or {})
+    return config
+
+def cmd_enroll(args):
+    """Enrôle un visage (présence caméra) : encodage en flux, arrêt à convergence."""
+    from fingerlock.face.enroll import run_enrollment
+
+    config = load_user_config()
+    print("\n  ── Enrôlement du visage ──\n")
+    print(f"  📸 {args.user} : regardez la caméra, bougez légèrement la tête.\n")
+
+    def progress(enrollment):
+        stats = enrollment.stats
+        stderr = f"{stats.stderr:.3f}" if stats is not None and stats.n > 1 else "—"
+        print(f"\r  📸 {enrollment.accepted} accepté(s), {sum(enrollment.rejected.values())} rejeté(s), "
+              f"erreur type {stderr}     ", end="", flush=True)
 
-    setup_logger(config["log_path"])
-    print(BANNER)
-    run_watch(config)
+    try:
+        report = run_enrollment(config, user=args.user, camera_id=args.camera,
+                                workers=args.workers, on_progress=progress)
+    except (ImportError, RuntimeError, ValueError, OSError) as e:
+        print(f"\n\n  ❌ Enrôlement impossible : {e}\n")
+        return
+    rejected = report["rejected"]
+    print(f"\n\n  {'✅' if 'path' in report else '❌'} Enrôlement {'terminé' if 'path' in report else 'incomplet'}"
+          f" ({report['stop_reason']}) en {report['elapsed_s']:.1f}s\n")
+    print(f"  🧮 Frames acceptées   : {report['accepted']} / {report['frames']} "
+          f"(aberrantes {rejected['outlier']}, plusieurs visages {rejected['multiple']}, "
+          f"sans visage {rejected['no_face']})")
+    print(f"  📐 Dispersion         : {report['dispersion']}  |  erreur type : {report['stderr']}")
+    print(f"  ⭐ Qualité            : {report['quality']}  ({report['workers']} encodeur(s))")
+    if "path" in report:
+        print(f"  📁 Galerie            : {report['path']}")
+    if "error" in report:
+        print(f"  ⚠️  {report['error']}")
+    print()
 
 def cmd_config(args):
     config_file = get_config_dir() / "config.yaml"
@@ -89,28 +154,204 @@ def cmd_reset(args):
         print("\n  ⚠️  Aucune configuration trouvée.\n")
 
 def cmd_status(args):
-    print(BANNER)
+    print()
+    # Page de statut partagée : instantané cohérent, sans aller-retour IPC
+    from fingerlock.core.statuspage import read_status
+    live = read_status()
     config = load_user_config()
+    if live and live["running"]:
+        return _print_live_status(live, config)
+
     print("  ── État du système ──\n")
     print(f"  ⏱️  Délai d'inactivité  : {config.get('lock_delay_seconds', 10)}s")
     print(f"  🔐 Schéma configuré    : {'✅ Oui' if config.get('pattern_hash') else '❌ Non'}")
     print(f"  🖥️  Plateforme de lock  : {config.get('platform_lock', 'auto')}")
     print(f"  📊 Fichier de logs     : {config.get('log_path', 'N/A')}")
+
+    from fingerlock.core.locker import resolve_backend
+    backend = resolve_backend() if config.get("platform_lock", "auto") == "auto" \
+        else resolve_backend(config["platform_lock"])
+    cmd = " ".join(backend["command"]) if backend["command"] else "❌ Aucun"
+    origin = "cache" if backend.get("cached") else "sondé"
+    verified = " ✅" if backend.get("verified") else ""
+    print(f"  🔒 Backend de lock     : {cmd}{verified}")
+    print(f"  🔎 Sondage backend     : {backend['probe_ms']:.2f} ms ({origin})")
+
+    print("\n  ── Surveillance ──\n")
+    print("  👁️  Watcher             : ⏹️  arrêté")
+    print()
+
+def _print_live_status(live, config):
+    """État publié par le watcher dans la page de statut (le socket n'est pas interrogé)."""
+    started = time.strftime("%H:%M:%S", time.localtime(live["started"]))
+    print("  ── État du système ──\n")
+    print(f"  ⏱️  Délai d'inactivité  : {live['lock_delay']:g}s")
+    print(f"  🔐 Schéma configuré    : {'✅ Oui' if config.get('pattern_hash') else '❌ Non'}")
+    print(f"  🖥️  Plateforme de lock  : {config.get('platform_lock', 'auto')}")
+    print(f"  📊 Fichier de logs     : {config.get('log_path') or 'N/A'}")
+    print("\n  ── Surveillance ──\n")
+    print(f"  👁️  Watcher             : ▶️  actif (pid {live['pid']}, depuis {started})")
+    if live["locked"]:
+        print("  🔒 État                : verrouillé")
+    elif live["paused_until"] > time.time():
+        until = time.strftime("%H:%M:%S", time.localtime(live["paused_until"]))
+        print(f"  ⏸️  État                : en pause jusqu'à {until}")
+    else:
+        if live["idle"] is not None:
+            print(f"  💤 Inactivité          : {live['idle']:.0f}s")
+        if live["remaining"] is not None:
+            print(f"  ⏳ Prochain verrouill. : dans {live['remaining']:.0f}s")
+    if live["presence"]:
+        print(f"  👀 Caméra de présence  : {'ouverte' if live['presence'] == 'on' else 'fermée'}")
+    print(f"  📈 Compteurs           : {live['event_count']} évts, {live['locks']} verrouillage(s), "
+          f"{live['unlocks']} déverrouillage(s), {live['failures']} échec(s)")
+    print()
+
+def _control(command):
+    """Envoie une commande au watcher ; retourne la réponse ou None."""
+    from fingerlock.core.control import ControlError, send_command
+    try:
+        return send_command(command)
+    except ControlError as e:
+        print(f"\n  ❌ {e}\n")
+    except OSError:
+        print("\n  ⚠️  Aucun watcher actif (fingerlock start --daemon).\n")
+    return None
+
+def cmd_lock(args):
+    if _control("lock") is not None:
+        print("\n  🔒 Verrouillage demandé\n")
+
+def cmd_pause(args):
+    reply = _control(f"pause {args.minutes}")
+    if reply is not None:
+        until = time.strftime("%H:%M:%S", time.localtime(reply["paused_until"]))
+        print(f"\n  ⏸️  Surveillance en pause jusqu'à {until}\n")
+
+def cmd_resume(args):
+    if _control("resume") is not None:
+        print("\n  ▶️  Surveillance reprise\n")
+
+def cmd_reload(args):
+    if _control("reload") is not None:
+        print("\n  🔄 Rechargement de la configuration demandé\n")
+
+def cmd_stop(args):
+    if _control("stop") is not None:
+        print("\n  🛑 Arrêt du watcher demandé\n")
+
+def cmd_trace(args):
+    """Exporte les traces de latence du watcher (Chrome trace-event JSON)."""
+    command = f"trace {os.path.abspath(args.output)}" if args.output else "trace"
+    reply = _control(command)
+    if reply is not None:
+        print(f"\n  🧭 {reply['events']} événement(s) exportés → {reply['path']}")
+        print("     Ouvrir dans chrome://tracing ou https://ui.perfetto.dev\n")
+
+def cmd_metrics(args):
+    reply = _control("metrics")
+    if reply is None:
+        return
+    if args.json:
+        import json
+        print(json.dumps(reply, indent=2, ensure_ascii=False))
+        return
+    print("\n  ── Métriques du watcher ──\n")
+    for key, val in reply.items():
+        print(f"      {key:<14} → {val}")
     print()
 
 def cmd_logs(args):
     config = load_user_config()
+    if args.since or args.until or args.category:
+        return _query_journal(args, config)
+
+    from fingerlock.utils.logger import follow_lines, read_recent_lines
+    from fingerlock.utils.rotation import list_segments
+
     log_file = Path(config.get("log_path", ""))
-    if not log_file.exists():
+    if not list_segments(str(log_file)):
         print("\n  ⚠️  Aucun fichier de logs trouvé.\n")
         return
-    with open(log_file, 'r') as f:
-        lines = f.readlines()
     n = args.lines if hasattr(args, 'lines') and args.lines else 30
-    recent = lines[-n:] if len(lines) > n else lines
+    recent = read_recent_lines(str(log_file), n)
     print(f"\n  ── Dernières {n} entrées ──\n")
     for line in recent:
         print(f"    {line.rstrip()}")
+    if getattr(args, 'follow', False):
+        try:
+            for line in follow_lines(str(log_file)):
+                print(f"    {line.rstrip()}", flush=True)
+        except KeyboardInterrupt:
+            pass
+    print()
+
+def _query_journal(args, config):
+    """Requête --since/--until/--category sur le journal structuré."""
+    from collections import deque
+    from fingerlock.utils.journal import default_journal_dir, format_event, parse_time, query
+
+    journal_dir = default_journal_dir(config["log_path"])
+    if not os.path.isdir(journal_dir):
+        print("\n  ⚠️  Aucun journal structuré trouvé.")
+        print("      Activez-le avec 'journal: true' (fingerlock config --edit).\n")
+        return
+
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        print(f"\n  ❌ {e}\n")
+        return
+
+    events = query(journal_dir, since=since, until=until, categories=args.category)
+    if args.lines:
+        events = deque(events, maxlen=args.lines)
+
+    count = 0
+    print("\n  ── Journal ──\n")
+    for event in events:
+        print(f"    {format_event(event)}")
+        count += 1
+    print(f"\n  {count} événement(s)\n")
+
+def cmd_report(args):
+    """Rapport d'activité sur les logs (segments tournés compris)"""
+    from fingerlock.utils.journal import parse_time
+    from fingerlock.utils.report import build_report, format_report
+
+    config = load_user_config()
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        print(f"\n  ❌ {e}\n")
+        return
+
+    report = build_report(config["log_path"], since=since, until=until)
+    if not args.json:
+        print()
+    print(format_report(report, as_json=args.json))
+
+def cmd_stats(args):
+    """Cartes de chaleur d'activité et d'inactivité (7 derniers jours)"""
+    from fingerlock.core.activity import ACTIVITY_FILE, ActivityHistogram, render_heatmap
+
+    if not ACTIVITY_FILE.exists():
+        print("\n  ⚠️  Aucune statistique d'activité (lancez 'fingerlock start').\n")
+        return
+
+    hist = ActivityHistogram.load()
+    data = hist.hourly(days=args.days)
+    totals = hist.totals()
+
+    print()
+    print(render_heatmap(data["activity"], data["days"], "Activité (événements / heure)"))
+    print()
+    print(render_heatmap(data["idle"], data["days"], "Inactivité (minutes / heure)", scale=60))
+    print("\n  ── Totaux (fenêtre de 7 jours) ──\n")
+    for name, total in totals.items():
+        print(f"    {name:<10} {total:>10} événements")
     print()
 
 def build_parser():
@@ -123,20 +364,58 @@ def build_parser():
     # start
     p_start = sub.add_parser("start", help="Démarrer la surveillance")
     p_start.add_argument("-d", "--delay", type=int, help="Délai en secondes")
+    p_start.add_argument("-D", "--daemon", action="store_true",
+                         help="Lancer en arrière-plan (socket de contrôle)")
 
     # config
     p_config = sub.add_parser("config", help="Voir/modifier la configuration")
     p_config.add_argument("--edit", action="store_true", help="Éditer le fichier")
 
+    # enroll
+    p_enroll = sub.add_parser("enroll", help="Enrôler un visage (présence caméra)")
+    p_enroll.add_argument("-u", "--user", default="owner", help="Nom de l'utilisateur (owner par défaut)")
+    p_enroll.add_argument("-c", "--camera", type=int, help="Index de la caméra")
+    p_enroll.add_argument("-w", "--workers", type=int, help="Processus d'encodage (1 = dans le pipeline)")
+
     # reset
     sub.add_parser("reset", help="Réinitialiser le schéma et la configuration")
 
     # status
     sub.add_parser("status", help="État du système")
 
+    # contrôle du watcher (socket)
+    sub.add_parser("lock", help="Verrouiller immédiatement")
+    p_pause = sub.add_parser("pause", help="Suspendre le verrouillage auto")
+    p_pause.add_argument("minutes", nargs="?", type=float, default=30,
+                         help="Durée en minutes (30 par défaut)")
+    sub.add_parser("resume", help="Reprendre la surveillance")
+    sub.add_parser("reload", help="Recharger la configuration du watcher")
+    sub.add_parser("stop", help="Arrêter le watcher")
+    p_trace = sub.add_parser("trace", help="Exporter les traces de latence (Chrome JSON)")
+    p_trace.add_argument("-o", "--output", help="Fichier de sortie")
+    p_metrics = sub.add_parser("metrics", help="Métriques du watcher")
+    p_metrics.add_argument("--json", action="store_true", help="Sortie JSON")
+
     # logs
     p_logs = sub.add_parser("logs", help="Afficher les logs")
     p_logs.add_argument("-n", "--lines", type=int, help="Nombre de lignes")
+    p_logs.add_argument("-f", "--follow", action="store_true",
+                        help="Suivre les nouvelles entrées (inotify)")
+    p_logs.add_argument("--since", help="Depuis (2025-06-15, 7d, 12h, today)")
+    p_logs.add_argument("--until", help="Jusqu'à (même format que --since)")
+    p_logs.add_argument("--category", action="append",
+                        help="Catégorie (LOCK, SYSTEM, ...) ; répétable")
+
+    # stats
+    p_stats = sub.add_parser("stats", help="Cartes de chaleur d'activité / inactivité")
+    p_stats.add_argument("--days", type=int, default=7, choices=range(1, 8),
+                         metavar="1-7", help="Nombre de jours affichés")
+
+    # report
+    p_report = sub.add_parser("report", help="Rapport d'activité (verrouillages, inactivité)")
+    p_report.add_argument("--since", help="Depuis (2025-06-15, 30d, today)")
+    p_report.add_argument("--until", help="Jusqu'à (même format que --since)")
+    p_report.add_argument("--json", action="store_true", help="Sortie JSON")
 
     return parser
 
@@ -148,14 +427,25 @@ def main():
         class DefaultArgs:
             command = "start"
             delay = None
+            daemon = False
         args = DefaultArgs()
 
     commands = {
         "start":  cmd_start,
         "config": cmd_config,
+        "enroll": cmd_enroll,
         "reset":  cmd_reset,
         "status": cmd_status,
         "logs":   cmd_logs,
+        "report": cmd_report,
+        "stats":  cmd_stats,
+        "lock":   cmd_lock,
+        "pause":  cmd_pause,
+        "resume": cmd_resume,
+        "reload": cmd_reload,
+        "stop":   cmd_stop,
+        "metrics": cmd_metrics,
+        "trace":  cmd_trace,
     }
     commands[args.command](args)
 
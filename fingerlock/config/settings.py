@@ -11,10 +11,16 @@ Clés supportées :
     recognition_threshold   float   Distance max pour un match (plus petit = plus strict)
     lock_delay_seconds      int     Délai avant verrouillage après absence détectée
     embedding_path          str     Chemin vers le fichier .npy des embeddings
+    gallery_path            str     Galerie multi-utilisateurs (.npz, ou .flq quantifiée), prioritaire sur embedding_path
+    ann_min_rows            int     Lignes de galerie à partir desquelles l'index IVF est utilisé (0 = jamais)
+    ann_nprobe              int     Listes IVF parcourues par requête (rappel vs vitesse)
     log_path                str     Chemin vers le fichier de logs
     platform_lock           str     Commande de lock : "auto" | "windows" | "macos" | "linux"
     mediapipe_confidence    float   Confiance min pour la détection MediaPipe (0–1)
-    capture_count           int     Nombre de frames captées lors de l'enrôlement
+    capture_count           int     Embeddings moyennés au plus lors de l'enrôlement
+    enroll_tolerance        float   Erreur type de la moyenne qui arrête l'enrôlement (convergence)
+    reverify_interval       float   Secondes avant de réencoder un visage suivi immobile
+    track_move_iou          float   IoU sous laquelle une boîte suivie est réencodée (0–1)
 """
 
 import os
@@ -34,10 +40,16 @@ DEFAULTS: Dict[str, Any] = {
     "recognition_threshold": 0.6,        # distance euclidienne max (face_recognition)
     "lock_delay_seconds": 5,             # secondes d'absence avant lock
     "embedding_path": os.path.join(PROJECT_ROOT, "data", "owner_embedding.npy"),
+    "gallery_path": os.path.join(PROJECT_ROOT, "data", "gallery.npz"),
+    "ann_min_rows": 20000,               # index approché au-delà (0 = recherche exacte)
+    "ann_nprobe": 8,
     "log_path": os.path.join(PROJECT_ROOT, "logs", "facelock.log"),
     "platform_lock": "auto",             # auto-détection du système
     "mediapipe_confidence": 0.5,         # seuil de détection MediaPipe
-    "capture_count": 30,                 # frames pour l'enrôlement
+    "capture_count": 30,                 # frames pour l'enrôlement (au plus)
+    "enroll_tolerance": 0.04,            # arrêt anticipé à convergence
+    "reverify_interval": 2.0,            # s entre deux encodages d'un visage suivi
+    "track_move_iou": 0.5,               # déplacement qui impose un réencodage
 }
 
 CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.yaml")
@@ -61,7 +73,7 @@ def load_config() -> Dict[str, Any]:
         config.update(user_cfg)
 
     # ── Résolution des chemins relatifs → absolus par rapport à PROJECT_ROOT ──
-    for path_key in ("embedding_path", "log_path"):
+    for path_key in ("embedding_path", "gallery_path", "log_path"):
         if path_key in config and not os.path.isabs(config[path_key]):
             config[path_key] = os.path.join(PROJECT_ROOT, config[path_key])
 
@@ -94,13 +106,19 @@ def _validate(cfg: Dict[str, Any]) -> None:
         raise ValueError("lock_delay_seconds doit être >= 1")
     if not (0.0 <= cfg["mediapipe_confidence"] <= 1.0):
         raise ValueError("mediapipe_confidence doit être entre 0.0 et 1.0")
+    if not (0.0 <= cfg["track_move_iou"] <= 1.0):
+        raise ValueError("track_move_iou doit être entre 0.0 et 1.0")
+    if cfg["enroll_tolerance"] <= 0:
+        raise ValueError("enroll_tolerance doit être > 0")
+    if cfg["reverify_interval"] <= 0:
+        raise ValueError("reverify_interval doit être > 0")
     if cfg["platform_lock"] not in ("auto", "windows", "macos", "linux"):
         raise ValueError("platform_lock : 'auto' | 'windows' | 'macos' | 'linux'")
 
 
 def _ensure_directories(cfg: Dict[str, Any]) -> None:
     """Crée les répertoires nécessaires s'ils n'existent pas."""
-    for path_key in ("embedding_path", "log_path"):
+    for path_key in ("embedding_path", "gallery_path", "log_path"):
         directory = os.path.dirname(cfg[path_key])
         if directory:
             os.makedirs(directory, exist_ok=True)
@@ -0,0 +1,163 @@
+"""
+core/activity.py
+----------------
+Histogramme d'activité à mémoire fixe (anneau de buckets par minute).
+
+Disposition :
+    SLOTS minutes (7 jours) × classes de périphériques (clavier, souris)
+    compteurs   array('I')   nb d'événements par (classe, minute)
+    minutes     array('q')   minute epoch occupant chaque slot
+
+Mise à jour en O(1) : le slot d'une minute est `minute % SLOTS` ; s'il
+contient une minute plus ancienne, il est remis à zéro avant d'être
+réutilisé. La mémoire reste bornée (~240 Ko) quel que soit le débit.
+
+Une minute présente dans `minutes` avec des compteurs nuls est une minute
+surveillée mais inactive (le watcher appelle tick() à chaque tour de boucle).
+
+Persistance : dump binaire brut (en-tête + tableaux) dans
+~/.fingerlock/activity.bin, remplacé atomiquement.
+"""
+
+import os
+import struct
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SLOTS   = 7 * 24 * 60
+CLASSES = ("keyboard", "mouse")
+
+ACTIVITY_FILE = Path.home() / ".fingerlock" / "activity.bin"
+
+_MAGIC  = b"FLAH"
+_HEADER = struct.Struct("<4sHII")   # magic, version, slots, classes
+_VERSION = 1
+
+
+class ActivityHistogram:
+    """Anneau de buckets par minute, par classe de périphérique."""
+
+    def __init__(self, slots: int = SLOTS, classes: Tuple[str, ...] = CLASSES):
+        self.slots = slots
+        self.classes = classes
+        self.minutes = array("q", [-1]) * slots
+        self.counts = array("I", [0]) * (slots * len(classes))
+        self._current = -1
+
+    # ── Mise à jour (chemin chaud) ──
+    def tick(self, ts: float) -> int:
+        """Marque la minute de `ts` comme surveillée ; retourne son slot."""
+        minute = int(ts // 60)
+        slot = minute % self.slots
+        if minute != self._current:
+            if self.minutes[slot] != minute:
+                self.minutes[slot] = minute
+                for c in range(len(self.classes)):
+                    self.counts[c * self.slots + slot] = 0
+            self._current = minute
+        return slot
+
+    def record(self, ts: float, cls: int, n: int = 1) -> None:
+        """Ajoute `n` événements de la classe d'indice `cls` à la minute de `ts`."""
+        slot = self.tick(ts)
+        i = cls * self.slots + slot
+        self.counts[i] = min(self.counts[i] + n, 0xFFFFFFFF)
+
+    # ── Lecture ──
+    def hourly(self, now: Optional[float] = None, days: int = 7) -> Dict[str, List[List[Optional[int]]]]:
+        """
+        Agrégats par (jour, heure) sur les `days` derniers jours.
+        Retourne {"activity": [[évts]*24]*days, "idle": [[min inactives]*24]*days,
+                  "watched": [[min surveillées]*24]*days, "days": [dates]}.
+        Les jours sont du plus ancien au plus récent.
+        """
+        now = time.time() if now is None else now
+        today = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        first_day = today.timestamp() - (days - 1) * 86400
+
+        activity = [[0] * 24 for _ in range(days)]
+        idle = [[0] * 24 for _ in range(days)]
+        watched = [[0] * 24 for _ in range(days)]
+
+        n_classes = len(self.classes)
+        for slot in range(self.slots):
+            minute = self.minutes[slot]
+            if minute < 0:
+                continue
+            ts = minute * 60
+            if ts < first_day or ts > now:
+                continue
+            when = datetime.fromtimestamp(ts)
+            d = (when.date() - datetime.fromtimestamp(first_day).date()).days
+            if not 0 <= d < days:
+                continue
+            total = sum(self.counts[c * self.slots + slot] for c in range(n_classes))
+            activity[d][when.hour] += total
+            watched[d][when.hour] += 1
+            if total == 0:
+                idle[d][when.hour] += 1
+
+        labels = [datetime.fromtimestamp(first_day + d * 86400).strftime("%a %d/%m") for d in range(days)]
+        return {"activity": activity, "idle": idle, "watched": watched, "days": labels}
+
+    def totals(self) -> Dict[str, int]:
+        """Total d'événements par classe sur toute la fenêtre."""
+        return {
+            name: sum(self.counts[c * self.slots:(c + 1) * self.slots])
+            for c, name in enumerate(self.classes)
+        }
+
+    # ── Persistance ──
+    def dump(self, path: Path = ACTIVITY_FILE) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.slots, len(self.classes)))
+            self.minutes.tofile(f)
+            self.counts.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = ACTIVITY_FILE) -> "ActivityHistogram":
+        """Charge le dump ; histogramme vide si absent, corrompu ou incompatible."""
+        hist = cls()
+        try:
+            with open(path, "rb") as f:
+                magic, version, slots, classes = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or version != _VERSION or slots != hist.slots \
+                        or classes != len(hist.classes):
+                    return hist
+                minutes = array("q")
+                counts = array("I")
+                minutes.fromfile(f, slots)
+                counts.fromfile(f, slots * classes)
+        except (OSError, EOFError, struct.error):
+            return hist
+        hist.minutes = minutes
+        hist.counts = counts
+        return hist
+
+
+# ---------------------------------------------------------------------------
+# Rendu terminal (`fingerlock stats`)
+# ---------------------------------------------------------------------------
+_SHADES = " ░▒▓█"
+
+
+def render_heatmap(grid: List[List[int]], labels: List[str], title: str,
+                   scale: Optional[int] = None) -> str:
+    """Carte de chaleur jours × heures en blocs Unicode."""
+    peak = scale or max((v for row in grid for v in row), default=0)
+    out = [f"  ── {title} ──\n", "              " + "".join(f"{h:<3}" for h in range(0, 24, 3)).rstrip()]
+    for label, row in zip(labels, grid):
+        cells = ""
+        for value in row:
+            level = 0 if not peak or not value else 1 + min(3, int(value / peak * 3.999))
+            cells += _SHADES[level]
+        out.append(f"    {label:<10}{cells}")
+    out.append(f"\n    {_SHADES[1]} faible  {_SHADES[4]} fort   (max : {peak})")
+    return "\n".join(out)
@@ -0,0 +1,182 @@
+"""
+core/control.py
+---------------
+Socket de contrôle Unix du watcher (mode démon) et client léger.
+
+Protocole ligne à ligne, une requête par connexion :
+
+    client  →  "<commande> [arguments]\\n"
+    serveur →  "OK <json>\\n"  |  "ERR <message>\\n"
+
+Commandes : ping, status, metrics, lock, pause <minutes>, resume, reload, stop.
+
+Le serveur tourne sur un thread dédié : `status` et `metrics` répondent
+même quand la boucle principale est bloquée par l'écran de verrouillage.
+Les commandes qui modifient l'état ne font que poser un drapeau que la
+boucle du watcher consomme au tour suivant.
+
+Ce module n'importe que la bibliothèque standard : le client (commandes
+CLI) n'entraîne ni yaml, ni evdev, ni tkinter.
+"""
+
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+SOCKET_PATH = Path.home() / ".fingerlock" / "control.sock"
+
+MAX_REQUEST = 1024
+MAX_REPLY   = 64 * 1024
+CLIENT_TIMEOUT = 2.0
+
+Handler = Callable[[list], Optional[Dict[str, Any]]]
+
+
+class ControlError(Exception):
+    """Réponse ERR du serveur."""
+
+
+# ---------------------------------------------------------------------------
+# Serveur (watcher)
+# ---------------------------------------------------------------------------
+class ControlServer(threading.Thread):
+    """
+    Thread d'écoute sur le socket de contrôle.
+
+    Args:
+        handlers: commande → fonction(args) retournant un dict (réponse OK).
+                  Une ValueError levée par le handler devient une réponse ERR.
+    """
+
+    def __init__(self, handlers: Dict[str, Handler], path: Path = SOCKET_PATH):
+        super().__init__(name="fingerlock-control", daemon=True)
+        self.handlers = handlers
+        self.path = Path(path)
+        self._closing = threading.Event()
+        self.sock = self._bind()
+
+    def run(self) -> None:
+        while not self._closing.is_set():
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with conn:
+                conn.settimeout(CLIENT_TIMEOUT)
+                try:
+                    conn.sendall(self._answer(_recv_line(conn, MAX_REQUEST)).encode())
+                except OSError:
+                    pass  # client parti avant la réponse
+
+    def close(self) -> None:
+        self._closing.set()
+        try:
+            self.sock.close()
+        finally:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def _answer(self, line: str) -> str:
+        parts = line.split()
+        if not parts:
+            return "ERR requête vide\n"
+        handler = self.handlers.get(parts[0].lower())
+        if handler is None:
+            return f"ERR commande inconnue : {parts[0]}\n"
+        try:
+            result = handler(parts[1:]) or {}
+        except ValueError as e:
+            return f"ERR {e}\n"
+        except Exception as e:
+            return f"ERR erreur interne : {e}\n"
+        return "OK " + json.dumps(result, ensure_ascii=False) + "\n"
+
+    def _bind(self) -> socket.socket:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if ping(self.path):
+                raise OSError(f"Un watcher écoute déjà sur {self.path}")
+            self.path.unlink()  # socket orphelin d'un watcher tué
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)     # socket accessible au seul propriétaire
+        try:
+            sock.bind(str(self.path))
+        finally:
+            os.umask(old_umask)
+        sock.listen(8)
+        sock.settimeout(0.5)            # permet de voir close() sans attendre un client
+        return sock
+
+
+# ---------------------------------------------------------------------------
+# Client (commandes CLI)
+# ---------------------------------------------------------------------------
+def send_command(command: str, path: Path = SOCKET_PATH,
+                 timeout: float = CLIENT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Envoie une commande au watcher et retourne la réponse décodée.
+    Lève OSError si aucun watcher n'écoute, ControlError sur réponse ERR.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        sock.sendall(command.encode() + b"\n")
+        reply = _recv_line(sock, MAX_REPLY)
+
+    status, _, payload = reply.partition(" ")
+    if status == "OK":
+        return json.loads(payload) if payload else {}
+    if status == "ERR":
+        raise ControlError(payload)
+    raise ControlError(f"réponse invalide : {reply!r}")
+
+
+def ping(path: Path = SOCKET_PATH) -> bool:
+    """True si un watcher répond sur le socket."""
+    try:
+        send_command("ping", path, timeout=0.5)
+        return True
+    except (OSError, ControlError, ValueError):
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Mode démon
+# ---------------------------------------------------------------------------
+def daemonize() -> None:
+    """
+    Détache le processus courant (double fork, setsid) ; seul le petit-fils
+    revient. stdin/stdout/stderr sont redirigés vers /dev/null : le démon
+    ne s'exprime que par les logs et le socket de contrôle.
+    """
+    if os.fork() > 0:
+        os._exit(0)
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+    os.chdir("/")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _recv_line(sock: socket.socket, limit: int) -> str:
+    data = b""
+    while b"\n" not in data and len(data) < limit:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data.split(b"\n", 1)[0].decode(errors="replace").strip()
@@ -0,0 +1,145 @@
+"""
+core/dbus_lock.py
+-----------------
+Backend de verrouillage D-Bus, sans lancement de processus.
+
+Au lieu de forker un outil externe (_LOCK_COMMANDS), le verrouillage est
+demandé directement sur une connexion D-Bus persistante, ouverte une seule
+fois au démarrage du watcher :
+
+| Bus     | Service                        | Méthode                                  |
+|---------|--------------------------------|------------------------------------------|
+| session | org.freedesktop.ScreenSaver    | org.freedesktop.ScreenSaver.Lock         |
+| system  | org.freedesktop.login1         | org.freedesktop.login1.Session.Lock      |
+
+La réponse D-Bus (method_return / error) donne un signal de succès fiable,
+contrairement aux codes retour des lockers externes.
+
+Dépendance optionnelle : jeepney (pure Python).
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+from fingerlock.utils.logger import log_error, log_system
+
+try:
+    from jeepney import DBusAddress, MessageType, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    DBUS_AVAILABLE = True
+except ImportError:
+    DBUS_AVAILABLE = False
+
+
+# ---------------------------------------------------------------------------
+# Cibles D-Bus
+# ---------------------------------------------------------------------------
+SCREENSAVER_NAME  = "org.freedesktop.ScreenSaver"
+SCREENSAVER_PATHS = ("/org/freedesktop/ScreenSaver", "/ScreenSaver")
+
+LOGIN1_NAME       = "org.freedesktop.login1"
+LOGIN1_MANAGER    = "/org/freedesktop/login1"
+LOGIN1_AUTO_PATH  = "/org/freedesktop/login1/session/auto"
+
+CALL_TIMEOUT = 2.0  # secondes
+
+
+class DBusLocker:
+    """
+    Verrouillage via D-Bus sur des connexions persistantes.
+
+    Args:
+        session_bus: "SESSION" ou adresse D-Bus explicite (bus privé de test).
+        system_bus:  "SYSTEM", adresse explicite, ou None pour ignorer login1.
+    """
+
+    def __init__(self, session_bus: Optional[str] = "SESSION",
+                 system_bus: Optional[str] = "SYSTEM"):
+        self.session_bus = session_bus
+        self.system_bus = system_bus
+        self._conns: Dict[str, object] = {}
+        # Les connexions bloquantes jeepney ne sont pas thread-safe
+        self._lock = threading.Lock()
+
+    # ── Cycle de vie ──
+    def open(self) -> bool:
+        """Ouvre les connexions. Retourne True si au moins un bus est joignable."""
+        if not DBUS_AVAILABLE:
+            return False
+        for key, bus in (("session", self.session_bus), ("system", self.system_bus)):
+            if bus is None or key in self._conns:
+                continue
+            try:
+                self._conns[key] = open_dbus_connection(bus=bus)
+            except Exception as e:
+                log_system(f"Bus D-Bus {key} indisponible : {e}")
+        return bool(self._conns)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._conns.values():
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._conns.clear()
+
+    @property
+    def connected(self) -> bool:
+        return bool(self._conns)
+
+    # ── Verrouillage ──
+    def lock(self) -> bool:
+        """
+        Demande le verrouillage de la session.
+        Retourne True uniquement si un service a répondu sans erreur.
+        """
+        with self._lock:
+            if "session" in self._conns:
+                for path in SCREENSAVER_PATHS:
+                    addr = DBusAddress(path, bus_name=SCREENSAVER_NAME,
+                                       interface=SCREENSAVER_NAME)
+                    if self._call("session", addr, "Lock"):
+                        return True
+
+            if "system" in self._conns:
+                for path in self._login1_session_paths():
+                    addr = DBusAddress(path, bus_name=LOGIN1_NAME,
+                                       interface="org.freedesktop.login1.Session")
+                    if self._call("system", addr, "Lock"):
+                        return True
+        return False
+
+    def describe(self) -> str:
+        buses = ", ".join(sorted(self._conns)) or "aucun bus"
+        return f"D-Bus ({buses})"
+
+    # ── Helpers ──
+    def _call(self, key: str, addr, method: str, signature: Optional[str] = None,
+              body: tuple = ()):
+        """Appel de méthode ; retourne le corps de la réponse, ou None si erreur."""
+        conn = self._conns[key]
+        try:
+            msg = new_method_call(addr, method, signature, body)
+            reply = conn.send_and_get_reply(msg, timeout=CALL_TIMEOUT)
+        except Exception as e:
+            log_error(f"Appel D-Bus {addr.interface}.{method} échoué : {e}")
+            return None
+        if reply.header.message_type == MessageType.error:
+            return None
+        # Un corps vide reste un succès
+        return reply.body if reply.body else (True,)
+
+    def _login1_session_paths(self) -> List[str]:
+        """Chemins login1 candidats pour la session courante."""
+        paths = []
+        session_id = os.environ.get("XDG_SESSION_ID")
+        if session_id:
+            manager = DBusAddress(LOGIN1_MANAGER, bus_name=LOGIN1_NAME,
+                                  interface="org.freedesktop.login1.Manager")
+            body = self._call("system", manager, "GetSession", "s", (session_id,))
+            if body and isinstance(body[0], str):
+                paths.append(body[0])
+        paths.append(LOGIN1_AUTO_PATH)
+        return paths
@@ -0,0 +1,271 @@
+"""
+core/hooks.py
+-------------
+Hooks de verrouillage / déverrouillage exécutés en arrière-plan.
+
+Déclaration dans config.yaml :
+
+    hooks:
+      lock:
+        - name: media
+          command: playerctl pause          # chaîne (shlex) ou liste
+          timeout: 5
+        - name: chat
+          entry_point: monpaquet.hooks:away # module:fonction
+      unlock:
+        - command: [playerctl, play]
+        - entry_point: vpn                  # entry point installé,
+                                            # groupe "fingerlock.hooks"
+    hooks_max_workers: 4        # taille du pool partagé
+    hooks_max_concurrent: 1     # exécutions simultanées max d'un même hook
+
+Les hooks sont résolus et les workers démarrés au lancement du watcher
+(import des entry points, découpage des commandes, threads). fire() ne
+fait ensuite qu'un put_nowait dans une file bornée : aucun hook ne
+s'exécute sur le chemin critique entre l'échéance d'inactivité et
+l'affichage de l'écran de verrouillage.
+
+Une commande reçoit FINGERLOCK_EVENT dans son environnement et est tuée
+à son timeout. Une fonction Python est appelée avec (event, context) ; un
+thread ne pouvant être interrompu, son dépassement est seulement signalé,
+et la limite de concurrence empêche l'accumulation.
+"""
+
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fingerlock.utils.logger import log_error, log_system
+from fingerlock.utils.values import config_int
+
+EVENTS = ("lock", "unlock")
+ENTRY_POINT_GROUP = "fingerlock.hooks"
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_CONCURRENT = 1
+
+
+class Hook:
+    """Un hook résolu : commande (liste argv) ou fonction Python."""
+
+    def __init__(self, event: str, name: str, timeout: float, max_concurrent: int,
+                 command: Optional[List[str]] = None,
+                 function: Optional[Callable[[str, Dict[str, Any]], Any]] = None):
+        self.event = event
+        self.name = name
+        self.timeout = timeout
+        self.command = command
+        self.function = function
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        # Plusieurs workers peuvent exécuter le même hook (max_concurrent > 1)
+        self.stats_lock = threading.Lock()
+        self.stats = {"runs": 0, "failures": 0, "timeouts": 0, "skipped": 0,
+                      "last_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0}
+
+    def run(self, context: Dict[str, Any]) -> Optional[str]:
+        """Exécute le hook ; retourne None si succès, sinon la cause d'échec."""
+        if self.command is not None:
+            env = dict(os.environ, FINGERLOCK_EVENT=self.event)
+            try:
+                result = subprocess.run(self.command, timeout=self.timeout, env=env,
+                                        stdin=subprocess.DEVNULL, capture_output=True)
+            except subprocess.TimeoutExpired:
+                return "timeout"
+            except OSError as e:
+                return str(e)
+            if result.returncode != 0:
+                err = result.stderr.decode(errors="replace").strip().splitlines()
+                return f"code {result.returncode}" + (f" : {err[-1]}" if err else "")
+            return None
+        self.function(self.event, context)
+        return None
+
+
+class HookRunner:
+    """Pool borné (threads démarrés d'avance + file bornée) partagé par tous les hooks."""
+
+    def __init__(self, hooks: Dict[str, List[Hook]], max_workers: int = DEFAULT_MAX_WORKERS):
+        self.hooks = hooks
+        total = sum(len(h) for h in hooks.values())
+        self.jobs: "queue.Queue[tuple]" = queue.Queue(maxsize=max(1, total) * 4)
+        self._closing = threading.Event()
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"fingerlock-hook-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def fire(self, event: str, **context: Any) -> int:
+        """
+        Planifie les hooks de `event` sans attendre ; retourne le nombre
+        de hooks soumis. Un hook déjà à sa limite de concurrence (ou une
+        file pleine) est ignoré.
+        """
+        hooks = self.hooks.get(event)
+        if not hooks:
+            return 0
+        context.setdefault("event", event)
+        context.setdefault("ts", time.time())
+        submitted = 0
+        for hook in hooks:
+            if not hook.slots.acquire(blocking=False):
+                with hook.stats_lock:
+                    hook.stats["skipped"] += 1
+                continue
+            try:
+                self.jobs.put_nowait((hook, context))
+            except queue.Full:
+                hook.slots.release()
+                with hook.stats_lock:
+                    hook.stats["skipped"] += 1
+                continue
+            submitted += 1
+        return submitted
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        metrics = {}
+        for hooks in self.hooks.values():
+            for hook in hooks:
+                with hook.stats_lock:
+                    stats = dict(hook.stats)
+                metrics[f"{hook.event}/{hook.name}"] = {k: round(v, 3) if isinstance(v, float) else v
+                                                        for k, v in stats.items()}
+        return metrics
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Arrête les workers après les hooks déjà en file (sans jamais bloquer si wait=False)."""
+        self._closing.set()
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+    def _worker(self) -> None:
+        while True:
+            try:
+                job = self.jobs.get(timeout=0.5)
+            except queue.Empty:
+                if self._closing.is_set():
+                    return
+                continue
+            self._execute(*job)
+
+    def _execute(self, hook: Hook, context: Dict[str, Any]) -> None:
+        start = time.monotonic()
+        try:
+            error = hook.run(context)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            hook.slots.release()
+        ms = (time.monotonic() - start) * 1000
+
+        if error is None and hook.command is None and ms > hook.timeout * 1000:
+            error = "timeout"   # fonction Python : dépassement constaté a posteriori
+
+        with hook.stats_lock:
+            stats = hook.stats
+            stats["runs"] += 1
+            stats["last_ms"] = ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["total_ms"] += ms
+            if error is not None:
+                stats["timeouts" if error == "timeout" else "failures"] += 1
+
+        label = f"Hook {hook.event}/{hook.name}"
+        if error is None:
+            log_system(f"{label} terminé en {ms:.0f} ms", hook=hook.name, hook_event=hook.event, ms=round(ms, 3))
+            return
+        log_error(f"{label} en échec après {ms:.0f} ms : {error}",
+                  hook=hook.name, hook_event=hook.event, ms=round(ms, 3), error=error)
+
+
+# ---------------------------------------------------------------------------
+# Construction depuis la config
+# ---------------------------------------------------------------------------
+def hooks_from_config(config: Dict[str, Any]) -> Optional[HookRunner]:
+    """
+    HookRunner pour la section `hooks` de la config (None si aucun hook).
+    Lève ValueError si une déclaration est invalide ou un entry point
+    introuvable : à appeler au démarrage / rechargement, jamais au verrouillage.
+    """
+    section = config.get("hooks") or {}
+    if not isinstance(section, dict):
+        raise ValueError("hooks doit être un dictionnaire {lock: [...], unlock: [...]}")
+    unknown = set(section) - set(EVENTS)
+    if unknown:
+        raise ValueError(f"événements de hooks inconnus : {', '.join(sorted(unknown))}")
+
+    max_concurrent = config_int(config, "hooks_max_concurrent", DEFAULT_MAX_CONCURRENT)
+    hooks: Dict[str, List[Hook]] = {}
+    for event in EVENTS:
+        entries = section.get(event) or []
+        if not isinstance(entries, list):
+            raise ValueError(f"hooks.{event} doit être une liste")
+        hooks[event] = [_build_hook(event, i, entry, max_concurrent) for i, entry in enumerate(entries)]
+
+    if not any(hooks.values()):
+        return None
+    return HookRunner(hooks, config_int(config, "hooks_max_workers", DEFAULT_MAX_WORKERS))
+
+
+def _build_hook(event: str, index: int, entry: Any, max_concurrent: int) -> Hook:
+    where = f"hooks.{event}[{index}]"
+    if not isinstance(entry, dict):
+        raise ValueError(f"{where} : dictionnaire attendu (command ou entry_point)")
+    if ("command" in entry) == ("entry_point" in entry):
+        raise ValueError(f"{where} : exactement une clé parmi command / entry_point")
+
+    timeout = entry.get("timeout", DEFAULT_TIMEOUT)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ValueError(f"{where} : timeout doit être un nombre > 0")
+    concurrent = entry.get("max_concurrent", max_concurrent)
+    if isinstance(concurrent, bool) or not isinstance(concurrent, int) or concurrent < 1:
+        raise ValueError(f"{where} : max_concurrent doit être un entier >= 1")
+
+    if "command" in entry:
+        command = entry["command"]
+        argv = shlex.split(command) if isinstance(command, str) else command
+        if not argv or not all(isinstance(a, str) for a in argv):
+            raise ValueError(f"{where} : command doit être une chaîne ou une liste de chaînes")
+        name = entry.get("name") or os.path.basename(argv[0])
+        return Hook(event, str(name), float(timeout), concurrent, command=list(argv))
+
+    spec = entry["entry_point"]
+    if not isinstance(spec, str) or not spec:
+        raise ValueError(f"{where} : entry_point doit être 'module:fonction' ou un nom")
+    function = _load_entry_point(spec, where)
+    name = entry.get("name") or spec
+    return Hook(event, str(name), float(timeout), concurrent, function=function)
+
+
+def _load_entry_point(spec: str, where: str) -> Callable:
+    from importlib import import_module
+
+    if ":" in spec:
+        module_name, _, attr = spec.partition(":")
+        try:
+            target = import_module(module_name)
+            for part in attr.split("."):
+                target = getattr(target, part)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"{where} : {spec} introuvable ({e})")
+    else:
+        from importlib.metadata import entry_points
+        try:
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:   # Python < 3.10
+            found = entry_points().get(ENTRY_POINT_GROUP, [])
+        matches = [ep for ep in found if ep.name == spec]
+        if not matches:
+            raise ValueError(f"{where} : aucun entry point '{spec}' dans le groupe {ENTRY_POINT_GROUP}")
+        target = matches[0].load()
+
+    if not callable(target):
+        raise ValueError(f"{where} : {spec} n'est pas appelable")
+    return target
@@ -0,0 +1,115 @@
+"""
+core/hotreload.py
+-----------------
+Rechargement à chaud de ~/.fingerlock/config.yaml dans le watcher.
+
+ConfigWatcher surveille le répertoire de configuration avec inotify
+(écritures en place comme `nano`, ou remplacement par rename comme `vim`)
+et signale chaque modification, après une courte fenêtre d'anti-rebond.
+Sans inotify, repli sur un polling du mtime.
+
+Le watcher relit alors le fichier, le valide (validate_config) puis
+applique le nouvel état d'un bloc entre deux tours de boucle : un fichier
+invalide est rejeté et la surveillance continue avec l'ancienne config.
+"""
+
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from fingerlock.utils import inotify
+
+DEBOUNCE = 0.1        # s sans nouvel événement avant de signaler
+POLL_INTERVAL = 1.0   # s, repli sans inotify
+
+PLATFORMS = ("auto", "windows", "macos", "linux")
+COMPRESSIONS = ("gzip", "zstd", "none")
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def validate_config(config: Dict[str, Any]) -> None:
+    """Lève ValueError si la config ne peut pas être appliquée telle quelle."""
+    delay = config.get("lock_delay_seconds")
+    if isinstance(delay, bool) or not isinstance(delay, int) or not 1 <= delay <= 86400:
+        raise ValueError("lock_delay_seconds doit être un entier entre 1 et 86400")
+    pattern = config.get("pattern_hash")
+    if not isinstance(pattern, str) or not _SHA256_RE.match(pattern):
+        raise ValueError("pattern_hash doit être un SHA-256 hexadécimal")
+    if config.get("platform_lock", "auto") not in PLATFORMS:
+        raise ValueError(f"platform_lock : {' | '.join(PLATFORMS)}")
+    if not isinstance(config.get("system_lock", False), bool):
+        raise ValueError("system_lock doit être true ou false")
+    budget = config.get("system_lock_budget", 2.0)
+    if isinstance(budget, bool) or not isinstance(budget, (int, float)) or budget <= 0:
+        raise ValueError("system_lock_budget doit être un nombre de secondes > 0")
+    log_path = config.get("log_path")
+    if not isinstance(log_path, str) or not log_path:
+        raise ValueError("log_path doit être un chemin de fichier")
+    if config.get("log_compression", "gzip") not in COMPRESSIONS:
+        raise ValueError(f"log_compression : {' | '.join(COMPRESSIONS)}")
+    for key in ("log_max_bytes", "log_backup_count", "log_retention_days"):
+        value = config.get(key, 0)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError(f"{key} doit être un entier positif")
+
+
+class ConfigWatcher(threading.Thread):
+    """
+    Thread qui appelle `on_change(t)` à chaque modification de `config_file`,
+    `t` étant l'instant (time.monotonic) du premier événement de la rafale.
+    """
+
+    def __init__(self, config_file: Path, on_change: Callable[[float], None]):
+        super().__init__(name="fingerlock-config-watch", daemon=True)
+        self.config_file = Path(config_file)
+        self.on_change = on_change
+        self._closing = threading.Event()
+
+    def run(self) -> None:
+        if inotify.INOTIFY_AVAILABLE:
+            try:
+                self._run_inotify()
+                return
+            except OSError:
+                pass
+        self._run_polling()
+
+    def close(self) -> None:
+        self._closing.set()
+
+    def _run_inotify(self) -> None:
+        mask = inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO | inotify.IN_CREATE
+        name = self.config_file.name
+        with inotify.Inotify() as ino:
+            ino.add_watch(str(self.config_file.parent), mask)
+            while not self._closing.is_set():
+                events = ino.read(timeout=0.5)
+                if not any(ev.name == name for ev in events):
+                    continue
+                first = time.monotonic()
+                # Anti-rebond : un éditeur émet souvent plusieurs événements
+                while any(ev.name == name for ev in ino.read(timeout=DEBOUNCE)):
+                    pass
+                if self.config_file.exists():
+                    self.on_change(first)
+
+    def _run_polling(self) -> None:
+        last = _mtime(self.config_file)
+        while not self._closing.wait(POLL_INTERVAL):
+            current = _mtime(self.config_file)
+            if current != last:
+                last = current
+                if current is not None:
+                    self.on_change(time.monotonic())
+
+
+def _mtime(path: Path):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
@@ -13,15 +13,46 @@ de la commande de verrouillage appropriée.
 | Linux      | xdg-open ou screenlock / xlock / gnome-screensaver-activate |
 
 Pour Linux, plusieurs backends sont testés dans l'ordre de priorité.
+
+Backend D-Bus (Linux) :
+    enable_dbus_backend() ouvre une connexion D-Bus persistante (au démarrage
+    du watcher, si system_lock est activé) ; les verrouillages passent alors
+    par ScreenSaver.Lock / login1 Session.Lock, sans fork/exec. Les commandes
+    restent en repli.
+
+Dispatch non bloquant :
+    LockDispatcher exécute les backends dans un petit pool de workers et
+    retourne un Future ; l'appelant n'attend jamais plus que son budget.
+    Avec system_lock, le watcher verrouille la session par get_dispatcher().lock()
+    avant d'afficher l'écran FingerLock (system_lock_budget).
+
+Sondage des backends :
+    Les backends disponibles sont sondés une seule fois (shutil.which +
+    indices d'environnement XDG_CURRENT_DESKTOP / WAYLAND_DISPLAY) et le
+    gagnant est mémorisé dans ~/.fingerlock/lock_backend.json.
+    Le cache est invalidé dès que la session graphique change, si bien
+    qu'un verrouillage ne coûte normalement qu'un seul lancement de processus.
 """
 
+import hashlib
+import json
+import os
+import shutil
 import subprocess
 import platform
 import sys
-from typing import Optional
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 from fingerlock.utils.logger import log_lock, log_error
 
+if TYPE_CHECKING:
+    # Annotations seulement : concurrent.futures n'est chargé qu'au premier dispatch
+    from concurrent.futures import Future
+
 
 # ---------------------------------------------------------------------------
 # Commandes par plateforme
@@ -56,6 +87,41 @@ _LOCK_COMMANDS = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Indices d'environnement : bureau détecté → exécutables à privilégier
+# ---------------------------------------------------------------------------
+_DESKTOP_HINTS = {
+    "gnome":    ["gnome-screensaver-command"],
+    "unity":    ["gnome-screensaver-command"],
+    "kde":      ["kde-open5"],
+    "sway":     ["swaylock"],
+    "hyprland": ["hyprlock"],
+    "i3":       ["i3lock"],
+}
+
+# Backends qui ne fonctionnent que sous Wayland / que sous X11
+_WAYLAND_ONLY = {"swaylock", "hyprlock"}
+_X11_ONLY     = {"xscreensaver-command", "i3lock", "xlock"}
+
+# Variables qui identifient la session graphique (empreinte du cache)
+_SESSION_VARS = (
+    "XDG_CURRENT_DESKTOP",
+    "XDG_SESSION_TYPE",
+    "XDG_SESSION_ID",
+    "WAYLAND_DISPLAY",
+    "DISPLAY",
+    "SWAYSOCK",
+    "HYPRLAND_INSTANCE_SIGNATURE",
+)
+
+_CACHE_FILE = Path.home() / ".fingerlock" / "lock_backend.json"
+
+# Backend D-Bus persistant (voir enable_dbus_backend). _dbus_guard sérialise
+# la bascule (enable / disable, rechargement à chaud) et les verrouillages
+_dbus_locker = None
+_dbus_guard = threading.Lock()
+
+
 # ---------------------------------------------------------------------------
 # API publique
 # ---------------------------------------------------------------------------
@@ -64,6 +130,10 @@ def lock_system(platform_override: str = "auto") -> bool:
     Verrouille le système.
     Retourne True si la commande a été lancée avec succès.
 
+    Le backend mémorisé est essayé en premier ; si tous les backends
+    mémorisés échouent, ils sont sondés de nouveau. Le gagnant est
+    persisté pour les verrouillages suivants.
+
     Args:
         platform_override: "auto" | "windows" | "macos" | "linux"
     """
@@ -76,8 +146,15 @@ def lock_system(platform_override: str = "auto") -> bool:
 
     log_lock(f"Tentative de verrouillage – plateforme={os_name}")
 
-    for cmd in _LOCK_COMMANDS[os_name]:
+    if os_name == "linux":
+        ok, backend = _try_dbus_lock()
+        if ok:
+            print(f"  🔒  Système verrouillé. Backend : {backend}")
+            return True
+
+    for backend, cmd in _lock_order(os_name):
         if _try_lock(cmd):
+            _remember_winner(backend, cmd)
             log_lock(f"Verrouillage réussi avec : {' '.join(cmd)}")
             print(f"  🔒  Système verrouillé. Commande : {' '.join(cmd)}")
             return True
@@ -101,9 +178,354 @@ def get_lock_info() -> str:
     return f"Inconnu ({system})"
 
 
+class LockDispatcher:
+    """
+    Dispatcher de verrouillage non bloquant.
+
+    Les tentatives sont exécutées dans un pool de workers ; submit() retourne
+    immédiatement un Future dont le résultat est un dict :
+        success      bool        True si un backend a verrouillé
+        command      list|None   Backend gagnant
+        latencies    dict        Latence (ms) par backend essayé
+        elapsed_ms   float       Durée totale du dispatch
+
+    Args:
+        race:            nombre de backends lancés en parallèle (1 = séquentiel).
+                         Le premier succès l'emporte.
+        budget:          attente max (s) de lock() côté appelant.
+        command_timeout: timeout (s) de chaque commande de verrouillage.
+        max_workers:     taille du pool de tentatives.
+    """
+
+    def __init__(self, race: int = 1, budget: float = 2.0,
+                 command_timeout: float = 5.0, max_workers: int = 3):
+        self.race = max(1, race)
+        self.budget = budget
+        self.command_timeout = command_timeout
+        # concurrent.futures chargé ici : `fingerlock status` n'en a pas besoin
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Un seul coordinateur : les demandes de verrouillage sont sérialisées
+        self._coordinator = ThreadPoolExecutor(1, thread_name_prefix="fingerlock-dispatch")
+        self._attempts = ThreadPoolExecutor(max(max_workers, self.race),
+                                            thread_name_prefix="fingerlock-lock")
+
+    def submit(self, platform_override: str = "auto") -> "Future[Dict[str, Any]]":
+        """Planifie un verrouillage et retourne immédiatement son Future."""
+        return self._coordinator.submit(self._dispatch, _resolve_platform(platform_override))
+
+    def lock(self, platform_override: str = "auto",
+             budget: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Verrouille en attendant au plus `budget` secondes.
+        Retourne le résultat du dispatch, ou None si le budget est dépassé
+        (la tentative continue alors en arrière-plan).
+        """
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        budget = self.budget if budget is None else budget
+        future = self.submit(platform_override)
+        try:
+            return future.result(timeout=budget)
+        except FutureTimeout:
+            log_lock(f"Verrouillage toujours en cours après {budget}s – l'appelant reprend la main")
+            return None
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._coordinator.shutdown(wait=wait)
+        self._attempts.shutdown(wait=wait)
+
+    def _dispatch(self, os_name: str) -> Dict[str, Any]:
+        from concurrent.futures import as_completed
+
+        start = time.perf_counter()
+        latencies: Dict[str, float] = {}
+
+        def result(success: bool, cmd: Optional[list]) -> Dict[str, Any]:
+            return {
+                "success":    success,
+                "command":    cmd,
+                "latencies":  dict(latencies),
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+            }
+
+        if os_name not in _LOCK_COMMANDS:
+            log_error(f"Plateforme non supportée : {os_name}")
+            return result(False, None)
+
+        log_lock(f"Tentative de verrouillage (dispatch) – plateforme={os_name}, race={self.race}")
+        if os_name == "linux":
+            dbus_start = time.perf_counter()
+            ok, _ = _try_dbus_lock()
+            if ok is not None:
+                latencies["dbus"] = round((time.perf_counter() - dbus_start) * 1000, 3)
+            if ok:
+                return result(True, ["dbus"])
+
+        order = _lock_order(os_name)
+
+        while True:
+            batch = list(islice(order, self.race))
+            if not batch:
+                break
+            futures = {
+                self._attempts.submit(_timed_try_lock, cmd, self.command_timeout): (backend, cmd)
+                for backend, cmd in batch
+            }
+            for future in as_completed(futures):
+                backend, cmd = futures[future]
+                ok, ms = future.result()
+                latencies[" ".join(cmd)] = ms
+                if ok:
+                    _remember_winner(backend, cmd)
+                    timings = ", ".join(f"{k}={v:.1f}ms" for k, v in latencies.items())
+                    log_lock(f"Verrouillage réussi avec : {' '.join(cmd)} ({timings})")
+                    return result(True, cmd)
+
+        log_error("Aucune commande de verrouillage ne fonctionnait sur cette plateforme.")
+        return result(False, None)
+
+
+_dispatcher: Optional[LockDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher(**kwargs: Any) -> LockDispatcher:
+    """Retourne le dispatcher partagé (créé au premier appel avec kwargs)."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = LockDispatcher(**kwargs)
+        return _dispatcher
+
+
+def lock_system_async(platform_override: str = "auto") -> "Future[Dict[str, Any]]":
+    """Version non bloquante de lock_system() : retourne un Future."""
+    return get_dispatcher().submit(platform_override)
+
+
+def enable_dbus_backend(session_bus: Optional[str] = "SESSION",
+                        system_bus: Optional[str] = "SYSTEM",
+                        platform_override: str = "auto") -> bool:
+    """
+    Ouvre une connexion D-Bus persistante pour verrouiller sans processus.
+    À appeler une fois au démarrage du watcher.
+    Retourne False hors Linux, si jeepney est absent ou si aucun bus n'est joignable.
+    """
+    if _resolve_platform(platform_override) != "linux":
+        return False
+    from fingerlock.core.dbus_lock import DBusLocker
+
+    # Ouverture hors du verrou : un verrouillage en cours n'attend pas les bus
+    locker = DBusLocker(session_bus=session_bus, system_bus=system_bus)
+    if not locker.open():
+        disable_dbus_backend()
+        return False
+    _swap_dbus_locker(locker)
+    log_lock(f"Backend de verrouillage en process : {locker.describe()}")
+    return True
+
+
+def disable_dbus_backend() -> None:
+    """Ferme la connexion D-Bus persistante."""
+    _swap_dbus_locker(None)
+
+
+def resolve_backend(os_name: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Retourne le backend de verrouillage pour la session courante.
+
+    Le résultat provient du cache ~/.fingerlock/lock_backend.json tant que
+    l'empreinte de session est inchangée ; sinon (ou si refresh=True) les
+    backends sont sondés puis le résultat est persisté.
+
+    Dict retourné :
+        platform     str         Plateforme résolue
+        session      str         Empreinte de la session graphique
+        command      list|None   Backend choisi (None si aucun disponible)
+        candidates   list        Backends disponibles, par ordre de priorité
+        probe_ms     float       Durée du sondage (ms)
+        verified     bool        True si le backend a déjà verrouillé avec succès
+        cached       bool        True si le résultat vient du cache
+    """
+    os_name = os_name or _resolve_platform("auto")
+    session = _session_fingerprint(os_name)
+
+    if not refresh:
+        cached = _load_cache()
+        if cached and cached.get("session") == session and cached.get("platform") == os_name:
+            cached["cached"] = True
+            return cached
+
+    start = time.perf_counter()
+    candidates = probe_backends(os_name)
+    probe_ms = (time.perf_counter() - start) * 1000
+
+    backend = {
+        "platform":   os_name,
+        "session":    session,
+        "command":    candidates[0] if candidates else None,
+        "candidates": candidates,
+        "probe_ms":   round(probe_ms, 3),
+        "verified":   False,
+        "probed_at":  time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _save_cache(backend)
+    backend["cached"] = False
+    return backend
+
+
+def probe_backends(os_name: str, env: Optional[Dict[str, str]] = None) -> List[list]:
+    """
+    Sonde les backends de verrouillage disponibles, sans lancer de processus.
+
+    Seuls les exécutables présents dans le PATH (shutil.which) sont retenus.
+    Sous Linux, l'ordre est ajusté selon le bureau (XDG_CURRENT_DESKTOP)
+    et le type de session (WAYLAND_DISPLAY) : les lockers propres au bureau
+    passent en tête, ceux incompatibles avec la session sont écartés.
+    """
+    env = os.environ if env is None else env
+    commands = [cmd for cmd in _LOCK_COMMANDS.get(os_name, []) if shutil.which(cmd[0])]
+
+    if os_name != "linux":
+        return commands
+
+    desktops = [d.strip().lower() for d in env.get("XDG_CURRENT_DESKTOP", "").split(":") if d.strip()]
+    wayland = bool(env.get("WAYLAND_DISPLAY")) or env.get("XDG_SESSION_TYPE") == "wayland"
+    x11 = bool(env.get("DISPLAY"))
+
+    preferred = []
+    for desktop in desktops:
+        for key, names in _DESKTOP_HINTS.items():
+            if key in desktop:
+                preferred.extend(names)
+    if env.get("SWAYSOCK"):
+        preferred.append("swaylock")
+    if env.get("HYPRLAND_INSTANCE_SIGNATURE"):
+        preferred.append("hyprlock")
+
+    def usable(cmd: list) -> bool:
+        name = cmd[0]
+        if name in preferred:
+            return True
+        if wayland and name in _X11_ONLY and not x11:
+            return False
+        if not wayland and name in _WAYLAND_ONLY:
+            return False
+        return True
+
+    def rank(cmd: list) -> int:
+        name = cmd[0]
+        if name in preferred:
+            return preferred.index(name)
+        # Sous Wayland, les lockers natifs passent avant ceux de XWayland
+        if wayland and name in _WAYLAND_ONLY:
+            return len(preferred)
+        return len(preferred) + 1
+
+    # sorted() est stable : l'ordre de _LOCK_COMMANDS départage les égalités
+    return sorted((cmd for cmd in commands if usable(cmd)), key=rank)
+
+
+def invalidate_backend_cache() -> None:
+    """Supprime le backend mémorisé (prochain verrouillage = nouveau sondage)."""
+    try:
+        _CACHE_FILE.unlink()
+    except FileNotFoundError:
+        pass
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
+def _swap_dbus_locker(locker) -> None:
+    """Remplace le backend D-Bus ; l'ancien est fermé hors de tout verrouillage en cours."""
+    global _dbus_locker
+    with _dbus_guard:
+        old, _dbus_locker = _dbus_locker, locker
+        if old is not None:
+            old.close()
+
+
+def _try_dbus_lock() -> Tuple[Optional[bool], str]:
+    """
+    Verrouille via la connexion D-Bus persistante, si elle est ouverte.
+    Retourne (None, "") sans connexion, sinon (succès, description du backend).
+    """
+    with _dbus_guard:
+        locker = _dbus_locker
+        if locker is None:
+            return None, ""
+        ok, backend = locker.lock(), locker.describe()
+    if ok:
+        log_lock(f"Verrouillage réussi avec : {backend}")
+    else:
+        log_lock("Verrouillage D-Bus refusé – repli sur les commandes")
+    return ok, backend
+
+
+def _lock_order(os_name: str) -> Iterator[Tuple[Dict[str, Any], list]]:
+    """
+    Produit les (backend, commande) à essayer, dans l'ordre.
+
+    Le backend mémorisé vient en premier, puis les autres candidats sondés.
+    Si l'appelant les épuise tous alors qu'ils venaient du cache, celui-ci
+    est peut-être périmé : les backends sont sondés de nouveau.
+    """
+    backend = resolve_backend(os_name)
+    tried: List[list] = []
+
+    for cmd in [backend["command"]] + backend["candidates"]:
+        if cmd and cmd not in tried:
+            tried.append(cmd)
+            yield backend, cmd
+
+    if not backend.get("cached"):
+        return
+
+    log_lock("Backends mémorisés en échec – nouveau sondage")
+    backend = resolve_backend(os_name, refresh=True)
+    for cmd in backend["candidates"]:
+        if cmd not in tried:
+            tried.append(cmd)
+            yield backend, cmd
+
+
+def _session_fingerprint(os_name: str) -> str:
+    """Empreinte de la session graphique (change à chaque nouvelle session)."""
+    parts = [os_name] + [f"{var}={os.environ.get(var, '')}" for var in _SESSION_VARS]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def _load_cache() -> Optional[Dict[str, Any]]:
+    try:
+        with open(_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache(backend: Dict[str, Any]) -> None:
+    data = {k: v for k, v in backend.items() if k != "cached"}
+    try:
+        _CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _CACHE_FILE.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, _CACHE_FILE)
+    except OSError as e:
+        log_error(f"Impossible de mémoriser le backend de verrouillage : {e}")
+
+
+def _remember_winner(backend: Dict[str, Any], cmd: list) -> None:
+    """Persiste la commande qui vient de verrouiller avec succès."""
+    if backend.get("command") == cmd and backend.get("verified"):
+        return
+    backend["command"] = cmd
+    backend["verified"] = True
+    _save_cache(backend)
+
+
 def _resolve_platform(override: str) -> str:
     """Résout la plateforme cible."""
     if override != "auto":
@@ -113,17 +535,24 @@ def _resolve_platform(override: str) -> str:
     return mapping.get(system, system.lower())
 
 
-def _try_lock(cmd: list) -> bool:
+def _timed_try_lock(cmd: list, timeout: float = 5) -> Tuple[bool, float]:
+    """_try_lock() chronométré : retourne (succès, latence en ms)."""
+    start = time.perf_counter()
+    ok = _try_lock(cmd, timeout)
+    return ok, round((time.perf_counter() - start) * 1000, 3)
+
+
+def _try_lock(cmd: list, timeout: float = 5) -> bool:
     """
     Tente d'exécuter une commande de verrouillage.
     Retourne True si la commande a été lancée sans erreur.
     """
     try:
         # check=False : on ne veut pas lever une exception si returncode != 0
-        # timeout=5 : éviter les blocages infinis
+        # timeout : éviter les blocages infinis
         result = subprocess.run(
             cmd,
-            timeout=5,
+            timeout=timeout,
             capture_output=True,
             text=True,
         )
@@ -5,6 +5,7 @@ import math
 import os
 from typing import List
 from datetime import datetime
+from fingerlock.utils.trace import span, instant
 
 GRID_SIZE     = 3
 POINT_RADIUS  = 26
@@ -57,6 +58,10 @@ def _play_sound(sound_type: str):
 
 class LockScreen:
     def __init__(self, stored_hash: str, max_attempts: int = 3, setup_mode: bool = False):
+        with span("LockScreen.__init__", setup_mode=setup_mode):
+            self._init(stored_hash, max_attempts, setup_mode)
+
+    def _init(self, stored_hash: str, max_attempts: int, setup_mode: bool):
         self.stored_hash    = stored_hash
         self.max_attempts   = max_attempts
         self.setup_mode     = setup_mode
@@ -67,6 +72,7 @@ class LockScreen:
         self.result_pattern = None
         self.pulse_phase    = 0
         self.line_progress  = []
+        self.painted        = False
 
         self.root = tk.Tk()
         self.root.title("FingerLock")
@@ -125,6 +131,13 @@ class LockScreen:
         self.root.after(50, self._animate)
 
     def _draw(self, state="normal", mx=None, my=None):
+        if not self.painted:
+            # Première image : chronométrée, puis jalon une fois Tk redessiné
+            self.painted = True
+            with span("LockScreen.first_draw"):
+                self._draw(state, mx, my)
+            self.root.after_idle(instant, "lockscreen.painted")
+            return
         self.canvas.delete("all")
         sw, sh = self.sw, self.sh
 
@@ -310,12 +323,17 @@ class LockScreen:
             if pt and pt not in self.pattern:
                 self.pattern.append(pt)
                 self.line_progress.append(0.0)
+                instant("pattern.point", count=len(self.pattern))
                 _play_sound('point')
                 self.status_var.set("Passez sur ✅ pour valider")
         else:
             self.tracking = False
 
     def _validate(self):
+        with span("LockScreen._validate", points=len(self.pattern)):
+            self._validate_pattern()
+
+    def _validate_pattern(self):
         self.tracking = False
         if len(self.pattern) < 3:
             _play_sound('error')
@@ -328,26 +346,33 @@ class LockScreen:
             _play_sound('success')
             self.result_pattern = self.pattern.copy()
             self.msg_var.set("✅ Schéma enregistré !")
-            self.root.after(500, self.root.destroy)
+            self.root.after(500, self._destroy)
             return
 
         # Mode vérification
-        if _hash(self.pattern) == self.stored_hash:
+        with span("hash.verify"):
+            match = _hash(self.pattern) == self.stored_hash
+        if match:
             _play_sound('success')
             code = "".join(str(p) for p in self.pattern)
             self.msg_var.set(f"✅ Code {code} correct !")
             self.unlocked = True
-            self.root.after(700, self.root.destroy)
+            instant("pattern.validated")
+            self.root.after(700, self._destroy)
         else:
             _play_sound('error')
             remaining = self.max_attempts - self.attempt
             self.msg_var.set(f"❌ Incorrect — {remaining} restante(s)")
             self.attempt += 1
             if self.attempt > self.max_attempts:
-                self.root.after(1200, self.root.destroy)
+                self.root.after(1200, self._destroy)
             else:
                 self.root.after(1000, self._reset)
 
+    def _destroy(self):
+        with span("root.destroy"):
+            self.root.destroy()
+
     def _reset(self):
         self.pattern = []
         self.line_progress = []
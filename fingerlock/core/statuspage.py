@@ -0,0 +1,157 @@
+"""
+core/statuspage.py
+------------------
+Page de statut en mémoire partagée (fichier mmap) publiée par le watcher.
+
+Le watcher écrit son état vivant dans ~/.fingerlock/status.shm à chaque
+tour de boucle ; `fingerlock status` (ou tout moniteur externe) en lit un
+instantané cohérent sans IPC ni verrou, grâce à un compteur de version
+de type seqlock :
+
+    écrivain : seq += 1 (impair) → écriture des champs → seq += 1 (pair)
+    lecteur  : lire seq (pair requis) → lire les champs → relire seq ;
+               recommencer si seq a changé
+
+Il n'y a qu'un seul écrivain (la boucle du watcher) : aucune attente
+côté chemin chaud.
+
+Disposition (little-endian, voir _LAYOUT) :
+    magic, version, seq, pid, started, updated, last_activity, deadline,
+    lock_delay, locked, presence, paused_until, event_count, locks, unlocks,
+    failures
+
+`fingerlock status` ne lit que cette page : le socket de contrôle n'est
+pas interrogé pour l'état courant.
+"""
+
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+STATUS_FILE = Path.home() / ".fingerlock" / "status.shm"
+PAGE_SIZE   = 4096
+
+_MAGIC   = b"FLST"
+_VERSION = 2
+_SEQ     = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_LAYOUT  = struct.Struct("<4sHxx Q q d d d d d ? B 6x d Q Q Q Q")
+_FIELDS  = ("pid", "started", "updated", "last_activity", "deadline", "lock_delay",
+            "locked", "presence", "paused_until", "event_count", "locks", "unlocks", "failures")
+_BODY    = struct.Struct("<q d d d d d ? B 6x d Q Q Q Q")
+_BODY_OFFSET = _SEQ_OFFSET + _SEQ.size
+
+# Champ presence : caméra de présence absente, fermée, ouverte
+PRESENCE_NONE, PRESENCE_OFF, PRESENCE_ON = 0, 1, 2
+_PRESENCE_NAMES = {PRESENCE_NONE: None, PRESENCE_OFF: "off", PRESENCE_ON: "on"}
+
+# Au-delà, un watcher qui ne publie plus est considéré comme figé (sauf
+# verrouillé : la boucle attend alors l'écran et ne publie plus)
+STALE_AFTER = 5.0
+
+
+class StatusWriter:
+    """Côté watcher : publie l'état dans la page partagée."""
+
+    def __init__(self, path: Path = STATUS_FILE, **fields: Any):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, PAGE_SIZE)
+            self._map = mmap.mmap(fd, PAGE_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        self._seq = 0
+        self.state: Dict[str, Any] = {
+            "pid": os.getpid(), "started": time.time(), "updated": 0.0,
+            "last_activity": 0.0, "deadline": 0.0, "lock_delay": 0.0,
+            "locked": False, "presence": PRESENCE_NONE, "paused_until": 0.0,
+            "event_count": 0, "locks": 0, "unlocks": 0, "failures": 0,
+        }
+        self.state.update(fields)
+        _LAYOUT.pack_into(self._map, 0, _MAGIC, _VERSION, 0, *self._values())
+
+    def publish(self, **fields: Any) -> None:
+        """Met à jour les champs donnés et publie un instantané complet."""
+        self.state.update(fields)
+        self.state["updated"] = time.time()
+        self._seq += 1                                   # impair : écriture en cours
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._seq)
+        _BODY.pack_into(self._map, _BODY_OFFSET, *self._values())
+        self._seq += 1                                   # pair : instantané stable
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._seq)
+
+    def incr(self, counter: str, n: int = 1, **fields: Any) -> None:
+        """Incrémente un compteur (et met à jour `fields`) en une seule publication."""
+        fields[counter] = self.state[counter] + n
+        self.publish(**fields)
+
+    def close(self) -> None:
+        """Marque le watcher comme arrêté (pid = 0) puis libère la page."""
+        self.publish(pid=0)
+        self._map.close()
+
+    def _values(self):
+        return [self.state[name] for name in _FIELDS]
+
+
+def read_status(path: Path = STATUS_FILE, retries: int = 100) -> Optional[Dict[str, Any]]:
+    """
+    Lit un instantané cohérent de la page de statut.
+    Retourne None si la page n'existe pas ou est invalide.
+
+    Champs ajoutés : running (watcher vivant et publiant, ou vivant et
+    verrouillé), idle (s), remaining (s avant verrouillage, None si
+    verrouillé ou en pause). presence vaut None (pas de caméra de
+    présence), "off" ou "on".
+    """
+    try:
+        with open(path, "rb") as f:
+            page = mmap.mmap(f.fileno(), PAGE_SIZE, mmap.MAP_SHARED, mmap.PROT_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version = struct.unpack_from("<4sH", page, 0)
+        if magic != _MAGIC or version != _VERSION:
+            return None
+        for _ in range(retries):
+            seq1, = _SEQ.unpack_from(page, _SEQ_OFFSET)
+            if seq1 & 1:
+                time.sleep(0)           # écriture en cours : céder la main
+                continue
+            values = _BODY.unpack_from(page, _BODY_OFFSET)
+            seq2, = _SEQ.unpack_from(page, _SEQ_OFFSET)
+            if seq1 == seq2:
+                break
+        else:
+            return None
+    finally:
+        page.close()
+
+    snap = dict(zip(_FIELDS, values))
+    now = time.time()
+    snap["seq"] = seq1
+    snap["presence"] = _PRESENCE_NAMES.get(snap["presence"])
+    snap["running"] = bool(snap["pid"]) and _pid_alive(snap["pid"]) \
+        and (snap["locked"] or now - snap["updated"] < STALE_AFTER)
+    snap["idle"] = max(0.0, now - snap["last_activity"]) if snap["last_activity"] else None
+    if snap["locked"] or snap["paused_until"] > now or not snap["deadline"]:
+        snap["remaining"] = None
+    else:
+        snap["remaining"] = max(0.0, snap["deadline"] - now)
+    return snap
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
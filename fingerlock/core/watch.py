@@ -1,8 +1,16 @@
 """FingerLock – Surveillance avec evdev (compatible Wayland)"""
-import time, select, glob
-from typing import Dict, Any
-from fingerlock.utils.logger import setup_logger, log_lock, log_system
-from fingerlock.core.lockscreen import show_lockscreen
+import os, time, select, glob, threading
+from typing import Any, Callable, Dict, Optional
+from fingerlock.utils.logger import setup_logger_from_config, log_lock, log_system, log_error
+from fingerlock.core.locker import enable_dbus_backend, disable_dbus_backend, get_dispatcher
+from fingerlock.core.activity import ActivityHistogram, CLASSES
+from fingerlock.core.statuspage import PRESENCE_NONE, PRESENCE_OFF, PRESENCE_ON, StatusWriter
+from fingerlock.core.control import ControlServer
+from fingerlock.core.hotreload import ConfigWatcher, validate_config
+from fingerlock.core.hooks import HookRunner, hooks_from_config
+from fingerlock.utils import trace
+from fingerlock.utils.trace import span, instant
+from fingerlock.utils.values import round_or_none
 
 try:
     from evdev import InputDevice, categorize, ecodes
@@ -11,12 +19,37 @@ except ImportError:
     EVDEV_AVAILABLE = False
 
 
+HISTOGRAM_DUMP_INTERVAL = 300  # secondes entre deux sauvegardes de l'histogramme
+TICK = 0.1                     # s, période de la boucle de décision
+SYSTEM_LOCK_BUDGET = 2.0       # s d'attente max du verrouillage de session (system_lock)
+
+# Clés dont le changement impose de reconstruire les hooks
+_HOOK_KEYS = ("hooks", "hooks_max_workers", "hooks_max_concurrent")
+
+# Clés dont le changement impose de reconstruire le pipeline de logs
+_LOG_KEYS = ("log_path", "journal", "log_max_bytes", "log_rotate_daily",
+             "log_backup_count", "log_retention_days", "log_compression")
+
+# Clés dont le changement impose de reconstruire la présence caméra
+_PRESENCE_KEYS = ("presence_mode", "presence_lead_seconds", "presence_max_extension", "presence_fps",
+                  "presence_min_fps", "presence_target_detect_ms", "presence_detect_width",
+                  "camera_id", "recognition_threshold", "mediapipe_confidence", "gallery_path",
+                  "embedding_path", "ann_min_rows", "ann_nprobe", "reverify_interval", "track_move_iou")
+
+# Clés dont le changement impose de reconstruire le verrouillage de session
+_LOCKER_KEYS = ("system_lock", "platform_lock")
+
+_KEYBOARD, _MOUSE = CLASSES.index("keyboard"), CLASSES.index("mouse")
+
+
 class ActivityMonitor:
-    def __init__(self):
+    def __init__(self, histogram: ActivityHistogram = None):
         self.last_activity = time.time()
         self.running = True
         self.event_count = 0
         self.devices = []
+        self.device_class = {}   # fd → indice de classe (histogramme)
+        self.histogram = histogram if histogram is not None else ActivityHistogram()
         
         if EVDEV_AVAILABLE:
             # Trouver tous les devices input
@@ -27,6 +60,7 @@ class ActivityMonitor:
                     caps = dev.capabilities()
                     if ecodes.EV_KEY in caps or ecodes.EV_REL in caps:
                         self.devices.append(dev)
+                        self.device_class[dev.fd] = _MOUSE if ecodes.EV_REL in caps else _KEYBOARD
                 except:
                     pass
             print(f"  📡 {len(self.devices)} périphériques détectés")
@@ -36,23 +70,253 @@ class ActivityMonitor:
         if not self.devices:
             return
         
+        now = time.time()
+        self.histogram.tick(now)
+
         # Polling non-bloquant
         r, w, x = select.select(self.devices, [], [], 0)
         for dev in r:
+            n = 0
             try:
                 for event in dev.read():
                     if event.type in (ecodes.EV_KEY, ecodes.EV_REL):
-                        self.last_activity = time.time()
-                        self.event_count += 1
+                        n += 1
             except:
                 pass
+            if n:
+                self.last_activity = time.time()
+                self.event_count += n
+                # Un seul enregistrement par lot : O(1) quel que soit le débit
+                self.histogram.record(now, self.device_class.get(dev.fd, _KEYBOARD), n)
+
+
+class WatchControl:
+    """
+    État pilotable du watcher, partagé avec le thread du socket de contrôle.
+
+    Les handlers (thread de contrôle) ne font que poser des drapeaux ou
+    des valeurs atomiques ; la boucle principale les applique.
+
+    `clock` est l'horloge murale de tout le watcher (time.time ; une
+    horloge virtuelle en simulation, cf. scripts/simulate_watch.py).
+    """
+
+    def __init__(self, config: Dict[str, Any], monitor: ActivityMonitor,
+                 config_loader: Optional[Callable[[], Dict[str, Any]]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.config = config
+        self.clock = clock
+        self.monitor = monitor
+        self.config_loader = config_loader
+        self.lock_delay = config.get("lock_delay_seconds", 10)
+        self.pattern_hash = config.get("pattern_hash")
+        self.hooks: Optional[HookRunner] = None
+        self.presence = None                      # PresenceGate (presence_mode: fusion)
+        self.locker: Optional[Callable[[str, float], Optional[Dict[str, Any]]]] = None   # system_lock
+        self.last_seen = monitor.last_activity    # activité evdev ou visage confirmé
+        self.paused_until = 0.0
+        self.locked = False
+        self.started = clock()
+        self.locks = self.unlocks = self.failures = 0
+        self.system_locks = self.system_lock_failures = self.system_lock_timeouts = 0
+        self.loops = 0
+        self.loop_ms_max = 0.0
+        self.loop_ms_total = 0.0
+        self.lock_now = threading.Event()
+        self.reload_now = threading.Event()
+        self.reload_requested_at = 0.0
+        self.reload_source = ""
+        self.reloads = self.reloads_rejected = 0
+        self.stop = threading.Event()
+
+    def handlers(self) -> Dict[str, Callable]:
+        return {
+            "ping":    lambda args: {"pong": True},
+            "status":  self.cmd_status,
+            "metrics": self.cmd_metrics,
+            "lock":    self.cmd_lock,
+            "pause":   self.cmd_pause,
+            "resume":  self.cmd_resume,
+            "reload":  self.cmd_reload,
+            "stop":    self.cmd_stop,
+            "trace":   self.cmd_trace,
+        }
+
+    # ── Handlers (thread de contrôle) ──
+    def cmd_status(self, args) -> Dict[str, Any]:
+        now = self.clock()
+        idle = now - self.monitor.last_activity
+        absent = now - max(self.monitor.last_activity, self.last_seen)
+        paused = self.paused_until > now
+        return {
+            "pid":           os.getpid(),
+            "started":       self.started,
+            "locked":        self.locked,
+            "paused_until":  self.paused_until if paused else None,
+            "idle":          round(idle, 1),
+            "remaining":     None if self.locked or paused else round(max(0.0, self.lock_delay - absent), 1),
+            "presence":      self.presence.metrics()["camera"] if self.presence else None,
+            "lock_delay":    self.lock_delay,
+            "pattern":       bool(self.pattern_hash),
+            "platform_lock": self.config.get("platform_lock", "auto"),
+            "log_path":      self.config.get("log_path"),
+        }
+
+    def cmd_metrics(self, args) -> Dict[str, Any]:
+        return {
+            "uptime_s":     round(self.clock() - self.started, 1),
+            "events":       self.monitor.event_count,
+            "devices":      len(self.monitor.devices),
+            "locks":        self.locks,
+            "unlocks":      self.unlocks,
+            "failures":     self.failures,
+            "system_locks": self.system_locks,
+            "system_lock_failures": self.system_lock_failures,
+            "system_lock_timeouts": self.system_lock_timeouts,
+            "reloads":      self.reloads,
+            "reloads_rejected": self.reloads_rejected,
+            "loops":        self.loops,
+            "loop_ms_avg":  round(self.loop_ms_total / self.loops, 3) if self.loops else 0.0,
+            "loop_ms_max":  round(self.loop_ms_max, 3),
+            "activity":     self.monitor.histogram.totals(),
+            "hooks":        self.hooks.metrics() if self.hooks else {},
+            "presence":     self.presence.metrics() if self.presence else {},
+            "lock_latency_ms":   round_or_none(trace.latency("idle.deadline", "lockscreen.painted")),
+            "unlock_latency_ms": round_or_none(trace.latency("pattern.point", "desktop.usable")),
+        }
+
+    def cmd_lock(self, args) -> Dict[str, Any]:
+        if self.locked:
+            raise ValueError("déjà verrouillé")
+        self.lock_now.set()
+        return {"lock": "demandé"}
+
+    def cmd_pause(self, args) -> Dict[str, Any]:
+        try:
+            minutes = float(args[0]) if args else 30.0
+        except ValueError:
+            raise ValueError(f"durée invalide : {args[0]}")
+        if not 0 < minutes <= 24 * 60:
+            raise ValueError("durée de pause entre 0 et 1440 minutes")
+        self.paused_until = self.clock() + minutes * 60
+        log_system(f"Surveillance en pause pour {minutes:g} min", minutes=minutes)
+        return {"paused_until": self.paused_until}
+
+    def cmd_resume(self, args) -> Dict[str, Any]:
+        self.paused_until = 0.0
+        self.monitor.last_activity = self.clock()   # le délai repart de zéro
+        log_system("Surveillance reprise")
+        return {"paused_until": None}
+
+    def cmd_reload(self, args) -> Dict[str, Any]:
+        if self.config_loader is None:
+            raise ValueError("rechargement indisponible")
+        self.request_reload("socket")
+        return {"reload": "demandé"}
+
+    def cmd_trace(self, args) -> Dict[str, Any]:
+        """Exporte l'anneau de traces (Chrome trace-event JSON)."""
+        path = " ".join(args) if args else os.path.join(
+            os.path.dirname(self.config.get("log_path") or "."),
+            time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        if not os.path.isabs(path):
+            raise ValueError("chemin absolu attendu")
+        try:
+            count = trace.export_chrome(path)
+        except OSError as e:
+            raise ValueError(f"export impossible : {e}")
+        return {"path": path, "events": count}
+
+    def cmd_stop(self, args) -> Dict[str, Any]:
+        self.stop.set()
+        return {"stop": "demandé"}
 
+    def request_reload(self, source: str, at: Optional[float] = None) -> None:
+        """Signale un rechargement (thread de contrôle ou ConfigWatcher)."""
+        self.reload_requested_at = time.monotonic() if at is None else at
+        self.reload_source = source
+        self.reload_now.set()
+
+    # ── Boucle principale ──
+    def apply_reload(self) -> None:
+        """
+        Relit, valide et applique la config d'un bloc. En cas d'erreur,
+        l'ancienne config reste en place et la surveillance continue.
+        """
+        self.reload_now.clear()
+        requested, source = self.reload_requested_at, self.reload_source
+        old = self.config
+        hooks = presence = None
+        try:
+            config = self.config_loader()
+            validate_config(config)
+            hooks_changed = any(config.get(k) != old.get(k) for k in _HOOK_KEYS)
+            hooks = hooks_from_config(config) if hooks_changed else None
+            presence_changed = any(config.get(k) != old.get(k) for k in _PRESENCE_KEYS)
+            presence = _load_presence(config) if presence_changed else None
+            # Dernière étape qui peut échouer : avant toute bascule
+            if any(config.get(k) != old.get(k) for k in _LOG_KEYS):
+                setup_logger_from_config(config)
+        except Exception as e:
+            # Rien n'a basculé : libérer ce qui vient d'être construit
+            if hooks:
+                hooks.shutdown()
+            if presence:
+                presence.close()
+            self.reloads_rejected += 1
+            reason = " ".join(str(e).split())   # erreurs YAML sur plusieurs lignes
+            log_error(f"Configuration rejetée, surveillance inchangée : {reason}", source=source)
+            return
+
+        changes = []
+        if config["lock_delay_seconds"] != self.lock_delay:
+            changes.append(f"délai {self.lock_delay}s → {config['lock_delay_seconds']}s")
+        if config["pattern_hash"] != self.pattern_hash:
+            changes.append("schéma modifié")
+        if config.get("log_path") != old.get("log_path"):
+            changes.append(f"logs → {config['log_path']}")
+        if hooks_changed:
+            changes.append("hooks")
+            if self.hooks:
+                self.hooks.shutdown()
+            self.hooks = hooks
+        if presence_changed:
+            changes.append("présence")
+            if self.presence:
+                self.presence.close()
+            self.presence = presence
+        if any(config.get(k) != old.get(k) for k in _LOCKER_KEYS):
+            changes.append("verrouillage de session")
+            self.locker = _build_locker(config)
+
+        self.config, self.lock_delay, self.pattern_hash = \
+            config, config["lock_delay_seconds"], config["pattern_hash"]
+        self.reloads += 1
+
+        apply_ms = (time.monotonic() - requested) * 1000
+        log_system(f"Configuration rechargée en {apply_ms:.1f} ms : {', '.join(changes) or 'aucun changement'}",
+                   source=source, apply_ms=round(apply_ms, 3), changes=changes)
+
+    def paused(self, now: float) -> bool:
+        return self.paused_until > now
 
-def run_watch(config: Dict[str, Any]) -> None:
-    setup_logger(config["log_path"])
 
-    lock_delay   = config.get("lock_delay_seconds", 10)
-    pattern_hash = config.get("pattern_hash")
+def run_watch(config: Dict[str, Any],
+              config_loader: Optional[Callable[[], Dict[str, Any]]] = None,
+              config_file: Optional[str] = None) -> None:
+    """
+    Boucle de surveillance.
+
+    Args:
+        config:        configuration utilisateur.
+        config_loader: relit la configuration (rechargement à chaud).
+        config_file:   fichier surveillé (inotify) ; chaque modification
+                       déclenche un rechargement via config_loader.
+    """
+    with span("watch.setup_logger"):
+        setup_logger_from_config(config)
+
+    lock_delay = config.get("lock_delay_seconds", 10)
 
     if not EVDEV_AVAILABLE:
         print("\n  ❌ Module 'evdev' manquant !")
@@ -65,53 +329,50 @@ def run_watch(config: Dict[str, Any]) -> None:
     print(f"  Ctrl+C pour arrêter\n")
     log_system("Surveillance démarrée")
 
-    monitor = ActivityMonitor()
+    with span("watch.devices"):
+        monitor = ActivityMonitor(ActivityHistogram.load())
     
     if not monitor.devices:
         print("  ❌ Aucun périphérique input accessible !")
         print("  Vérifiez que vous êtes dans le groupe 'input'")
         return
 
-    try:
-        locked = False
-        last_debug = 0
-
-        while True:
-            now = time.time()
-            
-            # Mettre à jour les events
-            monitor.update()
-            
-            inactivity = now - monitor.last_activity
-
-            # Debug toutes les 3s
-            if now - last_debug >= 3:
-                print(f"  [DEBUG] Events détectés: {monitor.event_count}")
-                last_debug = now
-
-            if inactivity >= lock_delay and not locked:
-                print(f"\n  [🔒 LOCK] {int(inactivity)}s d'inactivité")
-                log_lock(f"Verrouillage après {int(inactivity)}s")
-                locked = True
-
-                unlocked = show_lockscreen(pattern_hash)
-
-                if unlocked:
-                    print("\n  [🔓 UNLOCK] Déverrouillé ✅")
-                    log_system("Système déverrouillé")
-                    locked = False
-                    monitor.last_activity = time.time()
-                    monitor.event_count = 0
-                else:
-                    print("  ❌ Trop de tentatives — arrêt")
-                    log_system("Arrêt après trop de tentatives")
-                    break
+    # tkinter n'est chargé qu'une fois les périphériques ouverts
+    with span("watch.import_lockscreen"):
+        from fingerlock.core.lockscreen import show_lockscreen
+
+    control = WatchControl(config, monitor, config_loader)
+    with span("watch.hooks"):
+        control.hooks = _build_hooks(config)
+    with span("watch.presence"):
+        control.presence = _build_presence(config)
+    if control.presence:
+        print(f"  👀 Présence caméra : ouverte {control.presence.lead:g}s avant l'échéance, "
+              f"verrouillage repoussé tant qu'un visage enrôlé est vu\n")
+
+    # Verrouillage de session (system_lock) : D-Bus ouvert seulement s'il sert
+    with span("watch.locker"):
+        control.locker = _build_locker(config)
 
-            elif inactivity < lock_delay:
-                remaining = int(lock_delay - inactivity)
-                print(f"  [✅ ACTIF] {int(inactivity)}s (lock dans {remaining}s) | Events: {monitor.event_count}     ", end="\r")
+    # Page de statut partagée (lue par `fingerlock status`)
+    status = _open_status(lock_delay)
 
-            time.sleep(0.1)  # Poll plus fréquent
+    # Socket de contrôle (commandes lock / pause / reload ...)
+    with span("watch.control_socket"):
+        server = _open_control(control)
+
+    # Rechargement à chaud à chaque modification de config.yaml
+    config_watch = None
+    if config_file and config_loader:
+        config_watch = ConfigWatcher(config_file, lambda at: control.request_reload("inotify", at))
+        config_watch.start()
+
+    try:
+        watch_loop(control, monitor, show_lockscreen, status)
+
+        if control.stop.is_set():
+            print("\n\n  🛑  Arrêt demandé\n")
+            log_system("Arrêt manuel", source="socket")
 
     except KeyboardInterrupt:
         print("\n\n  🛑  Arrêté\n")
@@ -119,8 +380,239 @@ def run_watch(config: Dict[str, Any]) -> None:
     except Exception as e:
         print(f"\n  ❌ Erreur: {e}\n")
     finally:
+        if control.hooks:
+            control.hooks.shutdown()
+        if control.presence:
+            control.presence.close()
+        if config_watch:
+            config_watch.close()
+        if server:
+            server.close()
+        _dump_histogram(monitor)
+        disable_dbus_backend()
+        if status:
+            status.close()
         for dev in monitor.devices:
             try:
                 dev.close()
             except:
                 pass
+
+
+def watch_loop(control: WatchControl, monitor, show_lockscreen: Callable[[Optional[str]], bool],
+               status: Optional[StatusWriter] = None, sleep: Callable[[float], None] = time.sleep,
+               verbose: bool = True, dump_interval: Optional[float] = HISTOGRAM_DUMP_INTERVAL) -> None:
+    """
+    Boucle de décision du watcher, jusqu'à `control.stop` ou un échec de
+    déverrouillage.
+
+    Toutes les dépendances sont injectées : horloge (`control.clock`),
+    attente entre deux tours (`sleep`), moniteur d'entrées (update,
+    last_activity, event_count), écran de verrouillage, verrouillage de
+    session (`control.locker`) et présence (`control.presence`). Le simulateur (scripts/simulate_watch.py) y
+    branche une horloge virtuelle et des sources scriptées.
+
+    Args:
+        verbose:       affichage console du statut et des verrouillages.
+        dump_interval: période de sauvegarde de l'histogramme (None : jamais).
+    """
+    clock = control.clock
+    last_debug = 0
+    last_dump = clock()
+
+    while not control.stop.is_set():
+        now = clock()
+        tick_start = time.monotonic()
+
+        # Mettre à jour les events
+        monitor.update()
+
+        if control.reload_now.is_set():
+            control.apply_reload()
+
+        lock_delay = control.lock_delay
+        paused = control.paused(now)
+        last_seen = monitor.last_activity
+        if control.presence:
+            # Caméra ouverte seulement à l'approche de l'échéance
+            last_seen = control.presence.update(now, monitor.last_activity, lock_delay,
+                                                armed=not paused and not control.locked)
+        control.last_seen = last_seen
+        inactivity = now - last_seen
+
+        if status:
+            status.publish(last_activity=monitor.last_activity,
+                           deadline=last_seen + lock_delay,
+                           lock_delay=lock_delay,
+                           paused_until=control.paused_until,
+                           presence=_presence_state(control.presence),
+                           event_count=monitor.event_count)
+
+        # Debug toutes les 3s
+        if verbose and now - last_debug >= 3:
+            print(f"  [DEBUG] Events détectés: {monitor.event_count}")
+            last_debug = now
+
+        if dump_interval is not None and now - last_dump >= dump_interval:
+            _dump_histogram(monitor)
+            last_dump = now
+
+        forced = control.lock_now.is_set()
+        if forced or (inactivity >= lock_delay and not paused and not control.locked):
+            control.lock_now.clear()
+            instant("idle.deadline", forced=forced,
+                    late_ms=0.0 if forced else round((inactivity - lock_delay) * 1000, 3))
+            with span("lock.log"):
+                if forced:
+                    if verbose:
+                        print("\n  [🔒 LOCK] Verrouillage demandé")
+                    log_lock("Verrouillage demandé", forced=True)
+                else:
+                    if verbose:
+                        print(f"\n  [🔒 LOCK] {int(inactivity)}s d'inactivité")
+                    log_lock(f"Verrouillage après {int(inactivity)}s", inactivity=int(inactivity))
+            control.locked = True
+            control.locks += 1
+            if control.presence:
+                control.presence.sleep()
+            if status:
+                status.incr("locks", locked=True)
+            # Simple soumission au pool : l'écran s'affiche sans attendre
+            if control.hooks:
+                with span("lock.hooks_fire"):
+                    control.hooks.fire("lock", forced=forced, inactivity=int(inactivity))
+            # Session verrouillée avant l'écran, attente bornée par le budget
+            if control.locker:
+                with span("lock.system"):
+                    _lock_session(control)
+
+            with span("lockscreen"):
+                unlocked = show_lockscreen(control.pattern_hash)
+            instant("desktop.usable", unlocked=unlocked)
+
+            control.locked = False
+            if unlocked:
+                if verbose:
+                    print("\n  [🔓 UNLOCK] Déverrouillé ✅")
+                log_system("Système déverrouillé")
+                monitor.last_activity = clock()
+                monitor.event_count = 0
+                control.unlocks += 1
+                if status:
+                    status.incr("unlocks", locked=False)
+                if control.hooks:
+                    control.hooks.fire("unlock")
+            else:
+                if verbose:
+                    print("  ❌ Trop de tentatives — arrêt")
+                log_system("Arrêt après trop de tentatives")
+                control.failures += 1
+                if status:
+                    status.incr("failures")
+                break
+
+        elif verbose and paused:
+            print(f"  [⏸️  PAUSE] reprise dans {int(control.paused_until - now)}s | Events: {monitor.event_count}     ", end="\r")
+
+        elif verbose and last_seen > monitor.last_activity:
+            print(f"  [👀 PRÉSENT] {control.presence.last_user} devant l'écran, "
+                  f"{int(now - monitor.last_activity)}s sans saisie | Events: {monitor.event_count}     ", end="\r")
+
+        elif verbose and inactivity < lock_delay:
+            remaining = int(lock_delay - inactivity)
+            print(f"  [✅ ACTIF] {int(inactivity)}s (lock dans {remaining}s) | Events: {monitor.event_count}     ", end="\r")
+
+        elapsed_ms = (time.monotonic() - tick_start) * 1000
+        control.loops += 1
+        control.loop_ms_total += elapsed_ms
+        control.loop_ms_max = max(control.loop_ms_max, elapsed_ms)
+
+        sleep(TICK)  # Poll plus fréquent
+
+
+def _lock_session(control: WatchControl) -> None:
+    """Verrouille la session via control.locker ; l'écran s'affiche quoi qu'il arrive."""
+    budget = control.config.get("system_lock_budget", SYSTEM_LOCK_BUDGET)
+    try:
+        result = control.locker(control.config.get("platform_lock", "auto"), budget)
+    except Exception as e:
+        control.system_lock_failures += 1
+        log_error(f"Verrouillage de session impossible : {e}")
+        return
+    if result is None:
+        # Budget dépassé : la tentative continue dans le dispatcher
+        control.system_lock_timeouts += 1
+    elif result["success"]:
+        control.system_locks += 1
+    else:
+        control.system_lock_failures += 1
+
+
+def _presence_state(presence) -> int:
+    if presence is None:
+        return PRESENCE_NONE
+    return PRESENCE_ON if presence.camera_on else PRESENCE_OFF
+
+
+def _dump_histogram(monitor: ActivityMonitor) -> None:
+    try:
+        monitor.histogram.dump()
+    except OSError as e:
+        log_system(f"Sauvegarde de l'histogramme d'activité impossible : {e}")
+
+
+def _open_status(lock_delay: float):
+    try:
+        return StatusWriter(lock_delay=lock_delay)
+    except OSError as e:
+        log_system(f"Page de statut indisponible : {e}")
+        return None
+
+
+def _build_hooks(config: Dict[str, Any]) -> Optional[HookRunner]:
+    try:
+        return hooks_from_config(config)
+    except ValueError as e:
+        log_error(f"Hooks désactivés : {e}")
+        return None
+
+
+def _load_presence(config: Dict[str, Any]):
+    """PresenceGate de la config, None si presence_mode est absent ou "off" (ValueError si invalide)."""
+    if config.get("presence_mode", "off") == "off":
+        return None
+    # Module caméra chargé seulement si la fusion est activée
+    from fingerlock.face.presence import presence_from_config
+    return presence_from_config(config)
+
+
+def _build_presence(config: Dict[str, Any]):
+    try:
+        return _load_presence(config)
+    except ValueError as e:
+        log_error(f"Présence caméra désactivée : {e}")
+        return None
+
+
+def _build_locker(config: Dict[str, Any]):
+    """
+    Verrouillage de session de la config (LockDispatcher.lock partagé), None
+    si system_lock est désactivé. La connexion D-Bus n'est ouverte que dans
+    ce cas, et refermée sinon.
+    """
+    if not config.get("system_lock", False):
+        disable_dbus_backend()
+        return None
+    # Connexion D-Bus persistante : verrouillage sans fork/exec
+    enable_dbus_backend(platform_override=config.get("platform_lock", "auto"))
+    return get_dispatcher(budget=config.get("system_lock_budget", SYSTEM_LOCK_BUDGET)).lock
+
+
+def _open_control(control: WatchControl) -> Optional[ControlServer]:
+    try:
+        server = ControlServer(control.handlers())
+    except OSError as e:
+        log_system(f"Socket de contrôle indisponible : {e}")
+        return None
+    server.start()
+    return server
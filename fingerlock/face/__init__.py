@@ -0,0 +1 @@
+# face/__init__.py
@@ -0,0 +1,218 @@
+"""
+face/ann.py
+-----------
+Index approché (IVF) pour les grandes galeries, en NumPy pur.
+
+Construction : k-means (init k-means++ sur un échantillon, Lloyd) répartit
+les R lignes en C listes autour de centroïdes. Les vecteurs sont recopiés
+dans l'ordre des listes, chaque liste est donc une tranche contiguë :
+
+    centroids   float32 (C, D)
+    list_offsets int64  (C+1,)   lignes de la liste c : list_offsets[c]:list_offsets[c+1]
+    vectors     float32 (R, D)   lignes réordonnées
+    row_user    int32   (R,)     indice d'utilisateur de chaque ligne réordonnée
+
+Requête : distances aux C centroïdes, puis recherche exacte dans les
+`nprobe` listes les plus proches seulement, soit ~nprobe·R/C lignes au
+lieu de R. Le résultat ne peut être que plus loin que la recherche
+exacte : l'index ne crée jamais de faux accepté, il peut en revanche
+manquer un match (rappel mesuré par scripts/bench_ann.py).
+
+Persistance : à côté de la galerie (gallery.npz → gallery.ivf.npz), avec
+la clé (mtime, taille) du fichier source ; un index périmé est reconstruit.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from fingerlock.face.gallery import _distance, load_gallery
+
+DEFAULT_NPROBE = 8
+DEFAULT_MIN_ROWS = 20000      # en dessous, la recherche exacte est plus rapide
+KMEANS_ITERATIONS = 20
+SAMPLE_PER_LIST = 40          # lignes d'entraînement du k-means par centroïde
+ASSIGN_BATCH = 8192
+
+
+class IVFIndex:
+    """Listes inversées autour de centroïdes k-means ; interface de match de Gallery."""
+
+    def __init__(self, users, centroids, list_offsets, vectors, row_user,
+                 source_key=None, nprobe: int = DEFAULT_NPROBE):
+        self.users = list(users)
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.list_offsets = np.asarray(list_offsets, dtype=np.int64)
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.row_user = np.asarray(row_user, dtype=np.int32)
+        self.source_key = list(source_key) if source_key is not None else None
+        self.nprobe = nprobe
+        self.sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        self.centroid_sq = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        self._query = np.empty(self.dim, dtype=np.float32)
+        self.last_scanned = 0   # lignes comparées par la dernière requête
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def match(self, embedding, threshold: Optional[float] = None,
+              nprobe: Optional[int] = None) -> Tuple[Optional[str], float]:
+        """Meilleur utilisateur parmi les `nprobe` listes les plus proches."""
+        q = self._query
+        q[:] = embedding
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        coarse = self.centroid_sq - 2.0 * (self.centroids @ q)
+        probes = np.argpartition(coarse, nprobe - 1)[:nprobe] if nprobe < self.n_lists \
+            else np.arange(self.n_lists)
+
+        best_row, best, scanned = -1, np.inf, 0
+        for c in probes:
+            start, stop = self.list_offsets[c], self.list_offsets[c + 1]
+            if start == stop:
+                continue
+            scanned += stop - start
+            d2 = self.sq_norms[start:stop] - 2.0 * (self.vectors[start:stop] @ q)
+            i = int(d2.argmin())
+            if d2[i] < best:
+                best_row, best = start + i, float(d2[i])
+        self.last_scanned = int(scanned)
+        if best_row < 0:
+            return None, float("inf")
+        distance = _distance(best + np.dot(q, q))
+        if threshold is not None and distance > threshold:
+            return None, distance
+        return self.users[self.row_user[best_row]], distance
+
+    # ── Persistance ──
+    def save(self, path) -> None:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, users=np.array(self.users, dtype=str), centroids=self.centroids,
+                     list_offsets=self.list_offsets, vectors=self.vectors, row_user=self.row_user,
+                     source_key=np.array(self.source_key or [], dtype=np.int64))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, nprobe: int = DEFAULT_NPROBE) -> "IVFIndex":
+        with np.load(path, allow_pickle=False) as data:
+            key = data["source_key"].tolist() or None
+            return cls([str(u) for u in data["users"]], data["centroids"], data["list_offsets"],
+                       data["vectors"], data["row_user"], source_key=key, nprobe=nprobe)
+
+
+# ---------------------------------------------------------------------------
+# Construction
+# ---------------------------------------------------------------------------
+def build_index(gallery, n_lists: Optional[int] = None, iterations: int = KMEANS_ITERATIONS,
+                seed: int = 0, source_key=None, nprobe: int = DEFAULT_NPROBE) -> IVFIndex:
+    """IVFIndex sur une Gallery ou QuantizedGallery (lignes déquantifiées)."""
+    vectors = gallery.embeddings if hasattr(gallery, "embeddings") else gallery.to_gallery().embeddings
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n_lists = min(n_lists or max(1, int(4 * np.sqrt(len(vectors)))), len(vectors))
+
+    rng = np.random.default_rng(seed)
+    size = min(len(vectors), SAMPLE_PER_LIST * n_lists)
+    sample = vectors[rng.choice(len(vectors), size, replace=False)]
+    centroids = _kmeans(sample, n_lists, iterations, rng)
+
+    assign = _assign(vectors, centroids)
+    order = np.argsort(assign, kind="stable")
+    counts = np.bincount(assign, minlength=n_lists)
+    list_offsets = np.concatenate(([0], np.cumsum(counts)))
+    return IVFIndex(gallery.users, centroids, list_offsets, vectors[order],
+                    np.asarray(gallery.row_user)[order], source_key=source_key, nprobe=nprobe)
+
+
+def _kmeans(x, k: int, iterations: int, rng) -> "np.ndarray":
+    """Lloyd avec initialisation k-means++."""
+    x_sq = np.einsum("ij,ij->i", x, x)
+    centroids = np.empty((k, x.shape[1]), dtype=np.float32)
+    centroids[0] = x[rng.integers(len(x))]
+    closest = np.maximum(x_sq - 2.0 * (x @ centroids[0]) + centroids[0] @ centroids[0], 0)
+    for i in range(1, k):
+        cumulative = np.cumsum(closest)
+        j = int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right")) \
+            if cumulative[-1] > 0 else int(rng.integers(len(x)))
+        centroids[i] = x[min(j, len(x) - 1)]
+        d2 = x_sq - 2.0 * (x @ centroids[i]) + centroids[i] @ centroids[i]
+        np.minimum(closest, d2, out=closest)
+
+    for _ in range(iterations):
+        assign = _assign(x, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=k)
+        moved = counts > 0
+        starts = (np.cumsum(counts) - counts)[moved]
+        updated = np.add.reduceat(x[order], starts, axis=0) / counts[moved, None]
+        shift = np.abs(updated - centroids[moved]).max() if moved.any() else 0.0
+        centroids[moved] = updated
+        if shift < 1e-6:
+            break
+    return centroids
+
+
+def _assign(x, centroids) -> "np.ndarray":
+    """Centroïde le plus proche de chaque ligne (par lots, mémoire bornée)."""
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    out = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), ASSIGN_BATCH):
+        block = x[start:start + ASSIGN_BATCH]
+        out[start:start + len(block)] = (c_sq[None, :] - 2.0 * (block @ centroids.T)).argmin(axis=1)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Chargement depuis la config
+# ---------------------------------------------------------------------------
+def index_path(gallery_path) -> Path:
+    path = Path(gallery_path)
+    return path.with_name(path.name.split(".")[0] + ".ivf.npz")
+
+
+def load_or_build(gallery_path, gallery=None, nprobe: int = DEFAULT_NPROBE) -> IVFIndex:
+    """Index persistant de `gallery_path`, reconstruit (et réécrit) s'il est périmé."""
+    key = _file_key(gallery_path)
+    path = index_path(gallery_path)
+    try:
+        index = IVFIndex.load(path, nprobe=nprobe)
+        if index.source_key == key:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    if gallery is None:
+        gallery = load_gallery({"gallery_path": str(gallery_path)})
+    index = build_index(gallery, source_key=key, nprobe=nprobe)
+    try:
+        index.save(path)
+    except OSError:
+        pass   # index facultatif : il sera reconstruit au prochain lancement
+    return index
+
+
+def load_matcher(config: Dict):
+    """
+    Objet de match pour la config : galerie exacte, ou IVFIndex si elle
+    compte au moins `ann_min_rows` lignes (0 désactive l'index).
+    """
+    gallery = load_gallery(config)
+    min_rows = config.get("ann_min_rows", DEFAULT_MIN_ROWS)
+    path = config.get("gallery_path")
+    if not min_rows or len(gallery) < min_rows or not path or not os.path.isfile(path):
+        return gallery
+    return load_or_build(path, gallery, nprobe=config.get("ann_nprobe", DEFAULT_NPROBE))
+
+
+def _file_key(path) -> list:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
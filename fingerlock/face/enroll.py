@@ -0,0 +1,293 @@
+"""
+face/enroll.py
+--------------
+Enrôlement en flux : les frames sont encodées en parallèle au fil de la
+capture et agrégées en mémoire constante.
+
+L'ancien enrôlement gardait `capture_count` embeddings puis en faisait la
+moyenne, en encodant les frames une à une dans la boucle de capture. Ici
+les frames passent par le pipeline caméra (face/pipeline.py) : capture,
+détection et encodage se chevauchent, et avec workers > 1 l'encodage se
+fait dans un pool de processus (face/shmpool.py). Chaque embedding est
+versé dans un OnlineStats (Welford) :
+
+    moyenne μ (D,) et co-moments M2 (D, D)   mémoire fixe, quel que soit N
+
+Un embedding est rejeté si :
+    - la frame contient plusieurs visages (identité ambiguë),
+    - sa distance à μ dépasse OUTLIER_MAX (un autre visage),
+    - ou, après MIN_FRAMES acceptées, dépasse moyenne + OUTLIER_SIGMAS ×
+      écart-type des distances acceptées (flou, profil, occlusion).
+
+L'enrôlement s'arrête dès que l'erreur type de μ, √(tr Σ / n), passe sous
+`enroll_tolerance` (convergence), au plus tard à `capture_count`
+embeddings acceptés. Un rapport de qualité (acceptées / rejetées,
+dispersion, erreur type, débit) accompagne le résultat.
+
+Le vecteur μ est enregistré dans la galerie (`gallery_path`, .npz) sous
+l'utilisateur enrôlé, ou dans l'ancien `embedding_path` (.npy).
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from fingerlock.utils.logger import log_enroll, log_error
+from fingerlock.utils.values import round_or_none
+
+DEFAULT_TOLERANCE = 0.04       # erreur type visée sur μ (distance euclidienne)
+MIN_FRAMES = 5                 # embeddings acceptés avant test statistique et convergence
+OUTLIER_MAX = 0.45             # au-delà : autre visage, toujours rejeté
+OUTLIER_SIGMAS = 3.0
+RESTART_AFTER = 10             # rejets consécutifs pendant l'amorçage : μ initial douteux, on repart
+NO_FACE_TIMEOUT = 10.0         # s sans visage avant abandon
+
+
+class OnlineStats:
+    """Moyenne et covariance en ligne (Welford), mémoire O(D²)."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, dim: int):
+        self.n = 0
+        self.mean = np.zeros(dim, dtype=np.float64)
+        self.m2 = np.zeros((dim, dim), dtype=np.float64)
+
+    def add(self, x) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += np.outer(delta, x - self.mean)
+
+    @property
+    def covariance(self) -> "np.ndarray":
+        return self.m2 / max(self.n - 1, 1)
+
+    @property
+    def dispersion(self) -> float:
+        """Distance quadratique moyenne à μ : √(tr Σ)."""
+        return float(np.sqrt(max(np.trace(self.m2), 0.0) / max(self.n - 1, 1)))
+
+    @property
+    def stderr(self) -> float:
+        """Erreur type de μ : √(tr Σ / n)."""
+        return self.dispersion / np.sqrt(self.n) if self.n > 1 else float("inf")
+
+
+class Enrollment:
+    """
+    Agrège les frames du pipeline (on_frame, thread de reconnaissance) et
+    signale `done` à la convergence ou à `capture_count` embeddings.
+    """
+
+    def __init__(self, user: str, capture_count: int = 30, tolerance: float = DEFAULT_TOLERANCE,
+                 min_frames: int = MIN_FRAMES, clock: Callable[[], float] = time.monotonic):
+        self.user = user
+        self.capture_count = capture_count
+        self.tolerance = tolerance
+        self.min_frames = min(min_frames, capture_count)
+        self.clock = clock
+        self.stats: Optional[OnlineStats] = None
+        self.distances = OnlineStats(1)     # distances à μ des embeddings acceptés
+        self.max_distance = 0.0
+        self.frames = 0
+        self.rejected = {"multiple": 0, "outlier": 0, "no_face": 0}
+        self.restarts = 0
+        self.stop_reason: Optional[str] = None
+        self.started = clock()
+        self.finished: Optional[float] = None
+        self.last_face = self.started
+        self.done = threading.Event()
+        self._streak = 0
+
+    @property
+    def accepted(self) -> int:
+        return self.stats.n if self.stats is not None else 0
+
+    def on_frame(self, frame) -> None:
+        if self.done.is_set():
+            return
+        self.frames += 1
+        now = self.clock()
+        if not frame.boxes:
+            self.rejected["no_face"] += 1
+            if now - self.last_face >= NO_FACE_TIMEOUT:
+                self.finish("timeout")
+            return
+        self.last_face = now
+        if len(frame.boxes) > 1:
+            self.rejected["multiple"] += 1
+            return
+        for _, embedding in frame.embeddings:
+            self.add(embedding)
+
+    def add(self, embedding) -> bool:
+        """Verse un embedding ; False s'il est rejeté comme aberrant."""
+        x = np.asarray(embedding, dtype=np.float64)
+        if self.stats is None:
+            self.stats = OnlineStats(len(x))
+        stats = self.stats
+        if stats.n:
+            d = float(np.linalg.norm(x - stats.mean))
+            if d > self._limit():
+                self.rejected["outlier"] += 1
+                self._streak += 1
+                if self._streak >= RESTART_AFTER and stats.n < self.min_frames:
+                    # Amorçage sur une mauvaise frame : tout le reste paraît aberrant
+                    self.stats, self.distances, self._streak = None, OnlineStats(1), 0
+                    self.restarts += 1
+                return False
+            self.distances.add(np.array([d]))
+            self.max_distance = max(self.max_distance, d)
+        self._streak = 0
+        stats.add(x)
+        if stats.n >= self.capture_count:
+            self.finish("capture_count")
+        elif stats.n >= self.min_frames and stats.stderr <= self.tolerance:
+            self.finish("convergence")
+        return True
+
+    def finish(self, reason: str) -> None:
+        if not self.done.is_set():
+            self.stop_reason = reason
+            self.finished = self.clock()
+            self.done.set()
+
+    @property
+    def embedding(self) -> Optional["np.ndarray"]:
+        return self.stats.mean.astype(np.float32) if self.stats is not None else None
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = (self.finished or self.clock()) - self.started
+        n = self.accepted
+        dispersion = self.stats.dispersion if n > 1 else None
+        stderr = self.stats.stderr if n > 1 else None
+        return {
+            "user":          self.user,
+            "frames":        self.frames,
+            "accepted":      n,
+            "rejected":      dict(self.rejected),
+            "restarts":      self.restarts,
+            "stop_reason":   self.stop_reason,
+            "converged":     self.stop_reason == "convergence",
+            "dispersion":    round_or_none(dispersion, 4),
+            "stderr":        round_or_none(stderr, 4),
+            "max_distance":  round(self.max_distance, 4),
+            "elapsed_s":     round(elapsed, 3),
+            "accepted_per_s": round(n / elapsed, 2) if elapsed > 0 else None,
+            "quality":       _quality(n, self.min_frames, stderr, self.tolerance),
+        }
+
+    def _limit(self) -> float:
+        if self.stats.n < self.min_frames or self.distances.n < 2:
+            return OUTLIER_MAX
+        spread = float(np.sqrt(self.distances.covariance[0, 0]))
+        return min(OUTLIER_MAX, float(self.distances.mean[0]) + OUTLIER_SIGMAS * spread)
+
+
+def run_enrollment(config: Dict[str, Any], user: str = "owner", camera_id: Optional[int] = None,
+                   workers: Optional[int] = None, source=None, detector=None, encoder_factory=None,
+                   encoder_args: tuple = (), timeout: float = 120.0,
+                   on_progress: Optional[Callable[[Enrollment], None]] = None) -> Dict[str, Any]:
+    """
+    Enrôle `user` depuis la caméra (ou `source`) et enregistre son
+    embedding ; retourne le rapport de qualité (clé "path" si enregistré).
+
+    workers > 1 : encodage dans un pool de processus (FrameRing +
+    ProcessEncoder) ; `encoder_factory(*encoder_args)` construit alors
+    l'encodeur dans chaque worker (DlibEncoder par défaut).
+    """
+    from fingerlock.face.pipeline import CameraSource, DlibEncoder, FacePipeline, MediaPipeDetector
+
+    workers = workers if workers is not None else min(os.cpu_count() or 1, 4)
+    enrollment = Enrollment(user, capture_count=config.get("capture_count", 30),
+                            tolerance=config.get("enroll_tolerance", DEFAULT_TOLERANCE))
+    if source is None:
+        source = CameraSource(config.get("camera_id", 0) if camera_id is None else camera_id, 640, 480)
+    if detector is None:
+        detector = MediaPipeDetector(config.get("mediapipe_confidence", 0.5))
+    factory = encoder_factory or DlibEncoder
+
+    ring = encoder = None
+    if workers > 1:
+        from fingerlock.face.shmpool import FrameRing, ProcessEncoder
+        source.open()
+        probe = source.read()
+        source.close()
+        if probe is None:
+            raise RuntimeError("source vide")
+        ring = FrameRing(slots=workers + 4, shape=probe.shape)
+        encoder = ProcessEncoder(ring, factory=factory, factory_args=encoder_args, workers=workers)
+    else:
+        encoder = factory(*encoder_args)
+
+    def on_result(frame):
+        enrollment.on_frame(frame)
+        if on_progress is not None:
+            on_progress(enrollment)
+
+    log_enroll(f"Démarrage de l'enrôlement de {user} ({workers} encodeur(s))", user=user, workers=workers)
+    pipeline = FacePipeline(source, detector, encoder, None, config.get("recognition_threshold", 0.6),
+                            on_result=on_result, ring=ring)
+    try:
+        pipeline.start()
+        deadline = time.monotonic() + timeout
+        while not enrollment.done.wait(0.05):
+            if pipeline.done.is_set():
+                enrollment.finish("source")
+            elif time.monotonic() >= deadline:
+                enrollment.finish("timeout")
+    finally:
+        pipeline.stop()
+        if ring is not None:
+            encoder.close()
+            ring.close()
+
+    report = enrollment.report()
+    report["workers"] = workers
+    if pipeline.error is not None:
+        report["error"] = f"{type(pipeline.error).__name__}: {pipeline.error}"
+    if enrollment.accepted < enrollment.min_frames:
+        log_enroll(f"Enrôlement incomplet : {enrollment.accepted} embedding(s) accepté(s)",
+                   user=user, stop_reason=report["stop_reason"])
+        return report
+    report["path"] = save_enrollment(config, user, enrollment.embedding)
+    log_enroll(f"Enrôlement de {user} réussi → {report['path']}", **{k: report[k] for k in
+               ("accepted", "stop_reason", "stderr", "dispersion", "elapsed_s", "quality")})
+    return report
+
+
+def save_enrollment(config: Dict[str, Any], user: str, embedding) -> str:
+    """
+    Enregistre l'embedding de `user` : dans la galerie `gallery_path`
+    (.npz, utilisateur ajouté ou remplacé), sinon dans `embedding_path` (.npy).
+    """
+    from fingerlock.face.gallery import Gallery
+
+    path = config.get("gallery_path")
+    if path:
+        if path.endswith(".flq"):
+            raise ValueError("galerie quantifiée (.flq) en lecture seule : enrôler dans un .npz puis write_store")
+        try:
+            gallery = Gallery.load(path).with_user(user, [embedding]) if os.path.isfile(path) \
+                else Gallery.from_users({user: [embedding]})
+        except (OSError, ValueError, KeyError) as e:
+            log_error(f"Galerie illisible, enrôlement non enregistré : {e}", path=path)
+            raise
+        gallery.save(path)
+        return path
+    path = config["embedding_path"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(path, np.asarray(embedding))
+    return path
+
+
+def _quality(n: int, min_frames: int, stderr: Optional[float], tolerance: float) -> str:
+    if n < min_frames or stderr is None:
+        return "insuffisante"
+    if stderr <= tolerance:
+        return "bonne"
+    return "moyenne" if stderr <= 2 * tolerance else "faible"
@@ -0,0 +1,180 @@
+"""
+face/gallery.py
+---------------
+Galerie d'embeddings faciaux : N utilisateurs × K embeddings chacun.
+
+Disposition en mémoire (chargée une fois) :
+    embeddings  float32 (R, D)   toutes les lignes, contiguës, groupées par utilisateur
+    offsets     int64   (N+1,)   lignes de l'utilisateur i : offsets[i]:offsets[i+1]
+    sq_norms    float32 (R,)     ||e||² précalculés
+
+Comparer un embedding de frame q revient à un seul produit matrice-vecteur :
+
+    d²(q, e) = ||e||² - 2·(E @ q) + ||q||²
+
+puis argmin sur les R lignes (meilleur utilisateur) ou np.minimum.reduceat
+sur les blocs (meilleure distance par utilisateur). Les tampons sont
+préalloués : match() ne fait aucune allocation proportionnelle à R.
+
+Fichier : .npz (embeddings, offsets, users). Un ancien owner_embedding.npy
+(un seul vecteur 128-d) se charge comme la galerie d'un utilisateur "owner".
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LEGACY_USER = "owner"
+
+_DTYPE = np.float32
+
+
+class Gallery:
+    """Matrice contiguë d'embeddings groupés par utilisateur."""
+
+    def __init__(self, users: Sequence[str], embeddings: "np.ndarray", offsets: "np.ndarray"):
+        embeddings = np.ascontiguousarray(embeddings, dtype=_DTYPE)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if embeddings.ndim != 2:
+            raise ValueError(f"embeddings : matrice (R, D) attendue, reçu {embeddings.shape}")
+        if len(offsets) != len(users) + 1 or offsets[0] != 0 or offsets[-1] != len(embeddings):
+            raise ValueError("offsets incohérents avec users / embeddings")
+        if np.any(np.diff(offsets) < 1):
+            raise ValueError("chaque utilisateur doit avoir au moins un embedding")
+        if len(set(users)) != len(users):
+            raise ValueError("identifiants d'utilisateurs en double")
+
+        self.users: List[str] = list(users)
+        self.embeddings = embeddings
+        self.offsets = offsets
+        self.row_user = np.repeat(np.arange(len(users), dtype=np.int32), np.diff(offsets))
+        self.sq_norms = np.einsum("ij,ij->i", embeddings, embeddings)
+        # Tampons de match() (un appelant à la fois : le thread de reconnaissance)
+        self._dots = np.empty(len(embeddings), dtype=_DTYPE)
+        self._query = np.empty(self.dim, dtype=_DTYPE)
+
+    # ── Construction ──
+    @classmethod
+    def from_users(cls, mapping: Dict[str, Iterable]) -> "Gallery":
+        """Galerie depuis {utilisateur: embeddings (K, D) ou (D,)}."""
+        users, blocks = [], []
+        for user, rows in mapping.items():
+            block = np.atleast_2d(np.asarray(rows, dtype=_DTYPE))
+            if block.size == 0:
+                continue
+            users.append(str(user))
+            blocks.append(block)
+        if not blocks:
+            raise ValueError("galerie vide")
+        dims = {b.shape[1] for b in blocks}
+        if len(dims) != 1:
+            raise ValueError(f"dimensions d'embeddings incohérentes : {sorted(dims)}")
+        offsets = np.concatenate(([0], np.cumsum([len(b) for b in blocks])))
+        return cls(users, np.concatenate(blocks), offsets)
+
+    def to_users(self) -> Dict[str, "np.ndarray"]:
+        return {user: self.rows(user) for user in self.users}
+
+    def with_user(self, user: str, embeddings: Iterable) -> "Gallery":
+        """Nouvelle galerie où `user` a (ou remplace par) ces embeddings."""
+        mapping = self.to_users()
+        mapping[user] = embeddings
+        return Gallery.from_users(mapping)
+
+    def without_user(self, user: str) -> "Gallery":
+        mapping = self.to_users()
+        if mapping.pop(user, None) is None:
+            raise KeyError(user)
+        return Gallery.from_users(mapping)
+
+    # ── Accès ──
+    @property
+    def dim(self) -> int:
+        return self.embeddings.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def rows(self, user: str) -> "np.ndarray":
+        i = self.users.index(user)
+        return self.embeddings[self.offsets[i]:self.offsets[i + 1]]
+
+    # ── Matching (chemin chaud) ──
+    def match(self, embedding, threshold: Optional[float] = None) -> Tuple[Optional[str], float]:
+        """
+        Meilleur utilisateur et sa distance euclidienne pour un embedding (D,).
+        Avec `threshold`, l'utilisateur vaut None si la distance le dépasse.
+        """
+        q = self._query
+        q[:] = embedding
+        dots = np.dot(self.embeddings, q, out=self._dots)
+        dots *= -2.0
+        dots += self.sq_norms
+        row = int(dots.argmin())
+        distance = _distance(dots[row] + np.dot(q, q))
+        if threshold is not None and distance > threshold:
+            return None, distance
+        return self.users[self.row_user[row]], distance
+
+    def match_batch(self, embeddings, threshold: Optional[float] = None) -> List[Tuple[Optional[str], float]]:
+        """match() pour M visages d'une même frame (M, D), en un produit matriciel."""
+        q = np.atleast_2d(np.asarray(embeddings, dtype=_DTYPE))
+        d2 = self.sq_norms[None, :] - 2.0 * (q @ self.embeddings.T)
+        d2 += np.einsum("ij,ij->i", q, q)[:, None]
+        rows = d2.argmin(axis=1)
+        results = []
+        for i, row in enumerate(rows):
+            distance = _distance(d2[i, row])
+            user = self.users[self.row_user[row]]
+            results.append((None if threshold is not None and distance > threshold else user, distance))
+        return results
+
+    def user_distances(self, embedding) -> Dict[str, float]:
+        """Meilleure distance par utilisateur (min sur ses K embeddings)."""
+        q = np.asarray(embedding, dtype=_DTYPE)
+        d2 = self.sq_norms - 2.0 * (self.embeddings @ q) + np.dot(q, q)
+        best = np.minimum.reduceat(d2, self.offsets[:-1])
+        return {user: _distance(v) for user, v in zip(self.users, best)}
+
+    # ── Persistance ──
+    def save(self, path) -> None:
+        """Écrit la galerie (.npz), remplacée atomiquement."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, embeddings=self.embeddings, offsets=self.offsets,
+                     users=np.array(self.users, dtype=str))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "Gallery":
+        """Charge une galerie .npz, ou un ancien embedding .npy (utilisateur "owner")."""
+        path = Path(path)
+        if path.suffix == ".npy":
+            return cls.from_users({LEGACY_USER: np.load(path)})
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(u) for u in data["users"]], data["embeddings"], data["offsets"])
+
+
+def load_gallery(config: Dict):
+    """
+    Galerie de la config : `gallery_path` s'il existe (.npz, ou .flq
+    quantifiée ouverte en mmap), sinon l'ancien `embedding_path`
+    mono-utilisateur. Lève FileNotFoundError si aucun.
+    """
+    for key in ("gallery_path", "embedding_path"):
+        path = config.get(key)
+        if path and os.path.isfile(path):
+            if path.endswith(".flq"):
+                from fingerlock.face.store import open_store
+                return open_store(path)
+            return Gallery.load(path)
+    raise FileNotFoundError("aucune galerie enrôlée (gallery_path / embedding_path)")
+
+
+def _distance(d2) -> float:
+    # d² peut être légèrement négatif par annulation en float32
+    return float(np.sqrt(max(float(d2), 0.0)))
@@ -0,0 +1,193 @@
+"""
+face/governor.py
+----------------
+Régulation de la cadence de capture et de la résolution de détection.
+
+À cadence fixe, le chemin visage concurrence une compilation ou un appel
+vidéo. Le Governor ajuste, une fois par EVAL_INTERVAL, les deux réglages
+que FacePipeline relit à chaque frame (max_fps, detect_width) d'après :
+
+    - la latence de détection mesurée (moyenne glissante), tenue sous
+      `target_ms` en descendant l'échelle des largeurs, et remontée vers
+      `max_width` quand la marge et la charge le permettent ;
+    - la charge système (os.getloadavg / nb de cœurs) : au-delà de
+      LOAD_HIGH, cadence réduite d'autant et résolution d'un cran ;
+    - l'ancienneté de la dernière confirmation d'identité : visage reconnu
+      récemment → plancher `min_fps` (le suivi suffit), confirmation qui
+      vieillit → retour progressif au plafond `max_fps` pour retrouver
+      le visage vite.
+
+La détection ne prend jamais plus de DUTY du temps d'un cœur (cadence
+≤ DUTY / latence). Le résultat est toujours borné à [min_fps, max_fps].
+Chaque décision (valeurs, facteur limitant) est exportée par metrics()
+et dans les traces (instant "governor.decide") quand elle change.
+
+Configuration (présence caméra, face/presence.py) :
+
+    presence_fps: 5                  # plafond de cadence
+    presence_min_fps: 1              # plancher de cadence
+    presence_target_detect_ms: 30    # latence de détection visée
+    presence_detect_width: 320       # largeur de détection max (px)
+"""
+
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from fingerlock.utils.trace import instant
+from fingerlock.utils.values import config_int, config_number, round_or_none
+
+WIDTHS = (160, 224, 320, 480, 640)   # échelle des largeurs de détection (px)
+
+DEFAULT_MIN_FPS = 1.0
+DEFAULT_MAX_FPS = 5.0
+DEFAULT_MAX_WIDTH = 320
+DEFAULT_TARGET_MS = 30.0
+EVAL_INTERVAL = 1.0       # s entre deux décisions
+EWMA_ALPHA = 0.3          # poids de la dernière mesure de latence
+HIGH = 1.25               # latence > HIGH × cible : résolution réduite
+LOW = 0.6                 # latence < LOW × cible : résolution augmentée
+LOAD_HIGH = 0.9           # charge par cœur au-delà de laquelle on cède du CPU
+LOAD_LOW = 0.6            # charge par cœur sous laquelle la résolution peut remonter
+DUTY = 0.5                # part max d'un cœur consacrée à la détection
+CONFIRM_STALE = 5.0       # s : confirmation plus vieille → plafond de cadence
+HISTORY = 32              # décisions gardées pour metrics()
+
+
+def system_load() -> Optional[float]:
+    """Charge moyenne sur 1 min par cœur, None si indisponible (Windows)."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+class Governor:
+    """
+    Régulateur attaché à un FacePipeline (paramètre `governor=`). Appelé
+    depuis les threads du pipeline : observe_detect() après chaque
+    détection, confirmed() à chaque visage reconnu.
+    """
+
+    def __init__(self, min_fps: float = DEFAULT_MIN_FPS, max_fps: float = DEFAULT_MAX_FPS,
+                 target_ms: float = DEFAULT_TARGET_MS, max_width: int = DEFAULT_MAX_WIDTH,
+                 min_width: int = WIDTHS[0],
+                 load: Callable[[], Optional[float]] = system_load,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 0 < min_fps <= max_fps:
+            raise ValueError("0 < min_fps <= max_fps attendu")
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.target_ms = target_ms
+        self.widths = [w for w in WIDTHS if min_width <= w <= max_width] or [max_width]
+        self.load = load
+        self.clock = clock
+        self.fps = max_fps
+        self.width_index = len(self.widths) - 1
+        self.detect_ms: Optional[float] = None
+        self.last_load: Optional[float] = None
+        self.last_confirmed: Optional[float] = None
+        self.reason = "démarrage"
+        self.evaluations = self.changes = 0
+        self.history: deque = deque(maxlen=HISTORY)
+        self.pipeline = None
+        self._next_eval = 0.0
+
+    @property
+    def detect_width(self) -> int:
+        return self.widths[self.width_index]
+
+    def attach(self, pipeline) -> None:
+        """Applique les réglages initiaux (plafonds) au pipeline."""
+        self.pipeline = pipeline
+        self._next_eval = self.clock() + EVAL_INTERVAL
+        self._apply()
+
+    # ── Observations (threads du pipeline) ──
+    def observe_detect(self, ms: float) -> None:
+        """Latence d'une détection ; décide si l'intervalle est écoulé."""
+        self.detect_ms = ms if self.detect_ms is None else self.detect_ms + EWMA_ALPHA * (ms - self.detect_ms)
+        now = self.clock()
+        if now >= self._next_eval:
+            self._next_eval = now + EVAL_INTERVAL
+            self.decide(now)
+
+    def confirmed(self) -> None:
+        self.last_confirmed = self.clock()
+
+    # ── Décision ──
+    def decide(self, now: float) -> None:
+        self.evaluations += 1
+        load = self.last_load = self.load()
+        loaded = load is not None and load > LOAD_HIGH
+        ms = self.detect_ms
+
+        # Résolution : la plus haute qui tient la cible de latence
+        index = self.width_index
+        if loaded or (ms is not None and ms > self.target_ms * HIGH):
+            index = max(0, index - 1)
+        elif ms is not None and ms < self.target_ms * LOW and (load is None or load < LOAD_LOW):
+            index = min(len(self.widths) - 1, index + 1)
+
+        # Cadence : plancher tant que l'identité est fraîche, plafond sinon
+        if self.last_confirmed is None:
+            fps, reason = self.max_fps, "recherche"
+        else:
+            age = now - self.last_confirmed
+            fps = self.min_fps + (self.max_fps - self.min_fps) * min(1.0, age / CONFIRM_STALE)
+            reason = "confirmé" if age < CONFIRM_STALE else "recherche"
+        if ms:
+            cap = DUTY * 1000.0 / ms
+            if cap < fps:
+                fps, reason = cap, "latence"
+        if loaded:
+            fps, reason = fps * LOAD_HIGH / load, "charge"
+        fps = min(self.max_fps, max(self.min_fps, fps))
+
+        changed = index != self.width_index or abs(fps - self.fps) >= 0.05 * self.fps
+        if index != self.width_index:
+            self.detect_ms = None    # latences mesurées à l'ancienne résolution
+        self.width_index = index
+        self.fps = fps
+        self.reason = reason
+        if changed:
+            self.changes += 1
+            self.history.append({"t": round(now, 3), "fps": round(fps, 2), "detect_width": self.detect_width,
+                                 "detect_ms": round_or_none(ms), "load": round_or_none(load), "reason": reason})
+            instant("governor.decide", fps=round(fps, 2), detect_width=self.detect_width, reason=reason)
+        self._apply()
+
+    def metrics(self) -> Dict[str, Any]:
+        now = self.clock()
+        return {
+            "fps":             round(self.fps, 2),
+            "detect_width":    self.detect_width,
+            "detect_ms":       round_or_none(self.detect_ms),
+            "target_ms":       self.target_ms,
+            "load":            round_or_none(self.last_load),
+            "confirmed_age_s": round(now - self.last_confirmed, 1) if self.last_confirmed is not None else None,
+            "reason":          self.reason,
+            "floor_fps":       self.min_fps,
+            "ceiling_fps":     self.max_fps,
+            "evaluations":     self.evaluations,
+            "changes":         self.changes,
+            "history":         list(self.history),
+        }
+
+    def _apply(self) -> None:
+        if self.pipeline is not None:
+            self.pipeline.max_fps = self.fps
+            self.pipeline.detect_width = self.detect_width
+
+
+def governor_from_config(config: Dict[str, Any], **kwargs) -> Governor:
+    """Governor des clés presence_* ; ValueError si une valeur est invalide."""
+    max_fps = config_number(config, "presence_fps", DEFAULT_MAX_FPS, minimum=0.1)
+    min_fps = config_number(config, "presence_min_fps", min(DEFAULT_MIN_FPS, max_fps), minimum=0.1)
+    if min_fps > max_fps:
+        raise ValueError("presence_min_fps doit être <= presence_fps")
+    width = config_int(config, "presence_detect_width", DEFAULT_MAX_WIDTH, minimum=WIDTHS[0])
+    return Governor(min_fps=min_fps, max_fps=max_fps,
+                    target_ms=config_number(config, "presence_target_detect_ms", DEFAULT_TARGET_MS, minimum=1.0),
+                    max_width=width, **kwargs)
@@ -0,0 +1,605 @@
+"""
+face/pipeline.py
+----------------
+Pipeline caméra en étages : capture → détection → reconnaissance.
+
+Chaque étage tourne dans son thread et communique par une FrameQueue
+bornée. Politique par défaut "la dernière frame gagne" : si l'étage
+suivant est occupé, la frame en attente la plus ancienne est jetée (et
+comptée) au lieu de s'accumuler. La latence reste donc bornée par un
+seul temps de traitement par étage, quel que soit l'étage le plus lent,
+et le débit est celui de l'étage le plus lent au lieu de leur somme.
+Pour traiter un enregistrement sans perte, drop=False rend les files
+bloquantes.
+
+    capture ──[FrameQueue]──► détection ──[FrameQueue]──► reconnaissance ──► on_result(frame)
+     (source)                 (Detector, image réduite)    (Encoder + matcher)
+
+Sources : CameraSource (cv2.VideoCapture sur camera_id) et VideoFileSource
+(fichier vidéo via cv2, ou pile de frames .npy (N, H, W, 3) RGB ouverte en
+mmap, utilisable sans caméra ni OpenCV).
+
+Détecteur : detect(rgb) → [(x, y, w, h, score)] en coordonnées relatives
+(0–1), donc indépendantes de la résolution de détection. Encodeur :
+encode(rgb, boxes) → [embedding] pour des boîtes (haut, droite, bas, gauche)
+en pixels, la convention de face_recognition.
+
+Avec un FaceTracker (face/tracker.py), l'étage de reconnaissance n'encode
+que les visages nouveaux, déplacés ou à revérifier ; les autres héritent
+de l'identité de leur piste.
+
+Avec un FrameRing (face/shmpool.py), la capture écrit chaque image
+directement dans un slot de mémoire partagée, libéré quand la frame est
+jetée ou traitée ; un encodeur à submit() (ProcessEncoder) reçoit alors
+l'indice du slot et jusqu'à `workers` frames sont encodées en parallèle.
+
+Avec un Governor (face/governor.py), max_fps et detect_width sont ajustés
+en continu d'après la latence de détection, la charge système et
+l'ancienneté de la dernière reconnaissance.
+
+Chaque étage mesure sa durée par frame (StageStats) ; metrics() agrège
+temps par étage, latence bout en bout, frames jetées par file et
+encodages effectués / évités.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+Box = Tuple[int, int, int, int]     # haut, droite, bas, gauche (pixels)
+
+_END = object()                     # fin de source, propagée d'étage en étage
+RESULT_TIMEOUT = 10.0               # s d'attente max d'un encodage soumis (worker bloqué)
+
+
+class Frame:
+    """Une image et ce que les étages en ont déduit."""
+
+    __slots__ = ("index", "ts", "pts", "image", "slot", "detections", "boxes", "embeddings",
+                 "matches", "encoded", "timings")
+
+    def __init__(self, index: int, ts: float, image, pts: Optional[float] = None,
+                 slot: Optional[int] = None):
+        self.index = index
+        self.ts = ts                    # time.monotonic() à la capture
+        self.pts = ts if pts is None else pts   # instant média (s) : position dans un enregistrement
+        self.image = image              # RGB (H, W, 3) uint8
+        self.slot = slot                # slot du FrameRing contenant l'image, le cas échéant
+        self.detections: List[Tuple[float, float, float, float, float]] = []
+        self.boxes: List[Box] = []
+        self.embeddings: List[Tuple[Box, "np.ndarray"]] = []    # visages encodés pour cette frame
+        self.matches: List[Tuple[Box, Optional[str], float]] = []
+        self.encoded = 0                # visages réellement encodés pour cette frame
+        self.timings: Dict[str, float] = {}
+
+
+class FrameQueue:
+    """
+    File bornée entre deux étages. Pleine : put() jette la plus ancienne
+    (drop_oldest=True, puis on_drop(élément)) ou attend de la place
+    (drop_oldest=False).
+    """
+
+    def __init__(self, maxsize: int = 1, drop_oldest: bool = True,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._items: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item) -> None:
+        dropped = None
+        with self._cond:
+            while len(self._items) >= self.maxsize and not self._closed:
+                if self.drop_oldest:
+                    dropped = self._items.popleft()
+                    self.dropped += 1
+                    break
+                self._cond.wait()
+            self._items.append(item)
+            self._cond.notify_all()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout: Optional[float] = None):
+        """Élément suivant, ou None si la file est vide après `timeout` ou fermée."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class StageStats:
+    """Durées d'un étage (ms) : dernière, moyenne, max, et débit."""
+
+    def __init__(self):
+        self.frames = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+        self.started = time.monotonic()
+
+    def record(self, ms: float) -> None:
+        self.frames += 1
+        self.last_ms = ms
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def to_dict(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "frames": self.frames,
+            "fps": round(self.frames / elapsed, 2),
+            "last_ms": round(self.last_ms, 3),
+            "mean_ms": round(self.total_ms / self.frames, 3) if self.frames else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+class CameraSource:
+    """Webcam `camera_id` via OpenCV (frames converties en RGB)."""
+
+    def __init__(self, camera_id: int = 0, width: Optional[int] = None, height: Optional[int] = None):
+        self.camera_id = camera_id
+        self.width = width
+        self.height = height
+        self.capture = None
+
+    def open(self) -> None:
+        if not CV2_AVAILABLE:
+            raise RuntimeError("opencv-python est requis pour la caméra")
+        self.capture = cv2.VideoCapture(self.camera_id)
+        if not self.capture.isOpened():
+            raise RuntimeError(f"caméra {self.camera_id} indisponible")
+        if self.width:
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+
+    def read(self, out=None):
+        """Frame RGB suivante (écrite dans `out` s'il est fourni), None si fin."""
+        ok, bgr = self.capture.read()
+        if not ok:
+            return None
+        return _to_rgb(bgr, out)
+
+    def close(self) -> None:
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class VideoFileSource:
+    """
+    Enregistrement rejoué comme une caméra : fichier vidéo (OpenCV) ou
+    pile .npy (N, H, W, 3) RGB. realtime=True cadence les frames à `fps`
+    (celui du fichier vidéo à défaut), loop=True reboucle en fin de fichier.
+    """
+
+    def __init__(self, path: str, fps: Optional[float] = None, realtime: bool = True, loop: bool = False):
+        self.path = str(path)
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.capture = None
+        self.frames = None
+        self.pts: Optional[float] = None    # position (s) de la dernière frame lue
+        self._pos = 0
+        self._next = 0.0
+        self._loops = 0
+
+    def open(self) -> None:
+        if self.path.endswith(".npy"):
+            self.frames = np.load(self.path, mmap_mode="r")
+            if self.frames.ndim != 4 or self.frames.shape[-1] != 3:
+                raise ValueError(f"{self.path} : pile (N, H, W, 3) attendue")
+            self.fps = self.fps or 30.0
+        else:
+            if not CV2_AVAILABLE:
+                raise RuntimeError("opencv-python est requis pour lire une vidéo (ou fournir un .npy)")
+            self.capture = cv2.VideoCapture(self.path)
+            if not self.capture.isOpened():
+                raise RuntimeError(f"{self.path} : vidéo illisible")
+            self.fps = self.fps or self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self._pos = 0
+        self._loops = 0
+        self._next = time.monotonic()
+
+    def read(self, out=None):
+        """Frame RGB suivante (écrite dans `out` s'il est fourni), None si fin."""
+        if self.realtime:
+            delay = self._next - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next = max(self._next + 1.0 / self.fps, time.monotonic() - 1.0 / self.fps)
+        image = self._read_one(out)
+        if image is None and self.loop and self._pos:
+            self._loops += self._pos
+            self._rewind()
+            image = self._read_one(out)
+        if image is not None:
+            self.pts = (self._loops + self._pos - 1) / self.fps
+        return image
+
+    def close(self) -> None:
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+        self.frames = None
+
+    def _read_one(self, out):
+        if self.frames is not None:
+            if self._pos >= len(self.frames):
+                return None
+            self._pos += 1
+            frame = self.frames[self._pos - 1]
+            if out is None:
+                return np.asarray(frame)
+            if out.shape != frame.shape:
+                raise ValueError(f"frame {frame.shape} incompatible avec le slot {out.shape}")
+            np.copyto(out, frame)
+            return out
+        ok, bgr = self.capture.read()
+        if not ok:
+            return None
+        self._pos += 1
+        return _to_rgb(bgr, out)
+
+    def _rewind(self) -> None:
+        self._pos = 0
+        if self.capture is not None:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+# ---------------------------------------------------------------------------
+# Détection / encodage
+# ---------------------------------------------------------------------------
+class MediaPipeDetector:
+    """Détection de visages MediaPipe (seuil `mediapipe_confidence`)."""
+
+    def __init__(self, confidence: float = 0.5, model: int = 0):
+        import mediapipe as mp
+
+        self._detector = mp.solutions.face_detection.FaceDetection(
+            model_selection=model, min_detection_confidence=confidence)
+
+    def detect(self, rgb) -> List[Tuple[float, float, float, float, float]]:
+        result = self._detector.process(rgb)
+        found = []
+        for det in result.detections or []:
+            box = det.location_data.relative_bounding_box
+            found.append((box.xmin, box.ymin, box.width, box.height, float(det.score[0])))
+        return found
+
+    def close(self) -> None:
+        self._detector.close()
+
+
+class DlibEncoder:
+    """Embeddings 128-d face_recognition (dlib) pour des boîtes connues."""
+
+    def __init__(self, model: str = "small", jitters: int = 1):
+        import face_recognition
+
+        self._encode = face_recognition.face_encodings
+        self.model = model
+        self.jitters = jitters
+
+    def encode(self, rgb, boxes: List[Box]) -> List["np.ndarray"]:
+        return self._encode(rgb, known_face_locations=boxes, num_jitters=self.jitters, model=self.model)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+class FacePipeline:
+    """
+    Trois threads (capture, détection, reconnaissance) reliés par des
+    FrameQueue. `matcher` est une Gallery, QuantizedGallery ou IVFIndex
+    (None : embeddings seuls, dans frame.embeddings, sans identification) ;
+    `on_result(frame)` est appelé dans le thread de reconnaissance.
+    `tracker` (FaceTracker, optionnel) limite les encodages.
+
+    `ring` (FrameRing, optionnel) reçoit les images capturées.
+
+    max_fps et detect_width sont relus à chaque frame : ils peuvent être
+    ajustés pendant que le pipeline tourne, par `governor` (Governor,
+    optionnel) notamment.
+    """
+
+    def __init__(self, source, detector, encoder, matcher, threshold: float,
+                 on_result: Optional[Callable[[Frame], None]] = None,
+                 queue_size: int = 1, drop: bool = True,
+                 max_fps: Optional[float] = None, detect_width: Optional[int] = None,
+                 tracker=None, ring=None, governor=None):
+        self.source = source
+        self.detector = detector
+        self.encoder = encoder
+        self.matcher = matcher
+        self.threshold = threshold
+        self.on_result = on_result
+        self.max_fps = max_fps
+        self.detect_width = detect_width
+        self.tracker = tracker
+        self.ring = ring
+        self.governor = governor
+
+        self.to_detect = FrameQueue(queue_size, drop_oldest=drop, on_drop=self._release)
+        self.to_recognize = FrameQueue(queue_size, drop_oldest=drop, on_drop=self._release)
+        self.stats = {name: StageStats() for name in ("capture", "detect", "recognize", "latency")}
+        self.captured = 0
+        self.encodings = 0
+        self.encodings_skipped = 0
+        self.ring_full = 0
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+        self._closing = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="fingerlock-capture", daemon=True),
+            threading.Thread(target=self._detect_loop, name="fingerlock-detect", daemon=True),
+            threading.Thread(target=self._recognize_loop, name="fingerlock-recognize", daemon=True),
+        ]
+        if governor is not None:
+            governor.attach(self)
+
+    # ── Cycle de vie ──
+    def start(self) -> "FacePipeline":
+        self.source.open()
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._closing.set()
+        self.to_detect.close()
+        self.to_recognize.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self.source.close()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attend la fin de la source (rejeu de fichier) ; False si timeout."""
+        return self.done.wait(timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "captured": self.captured,
+            "dropped": {"detect": self.to_detect.dropped, "recognize": self.to_recognize.dropped,
+                        "ring_full": self.ring_full},
+            "max_fps": self.max_fps,
+            "detect_width": self.detect_width,
+            "encodings": self.encodings,
+            "encodings_skipped": self.encodings_skipped,
+            "stages": {name: stats.to_dict() for name, stats in self.stats.items()},
+            "governor": self.governor.metrics() if self.governor is not None else None,
+        }
+
+    # ── Étages ──
+    def _capture_loop(self) -> None:
+        stats = self.stats["capture"]
+        next_at = time.monotonic()
+        try:
+            while not self._closing.is_set():
+                start = time.monotonic()
+                slot = self.ring.acquire() if self.ring is not None else None
+                if self.ring is not None and slot is None:
+                    # Anneau plein (encodage en retard) : frame lue puis jetée
+                    self.ring_full += 1
+                    if self.source.read() is None:
+                        break
+                    continue
+                image = self.source.read(out=self.ring.array[slot]) if slot is not None else self.source.read()
+                if image is None:
+                    self._release_slot(slot)
+                    break
+                now = time.monotonic()
+                frame = Frame(self.captured, now, image, getattr(self.source, "pts", None), slot)
+                frame.timings["capture"] = (now - start) * 1000
+                stats.record(frame.timings["capture"])
+                self.captured += 1
+                self.to_detect.put(frame)
+
+                if self.max_fps:
+                    next_at = max(next_at + 1.0 / self.max_fps, now)
+                    self._closing.wait(next_at - time.monotonic())
+        except Exception as e:
+            self.error = e
+        self.to_detect.put(_END)
+
+    def _detect_loop(self) -> None:
+        stats = self.stats["detect"]
+        while not self._closing.is_set():
+            frame = self.to_detect.get(timeout=0.5)
+            if frame is None:
+                continue
+            if frame is _END:
+                self.to_recognize.put(_END)
+                return
+            start = time.monotonic()
+            try:
+                self._detect(frame)
+            except Exception as e:
+                self.error = e
+                self._release(frame)
+                continue
+            frame.timings["detect"] = (time.monotonic() - start) * 1000
+            stats.record(frame.timings["detect"])
+            if self.governor is not None:
+                self.governor.observe_detect(frame.timings["detect"])
+            self.to_recognize.put(frame)
+
+    def _detect(self, frame: Frame) -> None:
+        image = frame.image
+        small = _downscale(image, self.detect_width)
+        frame.detections = self.detector.detect(small)
+        height, width = image.shape[:2]
+        frame.boxes = [_to_box(d, width, height) for d in frame.detections]
+
+    def _recognize_loop(self) -> None:
+        """
+        Étage de reconnaissance. Avec un encodeur à submit(), jusqu'à
+        `encoder.workers` frames sont en vol ; les résultats sont rendus
+        dans l'ordre des frames.
+        """
+        in_flight = getattr(self.encoder, "workers", 1) if hasattr(self.encoder, "submit") else 0
+        pending: deque = deque()     # (frame, pistes, indices encodés, Future, début)
+        ended = False
+        while not self._closing.is_set():
+            while pending and (ended or len(pending) > in_flight or pending[0][3].done()):
+                self._complete(*pending.popleft())
+            if ended and not pending:
+                self.done.set()
+                return
+            frame = self.to_recognize.get(timeout=0.002 if pending else 0.5)
+            if frame is None:
+                continue
+            if frame is _END:
+                ended = True
+                continue
+            start = time.monotonic()
+            future: Future = Future()
+            tracks, todo = None, []
+            try:
+                tracks, todo = self._plan(frame)
+                boxes = [frame.boxes[i] for i in todo]
+                if not boxes:
+                    future.set_result([])
+                elif in_flight:
+                    future = self.encoder.submit(frame.image, boxes)
+                else:
+                    future.set_result(self.encoder.encode(frame.image, boxes))
+            except Exception as e:
+                self.error = e
+                self._failed(tracks, todo)
+                self._release(frame)
+                continue
+            pending.append((frame, tracks, todo, future, start))
+
+    def _plan(self, frame: Frame):
+        """Pistes de la frame et indices des boîtes à encoder."""
+        if self.tracker is None:
+            return None, list(range(len(frame.boxes)))
+        tracks = self.tracker.update(frame.boxes, frame.pts)
+        todo = [i for i, (_, encode) in enumerate(tracks) if encode]
+        for i in todo:
+            # Vérification en cours : pas de second encodage de la même piste
+            # par les frames suivantes en attendant le résultat
+            self.tracker.pending(tracks[i][0])
+        return tracks, todo
+
+    def _failed(self, tracks, todo) -> None:
+        """Encodage perdu : les pistes concernées n'ont plus d'identité vérifiée."""
+        if tracks is not None:
+            for i in todo:
+                self.tracker.failed(tracks[i][0])
+
+    def _complete(self, frame: Frame, tracks, todo, future: Future, start: float) -> None:
+        try:
+            embeddings = future.result(timeout=RESULT_TIMEOUT)
+        except Exception as e:
+            self.error = e
+            self._failed(tracks, todo)
+            embeddings = []
+        encoded = list(zip(todo, embeddings))
+        frame.embeddings = [(frame.boxes[i], embedding) for i, embedding in encoded]
+        results = {}
+        if self.matcher is not None:
+            for i, embedding in encoded:
+                results[i] = self.matcher.match(embedding, self.threshold)
+                if tracks is not None:
+                    self.tracker.verified(tracks[i][0], *results[i], frame.pts)
+        frame.encoded = len(encoded)
+        self.encodings += len(encoded)
+        self.encodings_skipped += len(frame.boxes) - len(encoded)
+
+        for i, box in enumerate(frame.boxes):
+            if i in results:
+                user, distance = results[i]
+            elif tracks is not None:
+                user, distance = tracks[i][0].user, tracks[i][0].distance
+            else:
+                continue
+            frame.matches.append((box, user, distance))
+            if user is not None and self.governor is not None:
+                self.governor.confirmed()
+
+        now = time.monotonic()
+        frame.timings["recognize"] = (now - start) * 1000
+        self.stats["recognize"].record(frame.timings["recognize"])
+        self.stats["latency"].record((now - frame.ts) * 1000)
+        try:
+            if self.on_result is not None:
+                self.on_result(frame)
+        finally:
+            self._release(frame)
+
+    def _release(self, frame) -> None:
+        """Rend le slot de l'anneau occupé par `frame` (frame jetée ou traitée)."""
+        if isinstance(frame, Frame) and frame.slot is not None:
+            self._release_slot(frame.slot)
+            frame.slot = None
+            frame.image = None
+
+    def _release_slot(self, slot: Optional[int]) -> None:
+        if slot is not None and self.ring is not None:
+            self.ring.release(slot)
+
+
+def _downscale(image, width: Optional[int]):
+    """Image réduite à ~`width` pixels de large pour la détection."""
+    if not width or image.shape[1] <= width:
+        return image
+    if CV2_AVAILABLE:
+        height = max(1, round(image.shape[0] * width / image.shape[1]))
+        return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    step = math.ceil(image.shape[1] / width)
+    return np.ascontiguousarray(image[::step, ::step])
+
+
+def _to_rgb(bgr, out=None):
+    if out is None:
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    if out.shape != bgr.shape:
+        raise ValueError(f"frame {bgr.shape} incompatible avec le slot {out.shape}")
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=out)
+
+
+def _to_box(detection, width: int, height: int) -> Box:
+    """Boîte relative (x, y, w, h) → (haut, droite, bas, gauche) en pixels, bornée à l'image."""
+    x, y, w, h = detection[:4]
+    left = min(max(int(x * width), 0), width - 1)
+    top = min(max(int(y * height), 0), height - 1)
+    right = min(max(int((x + w) * width), left + 1), width)
+    bottom = min(max(int((y + h) * height), top + 1), height)
+    return top, right, bottom, left
@@ -0,0 +1,261 @@
+"""
+face/presence.py
+----------------
+Présence fusionnée : activité evdev + caméra.
+
+Tant que le clavier ou la souris servent, l'activité evdev prouve déjà la
+présence : la caméra reste fermée (périphérique libéré, aucun thread de
+capture, détection ni encodage), le watcher ne coûte que son polling
+evdev. Le pipeline caméra ne démarre que `presence_lead_seconds` avant
+l'échéance d'inactivité, le temps d'ouvrir la caméra et de reconnaître
+un visage :
+
+    frappe ──────────────┐  caméra fermée
+    inactivité ≥ lock_delay − lead : caméra ouverte
+    visage enrôlé vu ────┤  présence confirmée : l'échéance est repoussée
+                         │  ("toujours là, en lecture")
+    plus de visage ──────┘  lock_delay après la dernière confirmation : verrouillage
+
+La reprise de l'activité, une pause ou le verrouillage referment la
+caméra. Les modèles (détecteur, encodeur, galerie) sont chargés à la
+première ouverture et gardés entre deux réveils : seul le périphérique
+est rendu. L'ouverture et la fermeture se font dans un thread dédié,
+jamais dans la boucle du watcher.
+
+Configuration (~/.fingerlock/config.yaml) :
+
+    presence_mode: fusion          # off (défaut) | fusion
+    presence_lead_seconds: 3       # avance de l'ouverture sur l'échéance
+    presence_max_extension: 0      # report max après la dernière activité (s, 0 = sans limite)
+
+Cadence et résolution de détection sont régulées par un Governor
+(face/governor.py : presence_fps, presence_min_fps, ...).
+
+Caméra indisponible ou galerie illisible : l'erreur est journalisée et le
+verrouillage retombe sur la seule inactivité evdev (nouvel essai toutes
+les RETRY_INTERVAL secondes).
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fingerlock.utils.logger import log_error, log_presence
+from fingerlock.utils.trace import instant, span
+from fingerlock.utils.values import config_number
+
+MODES = ("off", "fusion")
+
+DEFAULT_LEAD = 3.0            # s
+DEFAULT_MAX_EXTENSION = 0.0   # s, 0 = sans limite
+RETRY_INTERVAL = 30.0         # s entre deux tentatives d'ouverture après un échec
+
+
+class PresenceGate:
+    """
+    Pilote le pipeline caméra d'après l'activité evdev. La boucle du
+    watcher appelle update() à chaque tour ; le reste vit dans le thread
+    "fingerlock-presence" et dans les threads du pipeline.
+
+    `factory(on_result)` construit un pipeline non démarré (interface de
+    FacePipeline : start, stop, done, error, metrics) ; par défaut la
+    caméra `camera_id` et les modèles de la config. `clock` donne l'heure
+    murale, dans la même base que ActivityMonitor.last_activity.
+
+    threaded=False : pas de thread, ouverture et fermeture faites dans
+    update() / sleep() (simulation à horloge virtuelle, déterministe).
+    """
+
+    def __init__(self, config: Dict[str, Any], lead: float = DEFAULT_LEAD,
+                 max_extension: float = DEFAULT_MAX_EXTENSION,
+                 factory: Optional[Callable[[Callable], Any]] = None,
+                 clock: Callable[[], float] = time.time, threaded: bool = True):
+        self.config = config
+        self.lead = lead
+        self.max_extension = max_extension
+        self.factory = factory or self._camera_pipeline
+        self.clock = clock
+        self.last_confirmed = 0.0
+        self.last_user: Optional[str] = None
+        self.wakes = self.confirmed_frames = self.extensions = self.failures = 0
+        self.camera_seconds = 0.0
+        self.error: Optional[str] = None
+        self._pipeline = None
+        self._opened_at = 0.0
+        self._want = False
+        self._extended = False
+        self._retry_at = 0.0
+        self._backends = None
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="fingerlock-presence", daemon=True)
+            self._thread.start()
+
+    @property
+    def camera_on(self) -> bool:
+        pipeline = self._pipeline
+        return pipeline is not None and not pipeline.done.is_set()
+
+    # ── Boucle du watcher ──
+    def update(self, now: float, last_activity: float, lock_delay: float, armed: bool = True) -> float:
+        """
+        Ouvre ou ferme la caméra selon l'inactivité et retourne l'instant
+        de la dernière présence : dernière activité evdev, ou dernière
+        confirmation par la caméra si elle est plus récente. `armed=False`
+        (pause, écran verrouillé) garde la caméra fermée.
+        """
+        want = armed and now - last_activity >= lock_delay - self.lead
+        if want != self._want:
+            self._want = want
+            self._extended = False
+            self._signal()
+        elif want and not self.camera_on and now >= self._retry_at:
+            self._signal()      # caméra en cours d'ouverture, tombée ou en échec
+
+        if not want or self.last_confirmed <= last_activity:
+            return last_activity
+        seen = self.last_confirmed
+        if self.max_extension:
+            seen = min(seen, last_activity + self.max_extension)
+        if now - last_activity >= lock_delay and not self._extended:
+            self._extended = True
+            self.extensions += 1
+            instant("presence.extend", user=self.last_user)
+            log_presence(f"Présence confirmée ({self.last_user}) : verrouillage repoussé", user=self.last_user)
+        return seen
+
+    def sleep(self) -> None:
+        """Ferme la caméra sans attendre le prochain update() (verrouillage)."""
+        if self._want:
+            self._want = False
+            self._signal()
+
+    def metrics(self) -> Dict[str, Any]:
+        now = self.clock()
+        pipeline = self._pipeline
+        on = self.camera_on
+        return {
+            "camera":           "on" if on else "off",
+            "wakes":            self.wakes,
+            "camera_s":         round(self.camera_seconds + (now - self._opened_at if on else 0.0), 1),
+            "confirmed_frames": self.confirmed_frames,
+            "extensions":       self.extensions,
+            "last_user":        self.last_user,
+            "confirmed_age_s":  round(now - self.last_confirmed, 1) if self.last_confirmed else None,
+            "failures":         self.failures,
+            "error":            self.error,
+            "pipeline":         pipeline.metrics() if on else None,
+        }
+
+    def close(self, timeout: float = 3.0) -> None:
+        self._closing.set()
+        if self._thread is None:
+            self._close_camera()
+            return
+        self._wake.set()
+        self._thread.join(timeout)
+
+    # ── Thread de présence ──
+    def _signal(self) -> None:
+        if self._thread is None:
+            self._step()
+        else:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closing.is_set():
+                break
+            self._step()
+        self._close_camera()
+
+    def _step(self) -> None:
+        if self._pipeline is not None and (not self._want or self._pipeline.done.is_set()):
+            self._close_camera()
+        if self._want and self._pipeline is None and self.clock() >= self._retry_at:
+            self._open_camera()
+
+    def _open_camera(self) -> None:
+        try:
+            with span("presence.open"):
+                pipeline = self.factory(self._on_result)
+                pipeline.start()
+        except Exception as e:
+            self._failed(f"{type(e).__name__}: {e}")
+            return
+        self._pipeline = pipeline
+        self._opened_at = self.clock()
+        self.wakes += 1
+        self.error = None
+
+    def _close_camera(self) -> None:
+        pipeline, self._pipeline = self._pipeline, None
+        if pipeline is None:
+            return
+        with span("presence.close"):
+            pipeline.stop()
+        self.camera_seconds += self.clock() - self._opened_at
+        if pipeline.error is not None:
+            self._failed(f"{type(pipeline.error).__name__}: {pipeline.error}")
+        elif self._want and not self._closing.is_set():
+            self._failed("flux caméra interrompu")
+
+    def _failed(self, message: str) -> None:
+        self.failures += 1
+        self._retry_at = self.clock() + RETRY_INTERVAL
+        if message != self.error:
+            log_error(f"Caméra de présence indisponible, inactivité seule : {message}")
+        self.error = message
+
+    def _on_result(self, frame) -> None:
+        """Thread de reconnaissance : un visage enrôlé vaut confirmation."""
+        for _, user, _ in frame.matches:
+            if user is not None:
+                self.last_confirmed = self.clock()
+                self.last_user = user
+                self.confirmed_frames += 1
+                return
+
+    def _camera_pipeline(self, on_result: Callable):
+        from fingerlock.face.governor import governor_from_config
+        from fingerlock.face.pipeline import CameraSource, FacePipeline
+        from fingerlock.face.tracker import tracker_from_config
+
+        config = self.config
+        if self._backends is None:
+            from fingerlock.face.ann import load_matcher
+            from fingerlock.face.pipeline import DlibEncoder, MediaPipeDetector
+            with span("presence.load_models"):
+                self._backends = (MediaPipeDetector(config.get("mediapipe_confidence", 0.5)),
+                                  DlibEncoder(), load_matcher(config))
+        detector, encoder, matcher = self._backends
+        return FacePipeline(CameraSource(config.get("camera_id", 0)), detector, encoder, matcher,
+                            config.get("recognition_threshold", 0.6), on_result=on_result,
+                            tracker=tracker_from_config(config), governor=governor_from_config(config))
+
+
+def presence_from_config(config: Dict[str, Any], **kwargs) -> Optional[PresenceGate]:
+    """
+    PresenceGate pour `presence_mode` (None si "off"). Lève ValueError si
+    une valeur est invalide ou si aucune galerie n'est enrôlée : à appeler
+    au démarrage / rechargement du watcher.
+    """
+    mode = config.get("presence_mode", "off")
+    if mode not in MODES:
+        raise ValueError(f"presence_mode : {' | '.join(MODES)}")
+    if mode == "off":
+        return None
+    lead = config_number(config, "presence_lead_seconds", DEFAULT_LEAD, minimum=0.0)
+    max_extension = config_number(config, "presence_max_extension", DEFAULT_MAX_EXTENSION, minimum=0.0)
+    if "factory" not in kwargs and not any(
+            config.get(key) and os.path.isfile(config[key]) for key in ("gallery_path", "embedding_path")):
+        raise ValueError("presence_mode fusion : aucune galerie enrôlée (gallery_path / embedding_path)")
+    if "factory" not in kwargs:
+        from fingerlock.face.governor import governor_from_config
+        governor_from_config(config)     # validation des clés de régulation
+    return PresenceGate(config, lead=lead, max_extension=max_extension, **kwargs)
@@ -0,0 +1,314 @@
+"""
+face/shmpool.py
+---------------
+Encodage des visages dans un pool de processus, frames en mémoire partagée.
+
+L'encodage dlib est lié au CPU et garde le GIL assez longtemps pour
+affamer le thread de capture. Il est donc déporté dans des processus.
+Pour ne pas sérialiser chaque image (~1 Mo en 640×480), les frames
+vivent dans un anneau préalloué de `multiprocessing.shared_memory` :
+
+    FrameRing   SharedMemory (slots, H, W, 3) uint8, vue NumPy par slot
+                acquire() → indice de slot libre, release(slot)
+
+La capture écrit directement dans un slot (CameraSource / VideoFileSource
+acceptent `out=`). Seul l'indice du slot et les boîtes transitent vers le
+worker, qui lit l'image en place ; les embeddings (128 floats) reviennent
+par le même tube.
+
+ProcessEncoder expose submit(image, boxes) → Future : une image qui est une
+vue d'un slot de l'anneau part sans copie, toute autre image est d'abord
+copiée dans un slot temporaire. FacePipeline garde jusqu'à `workers`
+frames en vol avec un encodeur de ce type (débit × nb de cœurs).
+
+Chaque worker a son propre tube (Pipe) plutôt qu'une file partagée : une
+multiprocessing.Queue partage entre processus des verrous qu'un worker
+tué (segfault dlib, OOM killer) peut emporter, bloquant tous les autres.
+Le parent sait ainsi quelles tâches chaque worker détient. Le thread
+collecteur attend à la fois les tubes et les sentinelles des processus :
+un worker mort fait échouer ses tâches (slots temporaires rendus), puis
+est relancé, au plus MAX_RESTARTS fois ; au-delà, le pool est déclaré
+hors service et tout Future en attente ou à venir échoue.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import get_context, shared_memory
+from multiprocessing.connection import wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+WORKER_CHECK_INTERVAL = 0.5    # s, attente max du collecteur (fermeture, contrôle des workers)
+MAX_RESTARTS = 3               # relances de workers morts avant de déclarer le pool hors service
+
+
+class FrameRing:
+    """Anneau de `slots` images (H, W, 3) uint8 en mémoire partagée."""
+
+    def __init__(self, slots: int, shape: Sequence[int], name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.slot_bytes = int(np.prod(self.shape))
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_bytes)
+        else:
+            self.shm = _attach(name)
+        self.array = np.ndarray((slots, *self.shape), dtype=np.uint8, buffer=self.shm.buf)
+        self._base = self.array.__array_interface__["data"][0]
+        self._free = deque(range(slots))
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def acquire(self) -> Optional[int]:
+        """Indice d'un slot libre, ou None si tous sont en cours d'utilisation."""
+        with self._lock:
+            return self._free.popleft() if self._free else None
+
+    def release(self, slot: int) -> None:
+        with self._lock:
+            self._free.append(slot)
+
+    def free(self) -> int:
+        return len(self._free)
+
+    def slot_of(self, image) -> Optional[int]:
+        """Slot dont `image` est la vue complète, sinon None."""
+        if not isinstance(image, np.ndarray) or image.shape != self.shape:
+            return None
+        offset = image.__array_interface__["data"][0] - self._base
+        if offset < 0 or offset % self.slot_bytes or offset // self.slot_bytes >= self.slots:
+            return None
+        return offset // self.slot_bytes
+
+    def close(self) -> None:
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class ProcessEncoder:
+    """
+    Pool de processus d'encodage. `factory(*factory_args)` est appelé dans
+    chaque worker pour construire l'encodeur réel (DlibEncoder par défaut) ;
+    il doit être importable par nom (contexte "spawn").
+    """
+
+    def __init__(self, ring: FrameRing, factory: Optional[Callable] = None, factory_args: tuple = (),
+                 workers: Optional[int] = None, context: str = "spawn"):
+        if factory is None:
+            from fingerlock.face.pipeline import DlibEncoder
+            factory = DlibEncoder
+        self.ring = ring
+        self.workers = workers or os.cpu_count() or 1
+        self._ctx = get_context(context)
+        self._factory = (factory, factory_args)
+        # tâche → (Future, slot temporaire, indice du worker)
+        self._futures: Dict[int, Tuple[Future, Optional[int], int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closing = False
+        self.stats = {"jobs": 0, "copied": 0, "worker_ms": 0.0, "worker_deaths": 0}
+        self.restarts = 0
+        self.broken: Optional[str] = None
+        self._procs, self._conns = [], []
+        self._load = [0] * self.workers          # tâches en cours par worker
+        for i in range(self.workers):
+            proc, conn = self._spawn(i)
+            self._procs.append(proc)
+            self._conns.append(conn)
+        self._collector = threading.Thread(target=self._collect, name="fingerlock-encoder-results", daemon=True)
+        self._collector.start()
+
+    def submit(self, image, boxes: List[Box]) -> Future:
+        """Encode en arrière-plan ; le Future donne la liste des embeddings."""
+        future: Future = Future()
+        if self.broken is not None:
+            future.set_exception(RuntimeError(self.broken))
+            return future
+        slot, temp = self.ring.slot_of(image), None
+        if slot is None:
+            temp = slot = self._acquire_wait()
+            h, w = image.shape[:2]
+            self.ring.array[slot, :h, :w] = image
+            self.stats["copied"] += 1
+        job = next(self._ids)
+        h, w = image.shape[:2]
+        task = (job, slot, h, w, [tuple(int(v) for v in b) for b in boxes])
+        with self._lock:
+            live = [i for i, conn in enumerate(self._conns) if conn is not None]
+            if not live:
+                error = self.broken or "aucun worker d'encodage disponible (relance en cours)"
+            else:
+                index = min(live, key=self._load.__getitem__)
+                self._load[index] += 1
+                self._futures[job] = (future, temp, index)
+                self.stats["jobs"] += 1
+                try:
+                    self._conns[index].send(task)
+                except OSError:
+                    pass    # worker mort : le collecteur fera échouer la tâche
+                return future
+        if temp is not None:
+            self.ring.release(temp)
+        future.set_exception(RuntimeError(error))
+        return future
+
+    def encode(self, image, boxes: List[Box]) -> List["np.ndarray"]:
+        return self.submit(image, boxes).result()
+
+    def close(self, timeout: float = 2.0) -> None:
+        self._closing = True
+        with self._lock:
+            for conn in self._conns:
+                try:
+                    if conn is not None:
+                        conn.send(None)
+                except OSError:
+                    pass
+        for proc in self._procs:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+        self._collector.join(timeout)
+        for conn in self._conns:
+            if conn is not None:
+                conn.close()
+        self._fail_all("encodeur fermé")
+
+    def _spawn(self, index: int):
+        factory, factory_args = self._factory
+        ring = self.ring
+        conn, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_worker, name=f"fingerlock-encoder-{index}", daemon=True,
+                                 args=(ring.name, ring.shape, ring.slots, factory, factory_args, child))
+        proc.start()
+        child.close()
+        return proc, conn
+
+    def _acquire_wait(self) -> int:
+        while True:
+            slot = self.ring.acquire()
+            if slot is not None:
+                return slot
+            time.sleep(0.001)
+
+    def _collect(self) -> None:
+        while not self._closing and self.broken is None:
+            with self._lock:
+                workers = [(i, proc, conn) for i, (proc, conn) in enumerate(zip(self._procs, self._conns))
+                           if conn is not None]
+            ready = wait([conn for _, _, conn in workers] + [proc.sentinel for _, proc, _ in workers],
+                         timeout=WORKER_CHECK_INTERVAL)
+            for _, _, conn in workers:
+                if conn in ready:
+                    self._drain(conn)
+            for index, proc, _ in workers:
+                if proc.sentinel in ready and not self._closing:
+                    self._restart(index, proc)
+
+    def _drain(self, conn) -> None:
+        """Résultats disponibles sur `conn` (ceux d'un worker mort compris)."""
+        try:
+            while conn.poll():
+                job, embeddings, error, ms = conn.recv()
+                self.stats["worker_ms"] += ms
+                future = self._pop(job)
+                if future is None:
+                    continue
+                if error is not None:
+                    future.set_exception(RuntimeError(error))
+                else:
+                    future.set_result(embeddings)
+        except (EOFError, OSError):
+            pass
+
+    def _restart(self, index: int, proc) -> None:
+        """Worker mort : ses tâches échouent, puis il est relancé."""
+        proc.join()
+        with self._lock:
+            # Hors rotation : submit() ne lui confie plus rien
+            conn, self._conns[index] = self._conns[index], None
+        self._drain(conn)
+        conn.close()
+        reason = f"worker {proc.name} mort (code {proc.exitcode})"
+        self.stats["worker_deaths"] += 1
+        with self._lock:
+            jobs = [job for job, (_, _, i) in self._futures.items() if i == index]
+        for job in jobs:
+            self._fail(job, reason)
+        if self.restarts >= MAX_RESTARTS:
+            self.broken = f"encodeur hors service : {reason}"
+            self._fail_all(self.broken)
+            return
+        self.restarts += 1
+        new_proc, new_conn = self._spawn(index)
+        with self._lock:
+            self._procs[index], self._conns[index] = new_proc, new_conn
+
+    def _pop(self, job: int) -> Optional[Future]:
+        """Future de `job` (None si déjà rendu) ; son slot temporaire est libéré."""
+        with self._lock:
+            future, temp, index = self._futures.pop(job, (None, None, None))
+            if index is not None:
+                self._load[index] -= 1
+        if temp is not None:
+            self.ring.release(temp)
+        return future
+
+    def _fail(self, job: int, error: str) -> None:
+        future = self._pop(job)
+        if future is not None:
+            future.set_exception(RuntimeError(error))
+
+    def _fail_all(self, error: str) -> None:
+        with self._lock:
+            jobs = list(self._futures)
+        for job in jobs:
+            self._fail(job, error)
+
+
+def _worker(name, shape, slots, factory, factory_args, conn) -> None:
+    ring = FrameRing(slots, shape, name=name)
+    try:
+        encoder = factory(*factory_args)
+    except Exception as e:
+        # Chaque tâche échouera avec la cause : le parent la verra dans ses Futures
+        encoder, init_error = None, f"initialisation de l'encodeur : {type(e).__name__}: {e}"
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break       # parent disparu
+        if task is None:
+            break
+        job, slot, h, w, boxes = task
+        start = time.monotonic()
+        if encoder is None:
+            conn.send((job, None, init_error, 0.0))
+            continue
+        try:
+            embeddings = [np.asarray(e) for e in encoder.encode(ring.array[slot, :h, :w], boxes)]
+            conn.send((job, embeddings, None, (time.monotonic() - start) * 1000))
+        except Exception as e:
+            conn.send((job, None, f"{type(e).__name__}: {e}", (time.monotonic() - start) * 1000))
+    ring.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Ouvre un segment existant. Les workers (spawn ou fork) partagent le
+    resource_tracker du parent : seul le propriétaire (unlink) le libère.
+    """
+    return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,196 @@
+"""
+face/store.py
+-------------
+Galerie compacte sur disque (float16 ou int8 quantifié), ouverte en mmap.
+
+Disposition du fichier (sections alignées sur 64 octets) :
+    en-tête     magic "FLGQ", version, type, nb lignes, dimension, nb utilisateurs,
+                longueur de la liste d'utilisateurs
+    users       identifiants UTF-8 séparés par "\\n"
+    offsets     int64   (N+1,)   lignes de l'utilisateur i : offsets[i]:offsets[i+1]
+    sq_norms    float32 (R,)     ||e||² des lignes déquantifiées
+    scales      float32 (R,)     échelle par ligne (int8 uniquement)
+    rows        float16 | int8 (R, D)
+
+int8 : quantification symétrique par ligne, e ≈ scale · x avec
+scale = max|e| / 127. Le produit scalaire se calcule sur la ligne brute
+puis est multiplié par son échelle : e·q = scale · (x·q).
+
+open_store() ne lit que l'en-tête : les sections sont des np.memmap en
+lecture seule, donc l'ouverture est instantanée et les pages sont
+partagées (cache du noyau) entre tous les processus qui ouvrent le fichier.
+Le matching parcourt les lignes par blocs de CHUNK_ROWS converties en
+float32 dans un tampon préalloué.
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fingerlock.face.gallery import Gallery, _distance
+
+STORE_SUFFIX = ".flq"
+CHUNK_ROWS = 4096
+
+_MAGIC = b"FLGQ"
+_HEADER = struct.Struct("<4sHHIIII")   # magic, version, type, rows, dim, users, users_len
+_VERSION = 1
+_ALIGN = 64
+
+_KINDS = {"float16": (1, np.float16), "int8": (2, np.int8)}
+_KIND_NAMES = {code: name for name, (code, _) in _KINDS.items()}
+
+
+def write_store(path, gallery: Gallery, kind: str = "int8") -> int:
+    """Écrit `gallery` quantifiée (float16 | int8) ; retourne la taille en octets."""
+    if kind not in _KINDS:
+        raise ValueError(f"type de stockage : {' | '.join(_KINDS)}")
+    code, dtype = _KINDS[kind]
+    rows = gallery.embeddings
+
+    if kind == "int8":
+        peak = np.abs(rows).max(axis=1)
+        scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+        data = np.clip(np.rint(rows / scales[:, None]), -127, 127).astype(np.int8)
+        restored = data.astype(np.float32) * scales[:, None]
+    else:
+        scales = None
+        data = rows.astype(np.float16)
+        restored = data.astype(np.float32)
+    sq_norms = np.einsum("ij,ij->i", restored, restored).astype(np.float32)
+
+    users = "\n".join(gallery.users).encode("utf-8")
+    header = _HEADER.pack(_MAGIC, _VERSION, code, len(rows), gallery.dim, len(gallery.users), len(users))
+    sections = [header + users, gallery.offsets.astype(np.int64).tobytes(), sq_norms.tobytes()]
+    if scales is not None:
+        sections.append(scales.tobytes())
+    sections.append(np.ascontiguousarray(data).tobytes())
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    size = 0
+    with open(tmp, "wb") as f:
+        for blob in sections:
+            f.write(blob)
+            f.write(b"\0" * _padding(len(blob)))
+            size += len(blob) + _padding(len(blob))
+    os.replace(tmp, path)
+    return size
+
+
+def open_store(path) -> "QuantizedGallery":
+    """Ouvre un fichier écrit par write_store() sans en charger les lignes."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            raise ValueError(f"{path} : fichier tronqué")
+        magic, version, code, n_rows, dim, n_users, users_len = _HEADER.unpack(head)
+        if magic != _MAGIC or version != _VERSION or code not in _KIND_NAMES:
+            raise ValueError(f"{path} : galerie quantifiée invalide")
+        users = f.read(users_len).decode("utf-8").split("\n") if n_users else []
+
+    kind = _KIND_NAMES[code]
+    pos = _aligned(_HEADER.size + users_len)
+
+    def section(dtype, shape):
+        nonlocal pos
+        arr = np.memmap(path, dtype=dtype, mode="r", offset=pos, shape=shape)
+        pos = _aligned(pos + arr.nbytes)
+        return arr
+
+    offsets = section(np.int64, (n_users + 1,))
+    sq_norms = section(np.float32, (n_rows,))
+    scales = section(np.float32, (n_rows,)) if kind == "int8" else None
+    data = section(_KINDS[kind][1], (n_rows, dim))
+    return QuantizedGallery(path, kind, users, offsets, sq_norms, scales, data)
+
+
+class QuantizedGallery:
+    """Galerie en lecture seule adossée au mmap ; même interface de match que Gallery."""
+
+    def __init__(self, path: Path, kind: str, users: List[str], offsets, sq_norms, scales, data):
+        if len(users) != len(offsets) - 1 or (len(offsets) and offsets[-1] != len(data)):
+            raise ValueError(f"{path} : offsets incohérents")
+        self.path = path
+        self.kind = kind
+        self.users = users
+        self.offsets = offsets
+        self.sq_norms = sq_norms
+        self.scales = scales
+        self.data = data
+        self.row_user = np.repeat(np.arange(len(users), dtype=np.int32), np.diff(offsets))
+        chunk = min(CHUNK_ROWS, max(1, len(data)))
+        self._block = np.empty((chunk, self.dim), dtype=np.float32)
+        self._dots = np.empty(chunk, dtype=np.float32)
+        self._query = np.empty(self.dim, dtype=np.float32)
+
+    @property
+    def dim(self) -> int:
+        return self.data.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def rows(self, user: str) -> "np.ndarray":
+        """Lignes déquantifiées (float32) de `user`."""
+        i = self.users.index(user)
+        return self._restore(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def to_gallery(self) -> Gallery:
+        """Galerie float32 en mémoire (déquantifiée)."""
+        return Gallery(self.users, self._restore(0, len(self)), np.asarray(self.offsets))
+
+    def match(self, embedding, threshold: Optional[float] = None) -> Tuple[Optional[str], float]:
+        q = self._query
+        q[:] = embedding
+        best_row, best = -1, np.inf
+        for start in range(0, len(self), len(self._block)):
+            dots = self._chunk_d2(q, start)
+            i = int(dots.argmin())
+            if dots[i] < best:
+                best_row, best = start + i, float(dots[i])
+        distance = _distance(best + np.dot(q, q))
+        if threshold is not None and distance > threshold:
+            return None, distance
+        return self.users[self.row_user[best_row]], distance
+
+    def user_distances(self, embedding) -> Dict[str, float]:
+        q = np.asarray(embedding, dtype=np.float32)
+        d2 = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), len(self._block)):
+            part = self._chunk_d2(q, start)
+            d2[start:start + len(part)] = part
+        best = np.minimum.reduceat(d2 + np.dot(q, q), np.asarray(self.offsets[:-1]))
+        return {user: _distance(v) for user, v in zip(self.users, best)}
+
+    def _chunk_d2(self, q, start: int) -> "np.ndarray":
+        """||e||² - 2·e·q pour les lignes [start, start + CHUNK_ROWS) (tampon réutilisé)."""
+        stop = min(start + len(self._block), len(self))
+        n = stop - start
+        block = self._block[:n]
+        np.copyto(block, self.data[start:stop], casting="unsafe")
+        dots = np.dot(block, q, out=self._dots[:n])
+        if self.scales is not None:
+            dots *= self.scales[start:stop]
+        dots *= -2.0
+        dots += self.sq_norms[start:stop]
+        return dots
+
+    def _restore(self, start: int, stop: int) -> "np.ndarray":
+        rows = np.asarray(self.data[start:stop], dtype=np.float32)
+        if self.scales is not None:
+            rows = rows * self.scales[start:stop, None]
+        return rows
+
+
+def _padding(n: int) -> int:
+    return -n % _ALIGN
+
+
+def _aligned(n: int) -> int:
+    return n + _padding(n)
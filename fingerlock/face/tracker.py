@@ -0,0 +1,172 @@
+"""
+face/tracker.py
+---------------
+Suivi de visages entre frames pour n'encoder qu'à bon escient.
+
+L'embedding dlib 128-d est de loin l'étape la plus chère du chemin
+visage. Le tracker associe les boîtes détectées d'une frame aux pistes
+existantes (IoU, avec repli sur la distance des centres pour un
+mouvement rapide) et porte l'identité d'une frame à l'autre. Une boîte
+n'est encodée que si :
+    - c'est un nouveau visage (aucune piste associée),
+    - la boîte a bougé nettement depuis la dernière vérification
+      (IoU avec la boîte vérifiée < move_iou),
+    - ou la vérification date de plus de reverify_interval secondes.
+
+Une piste dont l'encodage est en cours (pending) n'est pas réencodée et
+garde l'identité de sa dernière vérification aboutie ; un encodage en
+échec efface cette identité (nouvelle vérification à la frame suivante).
+
+Une piste non revue pendant max_misses frames est abandonnée : le visage
+qui réapparaît est alors traité comme nouveau.
+"""
+
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+Box = Tuple[int, int, int, int]     # haut, droite, bas, gauche (pixels)
+
+DEFAULT_MATCH_IOU = 0.3
+DEFAULT_MOVE_IOU = 0.5
+DEFAULT_REVERIFY_INTERVAL = 2.0     # secondes
+DEFAULT_MAX_MISSES = 5
+CENTROID_FACTOR = 0.5               # repli : centres distants de < 0.5 × diagonale
+
+
+class Track:
+    """Un visage suivi et son identité vérifiée."""
+
+    __slots__ = ("id", "box", "user", "distance", "verified_box", "verified_at", "pending",
+                 "misses", "hits")
+
+    def __init__(self, track_id: int, box: Box):
+        self.id = track_id
+        self.box = box
+        self.user: Optional[str] = None
+        self.distance = float("inf")
+        self.verified_box: Optional[Box] = None
+        self.verified_at: Optional[float] = None
+        self.pending = False        # encodage soumis, résultat attendu
+        self.misses = 0
+        self.hits = 1
+
+
+class FaceTracker:
+    """Association boîtes ↔ pistes et décision d'encodage."""
+
+    def __init__(self, reverify_interval: float = DEFAULT_REVERIFY_INTERVAL,
+                 match_iou: float = DEFAULT_MATCH_IOU, move_iou: float = DEFAULT_MOVE_IOU,
+                 max_misses: int = DEFAULT_MAX_MISSES):
+        self.reverify_interval = reverify_interval
+        self.match_iou = match_iou
+        self.move_iou = move_iou
+        self.max_misses = max_misses
+        self.tracks: List[Track] = []
+        self._ids = itertools.count(1)
+
+    def update(self, boxes: List[Box], ts: float) -> List[Tuple[Track, bool]]:
+        """
+        Associe les boîtes de la frame (instant média `ts`, en secondes) aux
+        pistes ; retourne [(piste, à encoder)] dans l'ordre de `boxes`.
+        """
+        pairs = []
+        for t, track in enumerate(self.tracks):
+            for b, box in enumerate(boxes):
+                score = iou(track.box, box)
+                if score < self.match_iou:
+                    # Mouvement rapide : repli sur la proximité des centres
+                    if _centroid_distance(track.box, box) > CENTROID_FACTOR * _diagonal(track.box):
+                        continue
+                    score = 0.0
+                pairs.append((score, -_centroid_distance(track.box, box), t, b))
+        pairs.sort(reverse=True)
+
+        assigned: List[Optional[Track]] = [None] * len(boxes)
+        used = set()
+        for _, _, t, b in pairs:
+            if t in used or assigned[b] is not None:
+                continue
+            used.add(t)
+            track = self.tracks[t]
+            track.box = boxes[b]
+            track.misses = 0
+            track.hits += 1
+            assigned[b] = track
+
+        for t, track in enumerate(self.tracks):
+            if t not in used:
+                track.misses += 1
+        self.tracks = [tr for tr in self.tracks if tr.misses <= self.max_misses]
+
+        result = []
+        for b, box in enumerate(boxes):
+            track = assigned[b]
+            if track is None:
+                track = Track(next(self._ids), box)
+                self.tracks.append(track)
+            result.append((track, self._needs_encoding(track, ts)))
+        return result
+
+    def pending(self, track: Track) -> None:
+        """Encodage de `track` soumis : pas d'autre encodage avant son résultat."""
+        track.pending = True
+
+    def verified(self, track: Track, user: Optional[str], distance: float, ts: float) -> None:
+        """Enregistre le résultat d'un encodage pour `track`."""
+        track.pending = False
+        track.user = user
+        track.distance = distance
+        track.verified_box = track.box
+        track.verified_at = ts
+
+    def failed(self, track: Track) -> None:
+        """Encodage de `track` en échec : identité inconnue, à revérifier."""
+        track.pending = False
+        track.user = None
+        track.distance = float("inf")
+        track.verified_box = None
+        track.verified_at = None
+
+    def reset(self) -> None:
+        self.tracks = []
+
+    def _needs_encoding(self, track: Track, ts: float) -> bool:
+        if track.pending:
+            return False
+        if track.verified_at is None:
+            return True
+        if ts - track.verified_at >= self.reverify_interval:
+            return True
+        return iou(track.box, track.verified_box) < self.move_iou
+
+
+def tracker_from_config(config: Dict[str, Any]) -> FaceTracker:
+    return FaceTracker(
+        reverify_interval=config.get("reverify_interval", DEFAULT_REVERIFY_INTERVAL),
+        move_iou=config.get("track_move_iou", DEFAULT_MOVE_IOU),
+    )
+
+
+def iou(a: Box, b: Box) -> float:
+    """Intersection sur union de deux boîtes (haut, droite, bas, gauche)."""
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    if inter == 0:
+        return 0.0
+    union = _area(a) + _area(b) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _area(box: Box) -> int:
+    return max(0, box[1] - box[3]) * max(0, box[2] - box[0])
+
+
+def _centroid_distance(a: Box, b: Box) -> float:
+    dx = (a[1] + a[3] - b[1] - b[3]) / 2
+    dy = (a[0] + a[2] - b[0] - b[2]) / 2
+    return (dx * dx + dy * dy) ** 0.5
+
+
+def _diagonal(box: Box) -> float:
+    return ((box[1] - box[3]) ** 2 + (box[2] - box[0]) ** 2) ** 0.5
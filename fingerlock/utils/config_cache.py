@@ -0,0 +1,66 @@
+"""
+utils/config_cache.py
+---------------------
+Instantané JSON de config.yaml, indexé par (mtime, taille, inode).
+
+Importer PyYAML et analyser le fichier coûte plusieurs dizaines de
+millisecondes à chaque commande CLI. Tant que config.yaml n'a pas changé,
+on relit à la place un instantané JSON (~/.fingerlock/.config.snapshot.json)
+écrit lors de la dernière analyse ; yaml n'est alors jamais importé.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def snapshot_path(config_file: Path) -> Path:
+    return config_file.with_name("." + config_file.stem + ".snapshot.json")
+
+
+def load_yaml_cached(config_file: Path, snapshot: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Contenu de `config_file` (dict), depuis l'instantané s'il est à jour,
+    sinon par analyse YAML (l'instantané est alors réécrit).
+    Lève OSError si le fichier est absent, yaml.YAMLError s'il est invalide.
+    """
+    config_file = Path(config_file)
+    snapshot = snapshot or snapshot_path(config_file)
+    key = _file_key(config_file)
+
+    try:
+        with open(snapshot, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == key and isinstance(cached.get("config"), dict):
+            return cached["config"]
+    except (OSError, ValueError):
+        pass
+
+    import yaml
+
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    if not isinstance(config, dict):
+        raise yaml.YAMLError(f"{config_file} : un dictionnaire est attendu")
+    _write_snapshot(snapshot, key, config)
+    return config
+
+
+def _file_key(path: Path) -> list:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def _write_snapshot(snapshot: Path, key: list, config: Dict[str, Any]) -> None:
+    try:
+        payload = json.dumps({"key": key, "config": config}, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return  # valeurs non sérialisables (dates YAML...) : pas d'instantané
+    tmp = snapshot.with_suffix(".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, snapshot)
+    except OSError:
+        pass  # cache facultatif
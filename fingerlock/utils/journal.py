@@ -0,0 +1,366 @@
+"""
+utils/journal.py
+----------------
+Journal structuré des événements (JSON Lines) avec index par segment.
+
+Chaque événement est une ligne JSON aux champs fixes :
+    {"ts": "2025-06-15T10:30:45.123", "category": "LOCK", "level": "WARNING",
+     "message": "Verrouillage après 12s", "attributes": {"inactivity": 12}}
+
+Organisation sur disque (répertoire `journal/` à côté du fichier de logs) :
+    events-<epoch>.jsonl         segment (rotation à SEGMENT_BYTES)
+    events-<epoch>.idx.json      index annexe du segment
+
+L'index découpe le segment en blocs d'environ BLOCK_BYTES et garde pour
+chaque bloc : offset, premier/dernier horodatage, nombre d'événements par
+catégorie, et l'offset exact des événements des catégories rares (au plus
+SPARSE_MAX par bloc, ex. LOCK au milieu de milliers de PRESENCE).
+Une requête --since/--until/--category ne lit donc que les blocs utiles,
+voire seulement les lignes utiles (seek direct), quelle que soit la taille
+de l'historique.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+SEGMENT_BYTES = 64 * 1024 * 1024   # taille max d'un segment
+BLOCK_BYTES   = 64 * 1024          # granularité de l'index
+INDEX_EVERY   = 256                # réécriture de l'index tous les N événements
+SPARSE_MAX    = 16                 # offsets gardés par catégorie rare et par bloc
+
+_SEGMENT_RE = re.compile(r"^events-(\d+)\.jsonl$")
+
+
+def default_journal_dir(log_path: str) -> str:
+    """Répertoire du journal : `journal/` à côté du fichier de logs."""
+    return os.path.join(os.path.dirname(os.path.abspath(log_path)), "journal")
+
+
+def journal_dir_for(config: Dict[str, Any]) -> Optional[str]:
+    """Répertoire du journal si `journal: true` dans la config, sinon None."""
+    if not config.get("journal"):
+        return None
+    return default_journal_dir(config["log_path"])
+
+
+# ---------------------------------------------------------------------------
+# Écriture
+# ---------------------------------------------------------------------------
+class JournalWriter:
+    """Écrit les événements dans le segment courant et tient son index à jour."""
+
+    def __init__(self, directory: str, segment_bytes: int = SEGMENT_BYTES,
+                 block_bytes: int = BLOCK_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.block_bytes = block_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._index: Dict[str, Any] = {}
+        self._unsaved = 0
+        os.makedirs(directory, exist_ok=True)
+        latest = _latest_segment(directory)
+        if latest:
+            self._open_segment(latest)
+
+    def write(self, ts: float, category: str, level: str, message: str,
+              attributes: Optional[Dict[str, Any]] = None) -> None:
+        line = json.dumps({
+            "ts":         _iso(ts),
+            "category":   category,
+            "level":      level,
+            "message":    message,
+            "attributes": attributes or {},
+        }, ensure_ascii=False, default=str) + "\n"
+        data = line.encode("utf-8")
+
+        with self._lock:
+            if self._file is None:
+                # Segment nommé d'après son premier événement
+                self._open_segment(None, first_ts=ts)
+            elif self._file.tell() + len(data) > self.segment_bytes and self._index["count"]:
+                self._close_segment()
+                self._open_segment(None, first_ts=ts)
+            self._record(self._file.tell(), ts, category)
+            self._file.write(data)
+            self._unsaved += 1
+            if self._unsaved >= INDEX_EVERY:
+                self._save_index()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.flush()
+                self._save_index()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+    # ── Helpers ──
+    def _open_segment(self, path: Optional[str], first_ts: Optional[float] = None) -> None:
+        if path is None:
+            stamp = int(first_ts if first_ts is not None else time.time())
+            path = os.path.join(self.directory, f"events-{stamp}.jsonl")
+            while os.path.exists(path):
+                stamp += 1
+                path = os.path.join(self.directory, f"events-{stamp}.jsonl")
+        self._path = path
+        self._index = _load_or_rebuild_index(path, self.block_bytes)
+        self._file = open(path, "ab")
+        if self._file.tell() > self._index["size"]:
+            # Ligne incomplète laissée par un arrêt brutal : on la retire
+            self._file.truncate(self._index["size"])
+            self._file.seek(self._index["size"])
+
+    def _close_segment(self) -> None:
+        if self._file:
+            self._file.flush()
+            self._save_index()
+            self._file.close()
+            self._file = None
+
+    def _record(self, offset: int, ts: float, category: str) -> None:
+        _index_event(self._index, offset, ts, category, self.block_bytes)
+
+    def _save_index(self) -> None:
+        self._file.flush()
+        self._index["size"] = self._file.tell()
+        _write_index(self._path, self._index)
+        self._unsaved = 0
+
+
+class JournalHandler(logging.Handler):
+    """
+    Handler logging → journal. Lit les attributs `category`, `event` et
+    `attributes` posés par les fonctions log_* (extra=...).
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(logging.DEBUG)
+        self.writer = JournalWriter(directory)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.writer.write(
+                record.created,
+                getattr(record, "category", "SYSTEM"),
+                record.levelname,
+                getattr(record, "event", record.getMessage()),
+                getattr(record, "attributes", None),
+            )
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def flush_now(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
+        super().close()
+
+
+# ---------------------------------------------------------------------------
+# Lecture
+# ---------------------------------------------------------------------------
+def query(directory: str, since: Optional[float] = None, until: Optional[float] = None,
+          categories: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Itère sur les événements du journal dans l'ordre chronologique.
+
+    Args:
+        since, until: bornes (epoch, incluses) ; None = pas de borne.
+        categories:   catégories acceptées ; None = toutes.
+    """
+    cats = {c.upper() for c in categories} if categories else None
+
+    for path in list_segments(directory):
+        index = _load_or_rebuild_index(path)
+        if not index["blocks"]:
+            continue
+        if since is not None and index["end"] < since:
+            continue
+        if until is not None and index["start"] > until:
+            continue
+
+        with open(path, "rb") as f:
+            blocks = index["blocks"]
+            for i, block in enumerate(blocks):
+                offset, first_ts, last_ts, counts, sparse = block
+                if since is not None and last_ts < since:
+                    continue
+                if until is not None and first_ts > until:
+                    break
+                if cats is not None and not cats.intersection(counts):
+                    continue
+
+                if cats is not None and all(sparse.get(c) is not None for c in cats if c in counts):
+                    # Catégories rares : lecture ligne à ligne aux offsets indexés
+                    offsets = sorted(o for c in cats if c in counts for o in sparse[c])
+                    lines = []
+                    for o in offsets:
+                        f.seek(o)
+                        lines.append(f.readline())
+                else:
+                    end = blocks[i + 1][0] if i + 1 < len(blocks) else index["size"]
+                    f.seek(offset)
+                    lines = f.read(end - offset).splitlines()
+
+                for raw in lines:
+                    try:
+                        event = json.loads(raw)
+                    except ValueError:
+                        continue  # ligne tronquée (arrêt brutal)
+                    if cats is not None and event.get("category") not in cats:
+                        continue
+                    if since is not None or until is not None:
+                        ts = _epoch(event["ts"])
+                        if since is not None and ts < since:
+                            continue
+                        if until is not None and ts > until:
+                            continue
+                    yield event
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segments du journal, du plus ancien au plus récent."""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        m = _SEGMENT_RE.match(name)
+        if m:
+            found.append((int(m.group(1)), os.path.join(directory, name)))
+    return [path for _, path in sorted(found)]
+
+
+def parse_time(value: str, now: Optional[float] = None) -> float:
+    """
+    Convertit une borne CLI en epoch.
+    Formats : ISO 8601 ("2025-06-15", "2025-06-15T10:30"), relatif ("90s",
+    "30m", "12h", "7d", "2w"), ou "today" / "yesterday".
+    """
+    now = time.time() if now is None else now
+    value = value.strip().lower()
+
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([smhdw])", value)
+    if m:
+        unit = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}[m.group(2)]
+        return now - float(m.group(1)) * unit
+
+    midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if value == "today":
+        return midnight.timestamp()
+    if value == "yesterday":
+        return (midnight - timedelta(days=1)).timestamp()
+
+    try:
+        return datetime.fromisoformat(value.upper()).timestamp()
+    except ValueError:
+        raise ValueError(f"Date invalide : '{value}' (ex : 2025-06-15, 7d, 12h, today)")
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    """Rendu texte d'un événement, aligné sur le format du fichier de logs."""
+    attrs = event.get("attributes") or {}
+    extra = "  " + " ".join(f"{k}={v}" for k, v in attrs.items()) if attrs else ""
+    return (f"{event['ts'][:19]} | {event.get('level', ''):<8} | "
+            f"{event.get('category', ''):<10} {event.get('message', '')}{extra}")
+
+
+# ---------------------------------------------------------------------------
+# Index annexe
+# ---------------------------------------------------------------------------
+def _index_path(segment: str) -> str:
+    return segment[:-len(".jsonl")] + ".idx.json"
+
+
+def _new_index() -> Dict[str, Any]:
+    return {"start": None, "end": None, "count": 0, "size": 0, "blocks": []}
+
+
+def _index_event(index: Dict[str, Any], offset: int, ts: float, category: str,
+                 block_bytes: int) -> None:
+    blocks = index["blocks"]
+    if not blocks or offset - blocks[-1][0] >= block_bytes:
+        blocks.append([offset, ts, ts, {}, {}])
+    block = blocks[-1]
+    block[1] = min(block[1], ts)
+    block[2] = max(block[2], ts)
+    count = block[3][category] = block[3].get(category, 0) + 1
+    sparse = block[4]
+    if count == 1:
+        sparse[category] = [offset]
+    elif count <= SPARSE_MAX:
+        sparse[category].append(offset)
+    else:
+        sparse[category] = None   # catégorie dense : lecture du bloc entier
+    index["start"] = ts if index["start"] is None else min(index["start"], ts)
+    index["end"] = ts if index["end"] is None else max(index["end"], ts)
+    index["count"] += 1
+
+
+def _write_index(segment: str, index: Dict[str, Any]) -> None:
+    path = _index_path(segment)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _load_or_rebuild_index(segment: str, block_bytes: int = BLOCK_BYTES) -> Dict[str, Any]:
+    """
+    Charge l'index annexe ; s'il est absent ou en retard sur le segment
+    (arrêt brutal), complète-le en relisant uniquement la fin non indexée.
+    """
+    try:
+        with open(_index_path(segment), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = _new_index()
+
+    try:
+        size = os.path.getsize(segment)
+    except OSError:
+        return index
+
+    if index["size"] > size:           # segment tronqué → index invalide
+        index = _new_index()
+    if index["size"] < size:
+        with open(segment, "rb") as f:
+            f.seek(index["size"])
+            offset = index["size"]
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break              # dernière ligne incomplète
+                try:
+                    event = json.loads(raw)
+                    _index_event(index, offset, _epoch(event["ts"]),
+                                 event.get("category", "SYSTEM"), block_bytes)
+                except (ValueError, KeyError):
+                    pass
+                offset += len(raw)
+            index["size"] = offset
+    return index
+
+
+def _latest_segment(directory: str) -> Optional[str]:
+    segments = list_segments(directory)
+    return segments[-1] if segments else None
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts).isoformat(timespec="milliseconds")
+
+
+def _epoch(iso: str) -> float:
+    return datetime.fromisoformat(iso).timestamp()
@@ -14,60 +14,224 @@ Format fichier :
 
 Format console :
     [10:30:45] ✅ PRESENCE  Visage propriétaire reconnu (dist=0.42)
+
+Journal structuré (optionnel) :
+    Avec journal_dir, chaque événement est aussi écrit en JSON Lines
+    indexé (voir utils/journal.py) pour des requêtes rapides par date
+    et par catégorie.
+
+Pipeline asynchrone :
+    L'appelant ne fait que déposer l'enregistrement dans une file
+    (QueueHandler). Un thread d'écriture (QueueListener) écrit les
+    enregistrements par lots et ne vide les tampons disque/tty qu'au
+    dépassement d'un budget de temps (FLUSH_INTERVAL) ou de taille
+    (FLUSH_BATCH). La file est vidée proprement à l'arrêt.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+from fingerlock.utils.rotation import (
+    RotatingLogHandler, drain_compressors, list_rotated, open_segment, rotation_from_config,
+)
+
+# ---------------------------------------------------------------------------
+# Budgets du pipeline asynchrone
+# ---------------------------------------------------------------------------
+FLUSH_INTERVAL = 0.5   # secondes max entre deux flush
+FLUSH_BATCH    = 64    # enregistrements max entre deux flush
 
 # ---------------------------------------------------------------------------
 # Instance unique du logger
 # ---------------------------------------------------------------------------
 _logger: Optional[logging.Logger] = None
+_listener: Optional["_BatchingQueueListener"] = None
+
+
+class _DeferredFlushMixin:
+    """Handler dont le flush est piloté par le listener (écriture par lots)."""
+
+    def flush(self):
+        pass
+
+    def flush_now(self):
+        super().flush()
+
+
+class _BatchFileHandler(_DeferredFlushMixin, logging.FileHandler):
+    pass
+
 
+class _BatchStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
 
-def setup_logger(log_path: str) -> logging.Logger:
+
+class _BatchRotatingLogHandler(_DeferredFlushMixin, RotatingLogHandler):
+    pass
+
+
+class _FastQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler sans copie ni formatage pour les messages déjà formatés."""
+
+    def prepare(self, record):
+        if record.args or record.exc_info or record.stack_info:
+            return super().prepare(record)
+        return record
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener qui regroupe les écritures : flush des handlers tous les
+    `batch_size` enregistrements, ou après `interval` secondes, y compris
+    quand la file est au repos.
+    """
+
+    def __init__(self, q, *handlers, interval: float = FLUSH_INTERVAL,
+                 batch_size: int = FLUSH_BATCH):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.interval if block else None)
+            except queue.Empty:
+                # File au repos : rien ne doit rester dans les tampons
+                self._flush()
+                if not block:
+                    raise
+
+    def handle(self, record):
+        super().handle(record)
+        self._pending += 1
+        if (self._pending >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.interval):
+            self._flush()
+
+    def stop(self):
+        super().stop()
+        self._flush()
+
+    def _flush(self):
+        if self._pending:
+            for handler in self.handlers:
+                handler.flush_now()
+            self._pending = 0
+        self._last_flush = time.monotonic()
+
+
+def setup_logger(log_path: str, asynchronous: bool = True,
+                 journal_dir: Optional[str] = None,
+                 rotation: Optional[Dict[str, Any]] = None) -> logging.Logger:
     """
     Configure et retourne le logger singleton.
     À appeler une seule fois au démarrage.
+
+    Args:
+        asynchronous: True = pipeline file d'attente + écriture par lots
+                      (défaut), False = handlers synchrones.
+        journal_dir:  répertoire du journal JSONL structuré (None = désactivé).
+        rotation:     paramètres de RotatingLogHandler (max_bytes, daily,
+                      backup_count, retention_days, compression) ;
+                      None = fichier unique sans rotation.
     """
-    global _logger
+    global _logger, _listener
 
     os.makedirs(os.path.dirname(log_path) if os.path.dirname(log_path) else ".", exist_ok=True)
 
     logger = logging.getLogger("facelock")
     logger.setLevel(logging.DEBUG)
-    logger.handlers.clear()  # éviter les doublons si appelé plusieurs fois
 
     # ── Handler fichier ──
     file_fmt = logging.Formatter(
         "%(asctime)s | %(levelname)-8s | %(message)s",
         datefmt="%Y-%m-%dT%H:%M:%S",
     )
-    fh = logging.FileHandler(log_path, encoding="utf-8")
+    if rotation is not None:
+        fh = (_BatchRotatingLogHandler if asynchronous else RotatingLogHandler)(log_path, **rotation)
+    else:
+        fh = (_BatchFileHandler if asynchronous else logging.FileHandler)(log_path, encoding="utf-8")
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(file_fmt)
-    logger.addHandler(fh)
 
     # ── Handler console (couleurs basiques via préfixes) ──
-    ch = logging.StreamHandler(sys.stdout)
+    ch = (_BatchStreamHandler if asynchronous else logging.StreamHandler)(sys.stdout)
     ch.setLevel(logging.INFO)
     ch.setFormatter(logging.Formatter("  %(message)s"))
-    logger.addHandler(ch)
 
+    handlers = [fh, ch]
+    if journal_dir:
+        from fingerlock.utils.journal import JournalHandler
+        handlers.append(JournalHandler(journal_dir))
+
+    # Le nouveau pipeline est prêt avant la bascule : reconfigurer à chaud
+    # (rechargement de config) ne perd ni ne duplique aucun enregistrement.
+    old_listener, old_handlers = _listener, logger.handlers
+    if asynchronous:
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        listener = _BatchingQueueListener(q, *handlers)
+        listener.start()
+        logger.handlers = [_FastQueueHandler(q)]
+    else:
+        listener = None
+        logger.handlers = handlers
+
+    _listener = listener
+    # Bascule à chaud (boucle du watcher) : les compressions en cours
+    # continuent en arrière-plan, seul l'arrêt final les attend
+    _stop_listener(old_listener, drain=False)
+    for handler in old_handlers:
+        handler.close()
     _logger = logger
     return logger
 
 
+def setup_logger_from_config(config: Dict[str, Any]) -> logging.Logger:
+    """setup_logger() avec journal et rotation lus depuis la config utilisateur."""
+    from fingerlock.utils.journal import journal_dir_for
+    return setup_logger(config["log_path"], journal_dir=journal_dir_for(config),
+                        rotation=rotation_from_config(config))
+
+
+def shutdown_logger() -> None:
+    """Vide la file d'attente, écrit les derniers lots et ferme les fichiers."""
+    global _listener
+    listener, _listener = _listener, None
+    _stop_listener(listener, drain=True)
+
+
+def _stop_listener(listener: Optional[logging.handlers.QueueListener], drain: bool) -> None:
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    if drain:
+        drain_compressors()
+
+
+atexit.register(shutdown_logger)
+
+
 def get_logger() -> logging.Logger:
     """Retourne le logger déjà configuré (ou un logger par défaut)."""
     if _logger is None:
-        # Fallback si setup n'a pas été appelé
+        # Fallback si setup n'a pas été appelé (un seul handler, même appelé N fois)
         fallback = logging.getLogger("facelock")
-        fallback.addHandler(logging.StreamHandler(sys.stdout))
-        fallback.setLevel(logging.INFO)
+        if not fallback.handlers:
+            fallback.addHandler(logging.StreamHandler(sys.stdout))
+            fallback.setLevel(logging.INFO)
         return fallback
     return _logger
 
@@ -90,46 +254,172 @@ def _format_msg(category: str, message: str) -> str:
     return f"[{datetime.now().strftime('%H:%M:%S')}] {icon} {category:<10} {message}"
 
 
-def log_presence(message: str) -> None:
-    get_logger().info(_format_msg("PRESENCE", message))
+def _log(level: int, category: str, message: str, attributes: Dict[str, Any]) -> None:
+    get_logger().log(level, _format_msg(category, message),
+                     extra={"category": category, "event": message, "attributes": attributes})
+
 
+def log_presence(message: str, **attributes: Any) -> None:
+    _log(logging.INFO, "PRESENCE", message, attributes)
 
-def log_absence(message: str) -> None:
-    get_logger().warning(_format_msg("ABSENCE", message))
 
+def log_absence(message: str, **attributes: Any) -> None:
+    _log(logging.WARNING, "ABSENCE", message, attributes)
 
-def log_lock(message: str) -> None:
-    get_logger().warning(_format_msg("LOCK", message))
 
+def log_lock(message: str, **attributes: Any) -> None:
+    _log(logging.WARNING, "LOCK", message, attributes)
 
-def log_system(message: str) -> None:
-    get_logger().info(_format_msg("SYSTEM", message))
 
+def log_system(message: str, **attributes: Any) -> None:
+    _log(logging.INFO, "SYSTEM", message, attributes)
 
-def log_enroll(message: str) -> None:
-    get_logger().info(_format_msg("ENROLL", message))
 
+def log_enroll(message: str, **attributes: Any) -> None:
+    _log(logging.INFO, "ENROLL", message, attributes)
 
-def log_error(message: str) -> None:
-    get_logger().error(_format_msg("ERROR", message))
+
+def log_error(message: str, **attributes: Any) -> None:
+    _log(logging.ERROR, "ERROR", message, attributes)
 
 
 # ---------------------------------------------------------------------------
 # Affichage des derniers logs (commande `logs`)
 # ---------------------------------------------------------------------------
-def tail_logs(log_path: str, lines: int = 30) -> None:
-    """Affiche les N dernières lignes du fichier de log."""
+TAIL_BLOCK = 64 * 1024  # taille des blocs lus depuis la fin du fichier
+
+
+def read_last_lines(log_path: str, lines: int = 30, block_size: int = TAIL_BLOCK) -> List[str]:
+    """
+    Retourne les N dernières lignes du fichier, sans le lire en entier.
+
+    Le fichier est lu à rebours, par blocs, depuis la fin : le coût dépend
+    du nombre de lignes demandées, pas de la taille du fichier.
+    """
+    if lines <= 0:
+        return []
+
+    with open(log_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        chunks: List[bytes] = []
+        newlines = 0
+
+        # Un saut de ligne final ne délimite pas de ligne supplémentaire
+        if pos:
+            f.seek(pos - 1)
+            if f.read(1) == b"\n":
+                newlines = -1
+
+        while pos > 0 and newlines < lines:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+
+    data = b"".join(reversed(chunks))
+    return [line.decode("utf-8", errors="replace") for line in data.splitlines()[-lines:]]
+
+
+def read_recent_lines(log_path: str, lines: int = 30) -> List[str]:
+    """
+    N dernières lignes, segments tournés compris : si le segment courant est
+    trop court, les segments précédents (compressés ou non) sont lus en flux.
+    """
+    recent = read_last_lines(log_path, lines) if os.path.isfile(log_path) else []
+    for segment in reversed(list_rotated(log_path)):
+        missing = lines - len(recent)
+        if missing <= 0:
+            break
+        if segment.endswith((".gz", ".zst")):
+            try:
+                with open_segment(segment) as f:
+                    older = [line.rstrip("\n") for line in deque(f, maxlen=missing)]
+            except OSError:
+                continue
+        else:
+            older = read_last_lines(segment, missing)
+        recent = older + recent
+    return recent
+
+
+def follow_lines(log_path: str, poll_interval: float = 1.0) -> Iterator[str]:
+    """
+    Produit les nouvelles lignes ajoutées au fichier (à la `tail -f`).
+
+    Sous Linux, le réveil se fait via inotify (aucun polling) ; le fichier
+    est rouvert s'il est remplacé (rotation) ou tronqué. Ailleurs, repli
+    sur un polling toutes les `poll_interval` secondes.
+    """
+    from fingerlock.utils import inotify
+
+    watcher = None
+    if inotify.INOTIFY_AVAILABLE:
+        try:
+            watcher = inotify.Inotify()
+            # Surveiller le répertoire : survit à la rotation du fichier
+            watcher.add_watch(os.path.dirname(os.path.abspath(log_path)),
+                              inotify.IN_MODIFY | inotify.IN_CREATE | inotify.IN_MOVED_TO
+                              | inotify.IN_DELETE | inotify.IN_MOVED_FROM)
+        except OSError:
+            watcher = None
+
+    name = os.path.basename(log_path)
+    f = open(log_path, "rb")
+    f.seek(0, os.SEEK_END)
+    partial = b""
+    try:
+        while True:
+            data = f.read()
+            if data:
+                partial += data
+                *complete, partial = partial.split(b"\n")
+                for line in complete:
+                    yield line.decode("utf-8", errors="replace")
+                continue
+
+            # Fichier remplacé (rotation) ou tronqué → rouvrir
+            try:
+                st = os.stat(log_path)
+                if st.st_ino != os.fstat(f.fileno()).st_ino or st.st_size < f.tell():
+                    f.close()
+                    f = open(log_path, "rb")
+                    partial = b""
+                    continue
+            except FileNotFoundError:
+                pass
+
+            if watcher is not None:
+                # Attendre un événement concernant notre fichier
+                while not any(ev.name == name for ev in watcher.read()):
+                    pass
+            else:
+                time.sleep(poll_interval)
+    finally:
+        f.close()
+        if watcher is not None:
+            watcher.close()
+
+
+def tail_logs(log_path: str, lines: int = 30, follow: bool = False) -> None:
+    """Affiche les N dernières lignes du fichier de log (puis suit avec follow=True)."""
     if not os.path.isfile(log_path):
         print(f"\n  ⚠️  Aucun fichier de log trouvé : {log_path}")
         print("      Lancez d'abord `python main.py enroll` ou `python main.py watch`.\n")
         return
 
-    with open(log_path, "r", encoding="utf-8") as f:
-        all_lines = f.readlines()
-
-    recent = all_lines[-lines:] if len(all_lines) > lines else all_lines
+    recent = read_recent_lines(log_path, lines)
 
     print(f"\n  ── Dernières {lines} entrées de log ──\n")
     for line in recent:
         print(f"    {line.rstrip()}")
+
+    if follow:
+        try:
+            for line in follow_lines(log_path):
+                print(f"    {line.rstrip()}", flush=True)
+        except KeyboardInterrupt:
+            pass
     print()
@@ -0,0 +1,220 @@
+"""
+utils/report.py
+---------------
+Rapport d'activité (commande `fingerlock report`).
+
+Pipeline de générateurs, en flux sur tous les segments de logs (courant +
+tournés, compressés ou non) sans jamais les charger en mémoire :
+
+    iter_log_lines → parse_events → filtre temporel → ReportBuilder
+
+Événements exploités (catégories LOCK / SYSTEM émises par le watcher) :
+    LOCK    "Verrouillage après 42s"          → verrouillage + durée d'inactivité
+    LOCK    "Verrouillage demandé"            → verrouillage forcé (socket de contrôle)
+    SYSTEM  "Système déverrouillé"            → fin du verrouillage
+    SYSTEM  "Arrêt après trop de tentatives"  → échec de déverrouillage
+    SYSTEM  "Surveillance démarrée" / "Arrêt manuel" → fin de session
+"""
+
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional
+
+from fingerlock.utils.rotation import iter_log_lines
+
+# Ligne fichier : "2025-06-15T10:30:45 | WARNING  | [10:30:45] 🔒 LOCK       Verrouillage après 12s"
+_LINE_RE = re.compile(r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d) \| \w+\s*\| \[[\d:]+\] \S+\s+(LOCK|SYSTEM)\s+(.*)$")
+_LOCK_RE = re.compile(r"^Verrouillage après (\d+)s")
+
+MSG_FORCED   = "Verrouillage demandé"
+MSG_UNLOCK   = "Système déverrouillé"
+MSG_FAILURE  = "Arrêt après trop de tentatives"
+MSG_SESSION  = ("Surveillance démarrée", "Arrêt manuel")
+
+# Bornes (s) de la distribution des durées d'inactivité
+IDLE_BUCKETS = (10, 30, 60, 300, 900, 3600)
+
+
+class Event(NamedTuple):
+    ts: float
+    category: str
+    message: str
+
+
+def parse_events(lines: Iterable[str]) -> Iterator[Event]:
+    """Lignes brutes → événements LOCK/SYSTEM (les autres lignes sont ignorées)."""
+    for line in lines:
+        # Pré-filtre bon marché avant la regex
+        if " LOCK " not in line and " SYSTEM " not in line:
+            continue
+        m = _LINE_RE.match(line)
+        if m:
+            yield Event(datetime.fromisoformat(m.group(1)).timestamp(),
+                        m.group(2), m.group(3).rstrip())
+
+
+def between(events: Iterable[Event], since: Optional[float] = None,
+            until: Optional[float] = None) -> Iterator[Event]:
+    for event in events:
+        if since is not None and event.ts < since:
+            continue
+        if until is not None and event.ts > until:
+            continue
+        yield event
+
+
+class ReportBuilder:
+    """Agrège les événements en une passe, en mémoire constante."""
+
+    def __init__(self):
+        self.locks_per_day: Counter = Counter()
+        self.locks_per_hour: Counter = Counter()
+        self.idle_buckets: Counter = Counter()
+        self.locked_seconds = 0.0
+        self.unlocks = 0
+        self.failures = 0
+        self.locks = 0
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self._locked_at: Optional[float] = None
+
+    def feed(self, events: Iterable[Event]) -> "ReportBuilder":
+        for event in events:
+            self.add(event)
+        return self
+
+    def add(self, event: Event) -> None:
+        if self.first_ts is None:
+            self.first_ts = event.ts
+        self.last_ts = event.ts
+
+        if event.category == "LOCK":
+            m = _LOCK_RE.match(event.message)
+            if not m and not event.message.startswith(MSG_FORCED):
+                return
+            self._close(event.ts)
+            when = datetime.fromtimestamp(event.ts)
+            self.locks += 1
+            self.locks_per_day[when.strftime("%Y-%m-%d")] += 1
+            self.locks_per_hour[when.hour] += 1
+            if m:
+                self.idle_buckets[_bucket(int(m.group(1)))] += 1
+            self._locked_at = event.ts
+        elif event.message.startswith(MSG_UNLOCK):
+            self.unlocks += 1
+            self._close(event.ts)
+        elif event.message.startswith(MSG_FAILURE):
+            self.failures += 1
+            self._close(event.ts)
+        elif event.message.startswith(MSG_SESSION):
+            self._close(event.ts)
+
+    def result(self, top_hours: int = 3) -> Dict[str, Any]:
+        days = sorted(self.locks_per_day.items())
+        return {
+            "period": {
+                "from": _iso(self.first_ts),
+                "to":   _iso(self.last_ts),
+            },
+            "locks":            self.locks,
+            "unlocks":          self.unlocks,
+            "unlock_failures":  self.failures,
+            "time_locked_s":    round(self.locked_seconds, 1),
+            "locks_per_day":    dict(days),
+            "avg_locks_per_day": round(self.locks / len(days), 2) if days else 0.0,
+            "idle_distribution": {label: self.idle_buckets.get(label, 0) for label in _LABELS},
+            "top_hours": [
+                {"hour": hour, "locks": count}
+                for hour, count in self.locks_per_hour.most_common(top_hours)
+            ],
+        }
+
+    def _close(self, ts: float) -> None:
+        if self._locked_at is not None:
+            self.locked_seconds += max(0.0, ts - self._locked_at)
+            self._locked_at = None
+
+
+def build_report(log_path: str, since: Optional[float] = None,
+                 until: Optional[float] = None) -> Dict[str, Any]:
+    """Rapport complet sur tous les segments de `log_path`."""
+    events = between(parse_events(iter_log_lines(log_path, since=since)), since, until)
+    return ReportBuilder().feed(events).result()
+
+
+def format_report(report: Dict[str, Any], as_json: bool = False) -> str:
+    """Rendu tableau (terminal) ou JSON."""
+    if as_json:
+        return json.dumps(report, indent=2, ensure_ascii=False)
+
+    out = []
+    period = report["period"]
+    out.append("  ── Rapport d'activité ──\n")
+    out.append(f"  📅 Période              : {period['from'] or '—'} → {period['to'] or '—'}")
+    out.append(f"  🔒 Verrouillages        : {report['locks']} ({report['avg_locks_per_day']}/jour)")
+    out.append(f"  🔓 Déverrouillages      : {report['unlocks']}")
+    out.append(f"  ❌ Échecs de déverrouil.: {report['unlock_failures']}")
+    out.append(f"  ⏱️  Temps verrouillé     : {_duration(report['time_locked_s'])}")
+
+    out.append("\n  ── Verrouillages par jour ──\n")
+    days = report["locks_per_day"]
+    peak = max(days.values(), default=0)
+    for day, count in list(days.items())[-14:]:
+        bar = "█" * max(1, round(count / peak * 30)) if peak else ""
+        out.append(f"    {day}  {count:>5}  {bar}")
+    if len(days) > 14:
+        out.append(f"    … {len(days) - 14} jour(s) plus anciens (voir --json)")
+
+    out.append("\n  ── Durée d'inactivité avant verrouillage ──\n")
+    total = sum(report["idle_distribution"].values()) or 1
+    for label, count in report["idle_distribution"].items():
+        out.append(f"    {label:>12}  {count:>6}  {count * 100 / total:5.1f} %")
+
+    out.append("\n  ── Heures les plus verrouillées ──\n")
+    for entry in report["top_hours"]:
+        out.append(f"    {entry['hour']:02d}h–{(entry['hour'] + 1) % 24:02d}h  {entry['locks']:>6}")
+    out.append("")
+    return "\n".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _bucket_labels():
+    labels = []
+    low = 0
+    for high in IDLE_BUCKETS:
+        labels.append(f"{_short(low)}–{_short(high)}")
+        low = high
+    labels.append(f"≥ {_short(low)}")
+    return labels
+
+
+def _bucket(seconds: int) -> str:
+    for i, high in enumerate(IDLE_BUCKETS):
+        if seconds < high:
+            return _LABELS[i]
+    return _LABELS[-1]
+
+
+def _short(seconds: int) -> str:
+    if seconds >= 3600:
+        return f"{seconds // 3600}h"
+    if seconds >= 60:
+        return f"{seconds // 60}min"
+    return f"{seconds}s"
+
+
+_LABELS = _bucket_labels()
+
+
+def _duration(seconds: float) -> str:
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}min {s:02d}s"
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts is not None else None
@@ -0,0 +1,338 @@
+"""
+utils/rotation.py
+-----------------
+Rotation des fichiers de logs (taille + changement de jour) avec
+compression en arrière-plan.
+
+Segments sur disque :
+    fingerlock.log                        segment courant
+    fingerlock.log.20250615-103045.gz     segment tourné, compressé
+    fingerlock.log.20250616-000001.zst    (zstd si le module zstandard est installé)
+
+La bascule elle-même n'est qu'un rename ; la compression et la rétention
+s'exécutent sur un thread dédié, jamais sur le chemin lock/unlock. Ce
+thread est partagé par les handlers d'une même configuration et s'arrête
+(après ses tâches en cours) quand le dernier handler est fermé.
+Les segments compressés se relisent de façon transparente (open_segment).
+"""
+
+import glob
+import gzip
+import io
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# ---------------------------------------------------------------------------
+# Valeurs par défaut (surchargées par la config)
+# ---------------------------------------------------------------------------
+DEFAULT_MAX_BYTES    = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 10
+DEFAULT_COMPRESSION  = "gzip"           # "gzip" | "zstd" | "none"
+
+_SUFFIX_RE = re.compile(r"\.(\d{8}-\d{6})(?:-(\d+))?(\.gz|\.zst)?")
+
+
+def rotation_from_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Paramètres de RotatingLogHandler à partir des clés log_* de la config."""
+    return {
+        "max_bytes":      int(config.get("log_max_bytes", DEFAULT_MAX_BYTES)),
+        "daily":          bool(config.get("log_rotate_daily", True)),
+        "backup_count":   int(config.get("log_backup_count", DEFAULT_BACKUP_COUNT)),
+        "retention_days": int(config.get("log_retention_days", 0)),
+        "compression":    str(config.get("log_compression", DEFAULT_COMPRESSION)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Handler
+# ---------------------------------------------------------------------------
+class RotatingLogHandler(logging.FileHandler):
+    """
+    FileHandler qui bascule sur un nouveau segment quand le fichier dépasse
+    `max_bytes` ou quand le jour change (`daily`).
+
+    Args:
+        max_bytes:    taille max du segment courant (0 = pas de limite).
+        daily:        bascule au premier enregistrement d'un nouveau jour.
+        backup_count: segments tournés conservés (0 = illimité).
+        retention_days: âge max des segments tournés (0 = illimité).
+        compression:  "gzip" | "zstd" | "none".
+    """
+
+    def __init__(self, filename: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 daily: bool = True, backup_count: int = DEFAULT_BACKUP_COUNT,
+                 retention_days: int = 0, compression: str = DEFAULT_COMPRESSION,
+                 encoding: str = "utf-8"):
+        super().__init__(filename, encoding=encoding)
+        self.max_bytes = max_bytes
+        self.daily = daily
+        self.compressor: Optional[Compressor] = get_compressor(compression, backup_count, retention_days)
+        self._day = self._file_day()
+        self._size = self._file_size()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Taille suivie à la main : stream.tell() forcerait un flush
+        try:
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.encoding or "utf-8", errors="replace"))
+            if self.should_rollover(record, size):
+                self.do_rollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self._size += size
+            self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def should_rollover(self, record: logging.LogRecord, size: int = 0) -> bool:
+        if not self._size:
+            return False
+        if self.daily and date.fromtimestamp(record.created) != self._day:
+            return True
+        return bool(self.max_bytes) and self._size + size > self.max_bytes
+
+    def do_rollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            target = _rotated_name(self.baseFilename)
+            os.replace(self.baseFilename, target)
+            if self.compressor is not None:
+                self.compressor.submit(target, self.baseFilename)
+        self._day = date.today()
+        self._size = 0
+        self.stream = self._open()
+
+    def close(self) -> None:
+        # close() peut être appelé deux fois (logging.shutdown) : une seule libération
+        compressor, self.compressor = self.compressor, None
+        if compressor is not None:
+            release_compressor(compressor)
+        super().close()
+
+    def _file_size(self) -> int:
+        try:
+            return os.path.getsize(self.baseFilename)
+        except OSError:
+            return 0
+
+    def _file_day(self) -> date:
+        try:
+            return date.fromtimestamp(os.path.getmtime(self.baseFilename))
+        except OSError:
+            return date.today()
+
+
+# ---------------------------------------------------------------------------
+# Compression + rétention en arrière-plan
+# ---------------------------------------------------------------------------
+class Compressor(threading.Thread):
+    """Thread unique qui compresse les segments tournés puis applique la rétention."""
+
+    def __init__(self, compression: str, backup_count: int, retention_days: int):
+        super().__init__(name="fingerlock-log-compressor", daemon=True)
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "gzip"
+        self.compression = compression
+        self.backup_count = backup_count
+        self.retention_days = retention_days
+        self.users = 0       # handlers qui partagent ce thread (get_compressor)
+        self.jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.start()
+
+    def submit(self, segment: str, base: str) -> None:
+        self.jobs.put((segment, base))
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Attend la fin des compressions en cours (arrêt propre)."""
+        done = threading.Event()
+        self.jobs.put(("__drain__", done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Arrête le thread une fois les tâches déjà soumises terminées (sans attendre)."""
+        self.jobs.put(None)
+
+    def run(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            segment, base = job
+            if segment == "__drain__":
+                base.set()
+                continue
+            try:
+                _compress(segment, self.compression)
+                apply_retention(base, self.backup_count, self.retention_days)
+            except FileNotFoundError:
+                pass  # segment déjà traité ou supprimé : rien à faire
+            except Exception as e:
+                # Le thread doit survivre : les segments suivants restent à traiter
+                from fingerlock.utils.logger import log_error
+                log_error(f"Compression de {os.path.basename(segment)} impossible : {e}")
+
+
+_compressors: Dict[tuple, Compressor] = {}
+_retired: List[Compressor] = []      # arrêtés, tâches peut-être encore en cours
+_compressors_lock = threading.Lock()
+
+
+def get_compressor(compression: str, backup_count: int, retention_days: int) -> Compressor:
+    """Un thread de compression par configuration, partagé entre handlers."""
+    key = (compression, backup_count, retention_days)
+    with _compressors_lock:
+        compressor = _compressors.get(key)
+        if compressor is None:
+            compressor = _compressors[key] = Compressor(compression, backup_count, retention_days)
+        compressor.users += 1
+        return compressor
+
+
+def release_compressor(compressor: Compressor) -> None:
+    """Rend le thread d'un handler fermé ; arrêté quand plus aucun handler ne l'utilise."""
+    with _compressors_lock:
+        compressor.users -= 1
+        if compressor.users > 0:
+            return
+        key = (compressor.compression, compressor.backup_count, compressor.retention_days)
+        if _compressors.get(key) is compressor:
+            del _compressors[key]
+        _retired[:] = [c for c in _retired if c.is_alive()] + [compressor]
+    compressor.close()
+
+
+def drain_compressors(timeout: Optional[float] = 5.0) -> None:
+    """Attend les compressions en cours, threads arrêtés compris (arrêt du logger)."""
+    with _compressors_lock:
+        active, retired = list(_compressors.values()), list(_retired)
+    for compressor in active:
+        compressor.drain(timeout)
+    for compressor in retired:
+        compressor.join(timeout)
+
+
+def apply_retention(log_path: str, backup_count: int, retention_days: int) -> None:
+    """Supprime les segments tournés au-delà du nombre ou de l'âge max."""
+    rotated = list_rotated(log_path)
+    doomed = set()
+    if backup_count and len(rotated) > backup_count:
+        doomed.update(rotated[:-backup_count])
+    if retention_days:
+        cutoff = time.time() - retention_days * 86400
+        doomed.update(p for p in rotated if os.path.getmtime(p) < cutoff)
+    for path in doomed:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Lecture transparente
+# ---------------------------------------------------------------------------
+def list_rotated(log_path: str) -> List[str]:
+    """Segments tournés (compressés ou non), du plus ancien au plus récent."""
+    found = []
+    for path in glob.glob(glob.escape(log_path) + ".*"):
+        m = _SUFFIX_RE.fullmatch(path[len(log_path):])
+        if m:
+            found.append((m.group(1), int(m.group(2) or 0), path))
+    return [path for _, _, path in sorted(found)]
+
+
+def list_segments(log_path: str) -> List[str]:
+    """Tous les segments, du plus ancien au segment courant."""
+    segments = list_rotated(log_path)
+    if os.path.isfile(log_path):
+        segments.append(log_path)
+    return segments
+
+
+def open_segment(path: str) -> IO[str]:
+    """Ouvre un segment en texte, qu'il soit compressé ou non (lecture en flux)."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            raise OSError(f"Module zstandard requis pour lire {path}")
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_log_lines(log_path: str, since: Optional[float] = None) -> Iterator[str]:
+    """
+    Itère sur toutes les lignes de tous les segments, sans tout charger.
+    Avec `since`, les segments tournés avant cette date (horodatage de
+    bascule = fin du segment) ne sont pas ouverts.
+    """
+    for path in list_segments(log_path):
+        if since is not None and path != log_path:
+            m = _SUFFIX_RE.fullmatch(path[len(log_path):])
+            if m and datetime.strptime(m.group(1), "%Y%m%d-%H%M%S").timestamp() < since:
+                continue
+        try:
+            with open_segment(path) as f:
+                yield from f
+        except OSError:
+            continue  # segment supprimé par la rétention entre-temps
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _rotated_name(base: str) -> str:
+    """Nom du segment tourné ; suffixe -N croissant si la seconde est déjà prise."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    taken = []
+    for path in glob.glob(glob.escape(f"{base}.{stamp}") + "*"):
+        m = _SUFFIX_RE.fullmatch(path[len(base):])
+        if m and m.group(1) == stamp:
+            taken.append(int(m.group(2) or 0))
+    if not taken:
+        return f"{base}.{stamp}"
+    return f"{base}.{stamp}-{max(taken) + 1}"
+
+
+def _compress(path: str, compression: str) -> None:
+    if compression not in ("gzip", "zstd"):
+        return
+    suffix = ".gz" if compression == "gzip" else ".zst"
+    tmp = path + suffix + ".tmp"
+    try:
+        with open(path, "rb") as src:
+            if compression == "gzip":
+                with gzip.open(tmp, "wb", compresslevel=6) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            else:
+                with open(tmp, "wb") as out:
+                    with zstandard.ZstdCompressor(level=3).stream_writer(out) as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+    except BaseException:
+        # Un .tmp n'est jamais listé comme segment : il resterait pour toujours
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    os.replace(tmp, path + suffix)
+    os.remove(path)
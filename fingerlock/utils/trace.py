@@ -0,0 +1,121 @@
+"""
+utils/trace.py
+--------------
+Traçage léger des étapes de verrouillage / déverrouillage.
+
+Les spans (durées) et instants sont horodatés avec time.monotonic_ns()
+et conservés dans un anneau mémoire borné (CAPACITY événements) : coût
+d'un append, aucune E/S. L'anneau s'exporte au format Chrome trace-event
+(chrome://tracing, Perfetto) :
+
+    with span("LockScreen.__init__"):
+        ...
+    instant("idle.deadline", late_ms=12.5)
+
+    export_chrome("/tmp/fingerlock-trace.json")
+
+Jalons utilisés par latency() :
+    idle.deadline            → lockscreen.painted   (verrouillage)
+    pattern.point (dernier)  → desktop.usable       (déverrouillage)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+CAPACITY = 4096
+
+# (phase, nom, catégorie, début ns, durée ns, thread, args)
+Event = Tuple[str, str, str, int, int, int, Dict[str, Any]]
+
+_ring: "deque[Event]" = deque(maxlen=CAPACITY)
+
+
+class span:
+    """Context manager : enregistre un événement "X" (durée) en sortie."""
+
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name: str, cat: str = "fingerlock", **args: Any):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> "span":
+        self.start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.monotonic_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _ring.append(("X", self.name, self.cat, self.start, end - self.start,
+                      threading.get_ident(), self.args))
+
+
+def instant(name: str, cat: str = "fingerlock", **args: Any) -> None:
+    """Jalon ponctuel (événement "i")."""
+    _ring.append(("i", name, cat, time.monotonic_ns(), 0, threading.get_ident(), args))
+
+
+def events() -> List[Event]:
+    return list(_ring)
+
+
+def clear() -> None:
+    _ring.clear()
+
+
+def latency(start: str, end: str) -> Optional[float]:
+    """
+    Durée (ms) entre le dernier jalon `start` suivi d'un jalon `end`,
+    en comptant jusqu'à la fin de `end` si c'est un span. None si absent.
+    """
+    end_ts = None
+    for phase, name, _, ts, dur, _, _ in reversed(_ring):
+        if end_ts is None:
+            if name == end:
+                end_ts = ts + dur
+        elif name == start:
+            return (end_ts - ts) / 1e6
+    return None
+
+
+def to_chrome() -> Dict[str, Any]:
+    """Document Chrome trace-event (ts et dur en microsecondes)."""
+    pid = os.getpid()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    trace = []
+    tids = set()
+    for phase, name, cat, ts, dur, tid, args in list(_ring):
+        event = {"name": name, "cat": cat, "ph": phase, "ts": ts / 1000,
+                 "pid": pid, "tid": tid, "args": args}
+        if phase == "X":
+            event["dur"] = dur / 1000
+        else:
+            event["s"] = "t"
+        trace.append(event)
+        tids.add(tid)
+    for tid in tids:
+        trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                      "args": {"name": names.get(tid, f"thread-{tid}")}})
+    return {
+        "traceEvents": trace,
+        "displayTimeUnit": "ms",
+        # Correspondance horloge monotone ↔ heure murale pour recouper les logs
+        "otherData": {"monotonic_ns": time.monotonic_ns(), "wall_time": time.time()},
+    }
+
+
+def export_chrome(path: str) -> int:
+    """Écrit l'anneau au format Chrome trace-event ; retourne le nb d'événements."""
+    doc = to_chrome()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+    return sum(1 for e in doc["traceEvents"] if e["ph"] != "M")
@@ -0,0 +1,32 @@
+"""
+utils/values.py
+---------------
+Lecture validée des valeurs numériques de la config, et arrondi des
+métriques optionnelles.
+
+Les builders `xxx_from_config` s'en servent pour lever la même ValueError,
+avec le même message, quelle que soit la clé.
+"""
+
+from typing import Any, Dict, Optional
+
+
+def config_number(config: Dict[str, Any], key: str, default: float, minimum: float) -> float:
+    """config[key] (ou default) en float ; ValueError si ce n'est pas un nombre >= minimum."""
+    value = config.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < minimum:
+        raise ValueError(f"{key} doit être un nombre >= {minimum:g}")
+    return float(value)
+
+
+def config_int(config: Dict[str, Any], key: str, default: int, minimum: int = 1) -> int:
+    """config[key] (ou default) ; ValueError si ce n'est pas un entier >= minimum."""
+    value = config.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise ValueError(f"{key} doit être un entier >= {minimum}")
+    return value
+
+
+def round_or_none(value: Optional[float], digits: int = 3) -> Optional[float]:
+    """round() qui laisse passer None (métrique pas encore mesurée)."""
+    return None if value is None else round(value, digits)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_ann.py
+--------------------
+Index IVF (face/ann.py) contre la recherche exacte (Gallery.match) sur
+une galerie synthétique de grande taille.
+
+Pour chaque nprobe : µs par requête, lignes comparées, et rappel au seuil
+de reconnaissance. Le rappel est la part des requêtes acceptées par la
+recherche exacte (distance ≤ seuil) que l'index accepte aussi, pour le
+même utilisateur. L'index ne peut pas créer de faux accepté : sa distance
+est toujours ≥ la distance exacte.
+
+Usages :
+    python scripts/bench_ann.py                          # 10000 utilisateurs × 5
+    python scripts/bench_ann.py --users 50000 -k 2
+    python scripts/bench_ann.py --nprobe 1 2 4 8 16 32 --noise 0.04
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_gallery import synthetic
+from fingerlock.face.ann import build_index
+from fingerlock.face.gallery import Gallery
+
+
+def queries(mapping, count, dim, noise, seed=3):
+    """Nouveaux échantillons d'utilisateurs enrôlés (3/4) et inconnus (1/4)."""
+    rng = np.random.default_rng(seed)
+    users = list(mapping)
+    out = []
+    for i in range(count):
+        if i % 4:
+            base = mapping[users[rng.integers(len(users))]].mean(axis=0)
+        else:
+            base = rng.normal(size=dim)
+            base /= np.linalg.norm(base)
+        out.append(base + rng.normal(scale=noise, size=dim))
+    return np.array(out, dtype=np.float32)
+
+
+def timed(fn, qs):
+    t0 = time.perf_counter()
+    results = [fn(q) for q in qs]
+    return (time.perf_counter() - t0) / len(qs) * 1e6, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rappel et vitesse de l'index IVF")
+    parser.add_argument("--users", type=int, default=10000, help="Nombre d'utilisateurs")
+    parser.add_argument("-k", type=int, default=5, help="Embeddings par utilisateur")
+    parser.add_argument("--dim", type=int, default=128, help="Dimension des embeddings")
+    parser.add_argument("--queries", type=int, default=1000, help="Requêtes mesurées")
+    parser.add_argument("--noise", type=float, default=0.03, help="Bruit par dimension des requêtes")
+    parser.add_argument("--threshold", type=float, default=0.6, help="recognition_threshold")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Listes parcourues")
+    args = parser.parse_args()
+
+    mapping = synthetic(args.users, args.k, args.dim)
+    gallery = Gallery.from_users(mapping)
+    qs = queries(mapping, args.queries, args.dim, args.noise)
+
+    t0 = time.perf_counter()
+    index = build_index(gallery)
+    build_s = time.perf_counter() - t0
+
+    exact_us, exact = timed(lambda q: gallery.match(q, args.threshold), qs)
+    accepted = [i for i, (user, _) in enumerate(exact) if user is not None]
+
+    print(f"\n  Galerie : {args.users} utilisateurs × {args.k} = {len(gallery)} lignes, "
+          f"{index.n_lists} listes IVF construites en {build_s:.1f} s")
+    print(f"  Requêtes : {len(qs)} dont {len(accepted)} acceptées par la recherche exacte "
+          f"(seuil {args.threshold})\n")
+    print(f"  {'méthode':<14} {'µs/requête':>11} {'lignes':>8} {'gain':>7} {'rappel':>9} {'faux acc.':>10}")
+    print(f"  {'exacte':<14} {exact_us:>11.1f} {len(gallery):>8} {'×1':>7} {'100.00%':>9} {0:>10}")
+
+    for nprobe in args.nprobe:
+        scanned = []
+
+        def probe(q):
+            result = index.match(q, args.threshold, nprobe=nprobe)
+            scanned.append(index.last_scanned)
+            return result
+
+        us, approx = timed(probe, qs)
+        hits = sum(approx[i][0] == exact[i][0] for i in accepted)
+        recall = hits / max(1, len(accepted))
+        false_accepts = sum(a[0] is not None and e[0] is None for a, e in zip(approx, exact))
+        print(f"  {'nprobe=' + str(nprobe):<14} {us:>11.1f} {np.mean(scanned):>8.0f} "
+              f"{'×' + format(exact_us / us, '.0f'):>7} {recall * 100:>8.2f}% {false_accepts:>10}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
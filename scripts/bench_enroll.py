@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_enroll.py
+-----------------------
+Enrôlement tamponné (ancien flux : chaque frame détectée puis encodée
+dans la boucle de capture, moyenne de `capture_count` embeddings) vs
+enrôlement en flux (face/enroll.py : pipeline, encodage en parallèle,
+Welford, rejet des aberrants, arrêt à convergence).
+
+Caméra simulée par une pile .npy rejouée en temps réel. L'indice de
+chaque frame est inscrit dans son premier pixel ; l'encodeur synthétique
+(CPU réel, GIL tenu) en déduit un embedding : propriétaire + bruit, avec
+une part --outliers de frames aberrantes (autre visage ou flou).
+
+Rapporte durée, embeddings encodés / acceptés / rejetés, erreur de
+l'embedding final par rapport au vrai, et qualité déclarée.
+
+Usages :
+    python scripts/bench_enroll.py
+    python scripts/bench_enroll.py --workers 4 --encode-ms 80 --capture-count 40
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fingerlock.face.enroll import DEFAULT_TOLERANCE, run_enrollment
+from fingerlock.face.gallery import Gallery
+from fingerlock.face.pipeline import VideoFileSource
+
+DIM = 128
+OWNER = np.random.default_rng(1).normal(scale=0.09, size=DIM)
+OTHER = np.random.default_rng(2).normal(scale=0.09, size=DIM)
+
+
+class NoisyEncoder:
+    """Embedding de la frame d'indice i (pixel (0, 0)) au coût `ms` de CPU."""
+
+    def __init__(self, ms: float, jitter: float, outliers: float):
+        self.ms = ms
+        self.sigma = jitter / np.sqrt(DIM)
+        self.outliers = outliers
+
+    def encode(self, rgb, boxes):
+        index = int(rgb[0, 0, 0]) | int(rgb[0, 0, 1]) << 8 | int(rgb[0, 0, 2]) << 16
+        end = time.thread_time() + self.ms / 1000
+        while time.thread_time() < end:
+            pass
+        rng = np.random.default_rng(index)
+        kind = rng.random()
+        if kind < self.outliers / 2:
+            base, sigma = OTHER, self.sigma          # autre visage
+        elif kind < self.outliers:
+            base, sigma = OWNER, self.sigma * 2.5    # frame floue
+        else:
+            base, sigma = OWNER, self.sigma
+        return [base + rng.normal(scale=sigma, size=DIM) for _ in boxes]
+
+
+class CenterDetector:
+    def __init__(self, ms: float = 0.0):
+        self.ms = ms
+
+    def detect(self, rgb):
+        end = time.thread_time() + self.ms / 1000
+        while time.thread_time() < end:
+            pass
+        return [(0.35, 0.25, 0.3, 0.4, 0.99)]
+
+
+def make_clip(path: str, frames: int) -> None:
+    clip = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(frames, 480, 640, 3))
+    index = np.arange(frames)
+    clip[:, 0, 0, 0] = index & 0xFF
+    clip[:, 0, 0, 1] = (index >> 8) & 0xFF
+    clip[:, 0, 0, 2] = (index >> 16) & 0xFF
+    clip.flush()
+
+
+def buffered(video, fps, count, detector, encoder):
+    """Ancien flux : lire, détecter, encoder frame par frame ; moyenne finale."""
+    source = VideoFileSource(video, fps=fps)
+    source.open()
+    start = time.monotonic()
+    embeddings = []
+    while len(embeddings) < count:
+        image = source.read()
+        if image is None:
+            break
+        h, w = image.shape[:2]
+        boxes = [(int(y * h), int((x + bw) * w), int((y + bh) * h), int(x * w))
+                 for x, y, bw, bh, _ in detector.detect(image)]
+        if boxes:
+            embeddings.append(np.asarray(encoder.encode(image, boxes[:1])[0]))
+    source.close()
+    return np.mean(embeddings, axis=0), len(embeddings), time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrôlement tamponné vs en flux")
+    parser.add_argument("--capture-count", type=int, default=30, help="capture_count")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="enroll_tolerance")
+    parser.add_argument("--fps", type=float, default=30.0, help="Cadence de la caméra simulée")
+    parser.add_argument("--encode-ms", type=float, default=60.0, help="CPU d'encodage synthétique")
+    parser.add_argument("--detect-ms", type=float, default=10.0, help="CPU de détection synthétique")
+    parser.add_argument("--jitter", type=float, default=0.15, help="Distance RMS d'une frame au vrai embedding")
+    parser.add_argument("--outliers", type=float, default=0.1, help="Part de frames aberrantes")
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1), help="Processus d'encodage")
+    args = parser.parse_args()
+
+    encoder_args = (args.encode_ms, args.jitter, args.outliers)
+    config = {"capture_count": args.capture_count, "enroll_tolerance": args.tolerance}
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "camera.npy")
+        make_clip(video, int(args.fps * 60))
+
+        mean, encoded, elapsed = buffered(video, args.fps, args.capture_count,
+                                          CenterDetector(args.detect_ms), NoisyEncoder(*encoder_args))
+        rows.append(("tamponné", elapsed, encoded, encoded, 0, float(np.linalg.norm(mean - OWNER)), "—"))
+
+        for workers in sorted({1, args.workers}):
+            config["gallery_path"] = os.path.join(tmp, f"gallery-{workers}.npz")
+            report = run_enrollment(config, workers=workers, source=VideoFileSource(video, fps=args.fps),
+                                    detector=CenterDetector(args.detect_ms), encoder_factory=NoisyEncoder,
+                                    encoder_args=encoder_args)
+            final = Gallery.load(report["path"]).rows("owner")[0]
+            rows.append((f"flux ×{workers}", report["elapsed_s"], report["frames"], report["accepted"],
+                         sum(report["rejected"].values()), float(np.linalg.norm(final - OWNER)),
+                         f"{report['quality']} ({report['stop_reason']})"))
+
+    print(f"\n  capture_count {args.capture_count}, tolérance {args.tolerance:g}, encodage {args.encode_ms:g} ms, "
+          f"{args.outliers * 100:.0f} % de frames aberrantes, {os.cpu_count()} cœur(s)\n")
+    print(f"  {'mode':<12} {'durée':>7} {'frames':>9} {'acceptées':>10} {'rejetées':>9} {'erreur':>8}  qualité")
+    for name, elapsed, encoded, accepted, rejected, error, quality in rows:
+        print(f"  {name:<12} {elapsed:>6.2f}s {encoded:>9} {accepted:>10} {rejected:>9} {error:>8.4f}  {quality}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_gallery.py
+------------------------
+Temps de match d'un embedding de frame contre une galerie N × K :
+boucle par utilisateur (np.linalg.norm sur chaque bloc, l'approche d'un
+fichier .npy par personne) vs Gallery.match() (un produit matrice-vecteur).
+
+Usages :
+    python scripts/bench_gallery.py                     # 1000 utilisateurs × 5
+    python scripts/bench_gallery.py --users 200 -k 10
+    python scripts/bench_gallery.py --repeat 5000
+
+Les embeddings sont synthétiques (128-d, normalisés comme face_recognition).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fingerlock.face.gallery import Gallery
+
+
+def synthetic(users: int, k: int, dim: int, seed: int = 0):
+    """{utilisateur: (k, dim)} : un centre par personne + bruit intra-personne."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(users, dim))
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    return {
+        f"user{i:05d}": centers[i] + rng.normal(scale=0.02, size=(k, dim))
+        for i in range(users)
+    }
+
+
+def naive_match(mapping, q):
+    best_user, best = None, float("inf")
+    for user, rows in mapping.items():
+        d = float(np.linalg.norm(rows - q, axis=1).min())
+        if d < best:
+            best_user, best = user, d
+    return best_user, best
+
+
+def timed_us(fn, q, repeat):
+    fn(q)   # échauffement
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(q)
+    return (time.perf_counter() - t0) / repeat * 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du matching de galerie")
+    parser.add_argument("--users", type=int, default=1000, help="Nombre d'utilisateurs")
+    parser.add_argument("-k", type=int, default=5, help="Embeddings par utilisateur")
+    parser.add_argument("--dim", type=int, default=128, help="Dimension des embeddings")
+    parser.add_argument("--repeat", type=int, default=2000, help="Matches chronométrés")
+    args = parser.parse_args()
+
+    mapping = synthetic(args.users, args.k, args.dim)
+    t0 = time.perf_counter()
+    gallery = Gallery.from_users(mapping)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    target = "user00042" if args.users > 42 else "user00000"
+    q = mapping[target][0] + np.random.default_rng(1).normal(scale=0.02, size=args.dim)
+
+    naive_repeat = max(10, args.repeat // 50)
+    naive_us, (naive_user, naive_d) = timed_us(lambda x: naive_match(mapping, x), q, naive_repeat)
+    fast_us, (user, d) = timed_us(gallery.match, q, args.repeat)
+
+    print(f"\n  Galerie : {args.users} utilisateurs × {args.k} = {len(gallery)} lignes "
+          f"× {args.dim} ({gallery.embeddings.nbytes / 1024:.0f} Ko), construite en {build_ms:.1f} ms\n")
+    print(f"  {'méthode':<28} {'µs / match':>12}   résultat")
+    print(f"  {'boucle par utilisateur':<28} {naive_us:>12.1f}   {naive_user} d={naive_d:.4f}")
+    print(f"  {'Gallery.match()':<28} {fast_us:>12.1f}   {user} d={d:.4f}")
+    print(f"\n  Gain : ×{naive_us / fast_us:.0f}   (attendu : {target})\n")
+    if user != naive_user or abs(d - naive_d) > 1e-3:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
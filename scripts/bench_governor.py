@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_governor.py
+-------------------------
+Cadence fixe vs régulée (face/governor.py) sur un scénario rejoué en
+temps réel : visage reconnu au calme, puis pendant une "compilation"
+(--hogs processus qui saturent le CPU), puis absent.
+
+Le détecteur synthétique consomme un CPU proportionnel au nombre de
+pixels de l'image de détection (--detect-ms à 320×240) : sous charge, sa
+latence murale s'allonge comme celle d'un vrai détecteur.
+
+Rapporte par phase : CPU du processus, latence de détection moyenne,
+cadence obtenue et largeur de détection ; puis les décisions du Governor.
+
+Usages :
+    python scripts/bench_governor.py
+    python scripts/bench_governor.py --hogs 3 --target-ms 20 --max-fps 15
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fingerlock.face.gallery import Gallery
+from fingerlock.face.governor import Governor
+from fingerlock.face.pipeline import FacePipeline, VideoFileSource
+from fingerlock.face.tracker import FaceTracker
+
+PHASES = ("calme", "compilation", "absent")
+OWNER = np.random.default_rng(1).normal(scale=0.1, size=128)
+
+
+def _burn(ms: float) -> None:
+    end = time.thread_time() + ms / 1000
+    while time.thread_time() < end:
+        pass
+
+
+def _hog() -> None:
+    while True:
+        pass
+
+
+class Clock:
+    """Phase courante du scénario."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.start = time.monotonic()
+
+    def phase(self) -> str:
+        index = int((time.monotonic() - self.start) // self.seconds)
+        return PHASES[index] if index < len(PHASES) else "fin"
+
+
+class PixelDetector:
+    def __init__(self, clock: Clock, ms: float):
+        self.clock = clock
+        self.ms = ms
+
+    def detect(self, rgb):
+        _burn(self.ms * rgb.shape[0] * rgb.shape[1] / (320 * 240))
+        return [(0.35, 0.25, 0.3, 0.4, 0.99)] if self.clock.phase() != "absent" else []
+
+
+class OwnerEncoder:
+    def __init__(self, ms: float):
+        self.ms = ms
+
+    def encode(self, rgb, boxes):
+        out = []
+        for _ in boxes:
+            _burn(self.ms)
+            out.append(OWNER)
+        return out
+
+
+def run(video, args, governor):
+    ctx = get_context("spawn")
+    clock = Clock(args.seconds)
+    samples = {p: [] for p in PHASES}
+    pipeline = FacePipeline(VideoFileSource(video, fps=30.0, loop=True), PixelDetector(clock, args.detect_ms),
+                            OwnerEncoder(args.encode_ms), Gallery.from_users({"owner": OWNER}), 0.6,
+                            max_fps=args.max_fps, detect_width=args.max_width,
+                            tracker=FaceTracker(), governor=governor,
+                            on_result=lambda f: samples.setdefault(clock.phase(), []).append(
+                                (f.timings["detect"], pipeline.detect_width)))
+    cpu = dict.fromkeys(PHASES, 0.0)
+    hogs = []
+    pipeline.start()
+    cpu0 = time.process_time()
+    try:
+        while True:
+            phase = clock.phase()
+            if phase == "fin":
+                break
+            if phase == "compilation" and not hogs:
+                hogs = [ctx.Process(target=_hog, daemon=True) for _ in range(args.hogs)]
+                for proc in hogs:
+                    proc.start()
+            elif phase != "compilation" and hogs:
+                for proc in hogs:
+                    proc.terminate()
+                hogs = []
+            time.sleep(0.1)
+            cpu1 = time.process_time()
+            cpu[phase] += cpu1 - cpu0
+            cpu0 = cpu1
+    finally:
+        for proc in hogs:
+            proc.terminate()
+        pipeline.stop()
+    rows = {}
+    for phase in PHASES:
+        frames = samples.get(phase) or [(0.0, 0)]
+        rows[phase] = {
+            "cpu": cpu[phase] / args.seconds * 100,
+            "detect_ms": float(np.mean([ms for ms, _ in frames])),
+            "fps": len(samples.get(phase) or []) / args.seconds,
+            "width": float(np.mean([w for _, w in frames])),
+        }
+    return rows, pipeline.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cadence fixe vs Governor (latence, charge, confirmation)")
+    parser.add_argument("--seconds", type=float, default=8.0, help="Durée de chaque phase")
+    parser.add_argument("--hogs", type=int, default=2, help="Processus de charge pendant la compilation")
+    parser.add_argument("--max-fps", type=float, default=10.0, help="Plafond (et cadence fixe)")
+    parser.add_argument("--min-fps", type=float, default=1.0, help="Plancher")
+    parser.add_argument("--max-width", type=int, default=640, help="Largeur de détection max")
+    parser.add_argument("--target-ms", type=float, default=25.0, help="Latence de détection visée")
+    parser.add_argument("--detect-ms", type=float, default=10.0, help="CPU de détection à 320×240")
+    parser.add_argument("--encode-ms", type=float, default=30.0, help="CPU d'encodage synthétique")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "clip.npy")
+        clip = np.lib.format.open_memmap(video, mode="w+", dtype=np.uint8, shape=(30, 480, 640, 3))
+        clip.flush()
+        fixed, _ = run(video, args, None)
+        governor = Governor(min_fps=args.min_fps, max_fps=args.max_fps, target_ms=args.target_ms,
+                            max_width=args.max_width)
+        governed, metrics = run(video, args, governor)
+
+    print(f"\n  {args.seconds:g}s par phase, {os.cpu_count()} cœur(s), {args.hogs} processus de charge, "
+          f"cible {args.target_ms:g} ms\n")
+    print(f"  {'phase':<12} {'mode':<8} {'CPU':>7} {'détection':>10} {'fps':>6} {'largeur':>8}")
+    for phase in PHASES:
+        for name, rows in (("fixe", fixed), ("régulé", governed)):
+            r = rows[phase]
+            print(f"  {phase:<12} {name:<8} {r['cpu']:>6.1f}% {r['detect_ms']:>8.1f}ms "
+                  f"{r['fps']:>6.1f} {r['width']:>8.0f}")
+    g = metrics["governor"]
+    print(f"\n  Governor : {g['evaluations']} évaluations, {g['changes']} changements ; décisions :")
+    for d in g["history"][-12:]:
+        print(f"    fps {d['fps']:>5}  largeur {d['detect_width']:>4}  détection {d['detect_ms']} ms  "
+              f"charge {d['load']}  ({d['reason']})")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_logging.py
+------------------------
+Compare la latence vue par l'appelant de log_lock()/log_system() :
+handlers synchrones (ancien comportement) vs pipeline file d'attente.
+
+Usages :
+    python scripts/bench_logging.py               # 5 000 appels par mode
+    python scripts/bench_logging.py -n 100000     # Nombre d'appels
+    python scripts/bench_logging.py --tty         # Garder la sortie console
+    python scripts/bench_logging.py --pace 0      # Rafale continue (pas de pause)
+
+Par défaut, une courte pause sépare les appels, comme sur le chemin
+lock/unlock réel où les logs sont espacés.
+
+La sortie console est redirigée vers /dev/null sauf avec --tty.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerlock.utils import logger as fl_logger
+
+
+def measure(log_path: str, asynchronous: bool, n: int, pace: float) -> dict:
+    fl_logger.setup_logger(log_path, asynchronous=asynchronous)
+    samples = []
+    for i in range(n):
+        t0 = time.perf_counter_ns()
+        if i % 2:
+            fl_logger.log_lock(f"Verrouillage après {i}s")
+        else:
+            fl_logger.log_system(f"Événement système #{i}")
+        samples.append(time.perf_counter_ns() - t0)
+        if pace:
+            time.sleep(pace)
+
+    t0 = time.perf_counter()
+    fl_logger.shutdown_logger()
+    drain_ms = (time.perf_counter() - t0) * 1000
+
+    samples.sort()
+    return {
+        "mean_us":  statistics.fmean(samples) / 1000,
+        "p50_us":   samples[len(samples) // 2] / 1000,
+        "p99_us":   samples[int(len(samples) * 0.99)] / 1000,
+        "max_us":   samples[-1] / 1000,
+        "drain_ms": drain_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline de logs")
+    parser.add_argument("-n", type=int, default=5000, help="Appels par mode")
+    parser.add_argument("--pace", type=float, default=0.0002, help="Pause entre appels (s)")
+    parser.add_argument("--tty", action="store_true", help="Ne pas rediriger la console")
+    args = parser.parse_args()
+
+    real_stdout = sys.stdout
+    devnull = None if args.tty else open(os.devnull, "w")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, asynchronous in (("synchrone", False), ("file d'attente", True)):
+            if devnull:
+                sys.stdout = devnull
+            try:
+                results[label] = measure(os.path.join(tmp, f"{asynchronous}.log"), asynchronous, args.n, args.pace)
+            finally:
+                sys.stdout = real_stdout
+
+    print(f"\n  ── Latence appelant ({args.n} appels) ──\n")
+    print(f"    {'mode':<16}{'moy µs':>10}{'p50 µs':>10}{'p99 µs':>10}{'max µs':>10}{'drain ms':>11}")
+    for label, r in results.items():
+        print(f"    {label:<16}{r['mean_us']:>10.2f}{r['p50_us']:>10.2f}{r['p99_us']:>10.2f}"
+              f"{r['max_us']:>10.1f}{r['drain_ms']:>11.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_presence.py
+-------------------------
+Présence fusionnée (face/presence.py) : CPU et instant de verrouillage
+sur un scénario scripté rejoué en temps réel, dans trois modes :
+
+    evdev seul           inactivité clavier/souris uniquement
+    caméra permanente    pipeline caméra ouvert en continu
+    fusion               caméra ouverte `--lead` s avant l'échéance
+
+Scénario : saisie (--typing s), lecture sans saisie devant l'écran
+(--reading s), puis absence (--away s). Les étages synthétiques
+consomment du CPU réel (--detect-ms, --encode-ms) ; la boucle reproduit
+celle du watcher (tour de 100 ms, PresenceGate.update).
+
+Usages :
+    python scripts/bench_presence.py
+    python scripts/bench_presence.py --delay 5 --lead 2 --fps 5 --encode-ms 80
+
+Attendu : CPU de la phase de saisie au niveau d'evdev seul en fusion, et
+même verrouillage (fin de lecture + délai) qu'avec la caméra permanente.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fingerlock.face.gallery import Gallery
+from fingerlock.face.pipeline import FacePipeline, VideoFileSource
+from fingerlock.face.presence import PresenceGate
+from fingerlock.face.tracker import FaceTracker
+
+TICK = 0.1     # s, tour de boucle du watcher
+OWNER = np.random.default_rng(1).normal(scale=0.1, size=128)
+
+
+def _burn(ms: float) -> None:
+    end = time.thread_time() + ms / 1000
+    while time.thread_time() < end:
+        pass
+
+
+class Scenario:
+    """Phase courante (saisie / lecture / absence) selon le temps écoulé."""
+
+    def __init__(self, typing: float, reading: float, away: float):
+        self.bounds = (("saisie", typing), ("lecture", typing + reading), ("absence", typing + reading + away))
+        self.start = time.time()
+
+    def phase(self, now: float) -> str:
+        elapsed = now - self.start
+        for name, end in self.bounds:
+            if elapsed < end:
+                return name
+        return "fin"
+
+    def face(self) -> bool:
+        return self.phase(time.time()) != "absence"
+
+
+class ScenarioDetector:
+    def __init__(self, scenario: Scenario, ms: float):
+        self.scenario = scenario
+        self.ms = ms
+
+    def detect(self, rgb):
+        _burn(self.ms)
+        return [(0.35, 0.25, 0.3, 0.4, 0.99)] if self.scenario.face() else []
+
+
+class OwnerEncoder:
+    def __init__(self, ms: float):
+        self.ms = ms
+
+    def encode(self, rgb, boxes):
+        out = []
+        for _ in boxes:
+            _burn(self.ms)
+            out.append(OWNER)
+        return out
+
+
+def run(mode: str, args, video: str):
+    scenario = Scenario(args.typing, args.reading, args.away)
+    gallery = Gallery.from_users({"owner": OWNER})
+
+    def factory(on_result):
+        return FacePipeline(VideoFileSource(video, fps=30.0, loop=True), ScenarioDetector(scenario, args.detect_ms),
+                            OwnerEncoder(args.encode_ms), gallery, 0.6, on_result=on_result,
+                            max_fps=args.fps, tracker=FaceTracker())
+
+    gate = None
+    if mode == "caméra permanente":
+        gate = PresenceGate({}, lead=float("inf"), factory=factory)
+    elif mode == "fusion":
+        gate = PresenceGate({}, lead=args.lead, factory=factory)
+
+    cpu = {name: 0.0 for name, _ in scenario.bounds}
+    last_activity = scenario.start
+    locked_at = None
+    cpu0 = time.process_time()
+    while True:
+        now = time.time()
+        phase = scenario.phase(now)
+        if phase == "fin":
+            break
+        if phase == "saisie":
+            last_activity = now
+        seen = last_activity
+        if gate is not None:
+            seen = gate.update(now, last_activity, args.delay, armed=locked_at is None)
+        if locked_at is None and now - seen >= args.delay:
+            locked_at = now - scenario.start
+            if gate is not None:
+                gate.sleep()
+        time.sleep(TICK)
+        cpu1 = time.process_time()
+        cpu[phase] += cpu1 - cpu0
+        cpu0 = cpu1
+
+    metrics = gate.metrics() if gate is not None else {}
+    if gate is not None:
+        gate.close()
+    return cpu, locked_at, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU et verrouillage : evdev seul, caméra permanente, fusion")
+    parser.add_argument("--delay", type=float, default=4.0, help="lock_delay_seconds")
+    parser.add_argument("--lead", type=float, default=1.5, help="presence_lead_seconds")
+    parser.add_argument("--fps", type=float, default=10.0, help="Cadence de capture")
+    parser.add_argument("--typing", type=float, default=8.0, help="Durée de la saisie (s)")
+    parser.add_argument("--reading", type=float, default=8.0, help="Durée de la lecture sans saisie (s)")
+    parser.add_argument("--away", type=float, default=6.0, help="Durée de l'absence (s)")
+    parser.add_argument("--detect-ms", type=float, default=8.0, help="CPU de détection synthétique")
+    parser.add_argument("--encode-ms", type=float, default=40.0, help="CPU d'encodage synthétique")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "clip.npy")
+        clip = np.lib.format.open_memmap(video, mode="w+", dtype=np.uint8, shape=(30, 480, 640, 3))
+        clip.flush()
+        rows = [(mode, *run(mode, args, video)) for mode in ("evdev seul", "caméra permanente", "fusion")]
+
+    expected = args.typing + args.reading + args.delay
+    print(f"\n  Délai {args.delay:g}s, avance {args.lead:g}s, {args.fps:g} fps ; "
+          f"verrouillage attendu vers {expected:.1f}s (fin de lecture + délai)\n")
+    print(f"  {'mode':<18} {'CPU saisie':>11} {'lecture':>9} {'absence':>9} {'verrou.':>9} {'caméra':>8} {'réveils':>8}")
+    for mode, cpu, locked_at, m in rows:
+        shares = [cpu[p] / d * 100 for p, d in (("saisie", args.typing), ("lecture", args.reading),
+                                                  ("absence", args.away))]
+        lock = f"{locked_at:.1f}s" if locked_at is not None else "—"
+        camera = f"{m['camera_s']:.1f}s" if m else "—"
+        print(f"  {mode:<18} {shares[0]:>10.1f}% {shares[1]:>8.1f}% {shares[2]:>8.1f}% {lock:>9} "
+              f"{camera:>8} {m.get('wakes', '—'):>8}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
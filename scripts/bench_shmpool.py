@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_shmpool.py
+------------------------
+Encodage dans le thread de reconnaissance vs pool de processus alimenté
+par l'anneau de frames en mémoire partagée (face/shmpool.py).
+
+1. Transfert d'une frame vers un worker : frame sérialisée dans une
+   multiprocessing.Queue vs indice de slot (l'image reste en place).
+2. Pipeline temps réel avec un encodeur synthétique qui garde le GIL
+   (boucle Python, comme un encodage qui ne le relâche pas) : débit de
+   reconnaissance, régularité de la capture (pire écart entre frames) et
+   frames jetées, encodeur en thread puis en processus.
+
+Usages :
+    python scripts/bench_shmpool.py
+    python scripts/bench_shmpool.py --workers 4 --encode-ms 80
+    python scripts/bench_shmpool.py --width 1280 --height 720 --seconds 5
+
+Le débit en processus croît avec --workers tant qu'il reste des cœurs libres.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fingerlock.face.gallery import Gallery
+from fingerlock.face.pipeline import FacePipeline, VideoFileSource
+from fingerlock.face.shmpool import FrameRing, ProcessEncoder
+
+EMBEDDING = np.random.default_rng(1).normal(scale=0.1, size=128)
+
+
+class GilEncoder:
+    """Encodeur synthétique : `ms` de CPU en boucle Python (GIL tenu) par visage."""
+
+    def __init__(self, ms: float):
+        self.ms = ms
+
+    def encode(self, rgb, boxes):
+        out = []
+        for top, right, bottom, left in boxes:
+            checksum = int(rgb[top:bottom:8, left:right:8].sum())   # lit l'image
+            end = time.thread_time() + self.ms / 1000
+            while time.thread_time() < end:
+                checksum += 1
+            out.append(EMBEDDING)
+        return out
+
+
+class CenterDetector:
+    def detect(self, rgb):
+        return [(0.35, 0.25, 0.3, 0.4, 0.99)]
+
+
+def _echo(queue, back):
+    while True:
+        item = queue.get()
+        if item is None:
+            return
+        back.put(time.monotonic() - item[0])
+
+
+def transfer_cost(shape, count, ctx):
+    """µs moyens entre put() et réception côté worker : frame vs indice de slot."""
+    frame = np.zeros(shape, dtype=np.uint8)
+    results = {}
+    for label, payload in (("frame sérialisée", frame), ("indice de slot", 3)):
+        queue, back = ctx.Queue(), ctx.Queue()
+        proc = ctx.Process(target=_echo, args=(queue, back), daemon=True)
+        proc.start()
+        queue.put((time.monotonic(), payload))
+        back.get()   # échauffement
+        delays = []
+        for _ in range(count):
+            queue.put((time.monotonic(), payload))
+            delays.append(back.get())
+        queue.put(None)
+        proc.join()
+        results[label] = np.median(delays) * 1e6
+    return results
+
+
+def run_pipeline(video, fps, encoder, ring=None):
+    gaps, last = [], [None]
+    pipeline = FacePipeline(VideoFileSource(video, fps=fps), CenterDetector(), encoder,
+                            Gallery.from_users({"owner": EMBEDDING}), 0.6, ring=ring)
+    source_read = pipeline.source.read
+
+    def timed_read(out=None):
+        image = source_read(out=out)
+        now = time.monotonic()
+        if last[0] is not None:
+            gaps.append((now - last[0]) * 1000)
+        last[0] = now
+        return image
+
+    pipeline.source.read = timed_read
+    start = time.monotonic()
+    pipeline.start()
+    pipeline.wait()
+    elapsed = time.monotonic() - start
+    pipeline.stop()
+    m = pipeline.metrics()
+    return {
+        "results_fps": m["stages"]["recognize"]["frames"] / elapsed,
+        "max_gap_ms": max(gaps) if gaps else 0.0,
+        "dropped": sum(m["dropped"].values()),
+        "latency_ms": m["stages"]["latency"]["mean_ms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pool de processus + anneau de frames partagé")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30.0, help="Cadence de capture")
+    parser.add_argument("--seconds", type=float, default=4.0, help="Durée du rejeu")
+    parser.add_argument("--encode-ms", type=float, default=60.0, help="Coût d'encodage (GIL tenu)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processus d'encodage")
+    args = parser.parse_args()
+
+    shape = (args.height, args.width, 3)
+    ctx = get_context("spawn")
+    cost = transfer_cost(shape, 200, ctx)
+    print(f"\n  Transfert vers un worker ({args.width}×{args.height}, médiane) :")
+    for label, us in cost.items():
+        print(f"    {label:<18} {us:>9.1f} µs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "clip.npy")
+        clip = np.lib.format.open_memmap(video, mode="w+", dtype=np.uint8,
+                                         shape=(int(args.seconds * args.fps), *shape))
+        clip[:] = 128
+        clip.flush()
+
+        rows = [("thread (GIL)", run_pipeline(video, args.fps, GilEncoder(args.encode_ms)))]
+        ring = FrameRing(slots=args.workers + 4, shape=shape)
+        encoder = ProcessEncoder(ring, factory=GilEncoder, factory_args=(args.encode_ms,),
+                                 workers=args.workers)
+        try:
+            rows.append((f"processus ×{args.workers}", run_pipeline(video, args.fps, encoder, ring)))
+            copied = encoder.stats["copied"]
+        finally:
+            encoder.close()
+            ring.close()
+
+    print(f"\n  Pipeline à {args.fps:g} fps, encodage {args.encode_ms:g} ms "
+          f"({os.cpu_count()} cœur(s)) :\n")
+    print(f"  {'encodeur':<16} {'résultats/s':>12} {'écart capture max':>18} {'jetées':>7} {'latence':>9}")
+    for name, r in rows:
+        print(f"  {name:<16} {r['results_fps']:>12.1f} {r['max_gap_ms']:>16.1f}ms "
+              f"{r['dropped']:>7} {r['latency_ms']:>7.1f}ms")
+    print(f"\n  Copies de frames vers l'anneau hors capture : {copied}\n")
+
+
+if __name__ == "__main__":
+    main()
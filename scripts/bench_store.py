@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_store.py
+----------------------
+Perte de précision de la galerie quantifiée (float16 / int8, face/store.py)
+par rapport à une référence float64, sur des galeries synthétiques.
+
+Pour chaque format : taille du fichier, temps d'ouverture, µs par match,
+accord du meilleur utilisateur avec float64 (requêtes sous le seuil),
+erreur de distance (moyenne, max) et décisions inversées au seuil de reconnaissance.
+
+Usages :
+    python scripts/bench_store.py                       # 1000 et 10000 utilisateurs × 5
+    python scripts/bench_store.py --users 500 -k 10
+    python scripts/bench_store.py --queries 2000 --threshold 0.55
+
+Les requêtes mêlent des visages enrôlés (nouvel échantillon bruité) et des
+inconnus ; les fichiers sont écrits dans un répertoire temporaire.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_gallery import synthetic
+from fingerlock.face.gallery import Gallery
+from fingerlock.face.store import STORE_SUFFIX, open_store, write_store
+
+
+def queries(mapping, count, dim, seed=2):
+    """Moitié visages enrôlés (bruités), moitié inconnus."""
+    rng = np.random.default_rng(seed)
+    users = list(mapping)
+    out = []
+    for i in range(count):
+        if i % 2 == 0:
+            base = mapping[users[rng.integers(len(users))]].mean(axis=0)
+        else:
+            base = rng.normal(size=dim)
+            base /= np.linalg.norm(base)
+        out.append(base + rng.normal(scale=0.02, size=dim))
+    return np.array(out)
+
+
+def reference(mapping, qs):
+    """Meilleur utilisateur et distance exacts en float64."""
+    users = list(mapping)
+    rows = np.concatenate([np.atleast_2d(mapping[u]) for u in users]).astype(np.float64)
+    owner = np.repeat(np.arange(len(users)), [len(np.atleast_2d(mapping[u])) for u in users])
+    result = []
+    for q in qs:
+        d = np.linalg.norm(rows - q, axis=1)
+        row = int(d.argmin())
+        result.append((users[owner[row]], float(d[row])))
+    return result
+
+
+def evaluate(gallery, qs, ref, threshold):
+    t0 = time.perf_counter()
+    got = [gallery.match(q) for q in qs]
+    us = (time.perf_counter() - t0) / len(qs) * 1e6
+    # Accord du meilleur utilisateur là où il compte : matches acceptés en float64
+    accepted = [(g, r) for g, r in zip(got, ref) if r[1] <= threshold]
+    agree = sum(g[0] == r[0] for g, r in accepted) / max(1, len(accepted))
+    err = np.array([abs(g[1] - r[1]) for g, r in zip(got, ref)])
+    flips = sum((g[1] <= threshold) != (r[1] <= threshold) for g, r in zip(got, ref))
+    return us, agree, err.mean(), err.max(), flips
+
+
+def run(users, k, dim, n_queries, threshold, tmp):
+    mapping = synthetic(users, k, dim)
+    qs = queries(mapping, n_queries, dim)
+    ref = reference(mapping, qs)
+    gallery = Gallery.from_users(mapping)
+
+    print(f"\n  Galerie : {users} utilisateurs × {k} × {dim}   ({n_queries} requêtes, seuil {threshold})\n")
+    print(f"  {'format':<9} {'fichier':>9} {'ouverture':>10} {'µs/match':>9} "
+          f"{'top-1≤seuil':>11} {'err moy':>9} {'err max':>9} {'inversions':>11}")
+
+    npz = os.path.join(tmp, f"g{users}.npz")
+    gallery.save(npz)
+    t0 = time.perf_counter()
+    loaded = Gallery.load(npz)
+    open_ms = (time.perf_counter() - t0) * 1000
+    _row("float32", os.path.getsize(npz), open_ms, *evaluate(loaded, qs, ref, threshold))
+
+    for kind in ("float16", "int8"):
+        path = os.path.join(tmp, f"g{users}-{kind}{STORE_SUFFIX}")
+        size = write_store(path, gallery, kind)
+        t0 = time.perf_counter()
+        store = open_store(path)
+        open_ms = (time.perf_counter() - t0) * 1000
+        _row(kind, size, open_ms, *evaluate(store, qs, ref, threshold))
+
+
+def _row(name, size, open_ms, us, agree, err_mean, err_max, flips):
+    print(f"  {name:<9} {size / 1024:>7.0f}Ko {open_ms:>8.2f}ms {us:>9.1f} "
+          f"{agree * 100:>10.2f}% {err_mean:>9.2e} {err_max:>9.2e} {flips:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Précision de la galerie quantifiée vs float64")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000], help="Tailles de galerie")
+    parser.add_argument("-k", type=int, default=5, help="Embeddings par utilisateur")
+    parser.add_argument("--dim", type=int, default=128, help="Dimension des embeddings")
+    parser.add_argument("--queries", type=int, default=500, help="Requêtes par galerie")
+    parser.add_argument("--threshold", type=float, default=0.6, help="recognition_threshold")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for users in args.users:
+            run(users, args.k, args.dim, args.queries, args.threshold, tmp)
+    print()
+
+
+if __name__ == "__main__":
+    main()
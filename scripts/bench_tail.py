@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_tail.py
+---------------------
+Compare `fingerlock logs -n N` avant/après : readlines() complet vs
+lecture à rebours par blocs (read_last_lines), sur un gros fichier de log.
+
+Usages :
+    python scripts/bench_tail.py                 # Fichier de 1 Go, N=30
+    python scripts/bench_tail.py --size-mb 256   # Taille du fichier généré
+    python scripts/bench_tail.py --skip-naive    # Ne pas lancer readlines()
+
+Le fichier est généré dans un répertoire temporaire puis supprimé.
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerlock.utils.logger import read_last_lines
+
+LINE = "2025-06-15T10:30:45 | WARNING  | [10:30:45] 🔒 LOCK       Verrouillage après 12s\n"
+
+
+def generate(path: str, size_mb: int) -> None:
+    chunk = (LINE * 8192).encode("utf-8")
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(chunk)
+            written += len(chunk)
+
+
+def naive_tail(path: str, n: int):
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    return lines[-n:]
+
+
+def timed(fn, *args):
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = (time.perf_counter() - t0) * 1000
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result, elapsed, max(0, rss_after - rss_before) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de `fingerlock logs -n N`")
+    parser.add_argument("--size-mb", type=int, default=1024, help="Taille du log généré (Mo)")
+    parser.add_argument("-n", "--lines", type=int, default=30, help="Lignes demandées")
+    parser.add_argument("--skip-naive", action="store_true", help="Ignorer readlines()")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fingerlock.log")
+        print(f"\n  Génération d'un log de {args.size_mb} Mo...")
+        generate(path, args.size_mb)
+
+        print(f"\n  ── Tail de {args.lines} lignes ──\n")
+        # Le pic RSS est monotone : mesurer la version à rebours d'abord
+        fast, ms, rss = timed(read_last_lines, path, args.lines)
+        print(f"    {'lecture à rebours':<20}{ms:>10.2f} ms   +{rss:>8.1f} Mo RSS")
+
+        if not args.skip_naive:
+            slow, ms, rss = timed(naive_tail, path, args.lines)
+            print(f"    {'readlines()':<20}{ms:>10.2f} ms   +{rss:>8.1f} Mo RSS")
+            same = [l.rstrip("\n") for l in slow] == fast
+            print(f"\n    Résultats identiques : {'✅' if same else '❌'}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
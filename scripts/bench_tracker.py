@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_tracker.py
+------------------------
+Coût de la reconnaissance avec et sans suivi de visages (face/tracker.py)
+sur un même enregistrement rejoué sans perte (files bloquantes).
+
+Rapporte, par minute d'enregistrement : encodages, temps CPU du
+processus, et l'accord des identités frame par frame entre les deux runs.
+
+Étages réels (MediaPipe + face_recognition) avec --video ; sinon scénario
+synthétique scripté : propriétaire immobile, qui bouge lentement, absent,
+rejoint par un intrus, puis mouvements brusques. Les étages synthétiques
+consomment du CPU réel (--detect-ms, --encode-ms).
+
+Usages :
+    python scripts/bench_tracker.py
+    python scripts/bench_tracker.py --reverify 1.0 --encode-ms 80
+    python scripts/bench_tracker.py --video clip.mp4 --gallery data/gallery.npz
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fingerlock.config.settings import DEFAULTS
+from fingerlock.face.gallery import Gallery
+from fingerlock.face.pipeline import FacePipeline, VideoFileSource
+from fingerlock.face.tracker import FaceTracker
+
+WIDTH, HEIGHT = 640, 480
+
+
+def _burn(ms: float) -> None:
+    """Consomme `ms` de CPU dans le thread courant."""
+    end = time.thread_time() + ms / 1000
+    while time.thread_time() < end:
+        pass
+
+
+def scripted_boxes(i: int, fps: float):
+    """Visages (x, y, w, h) relatifs de la frame i du scénario synthétique."""
+    t = i / fps
+    rng = np.random.default_rng(i)
+    jitter = rng.uniform(-0.004, 0.004, size=2)
+    owner = [0.2 + jitter[0], 0.3 + jitter[1], 0.2, 0.3]
+    if t < 10:                       # immobile
+        faces = [owner]
+    elif t < 15:                     # mouvement lent
+        owner[0] += (t - 10) * 0.03
+        faces = [owner]
+    elif t < 17:                     # absent
+        faces = []
+    elif t < 30:                     # intrus de 20 à 25 s
+        faces = [owner] + ([[0.65, 0.25, 0.2, 0.3]] if 20 <= t < 25 else [])
+    else:                            # saut toutes les 2 s
+        owner[0] += 0.25 * (int(t / 2) % 2)
+        faces = [owner]
+    return [(x, y, w, h, 0.99) for x, y, w, h in faces]
+
+
+class ScriptedDetector:
+    def __init__(self, fps: float, ms: float):
+        self.fps = fps
+        self.ms = ms
+        self.i = 0
+
+    def detect(self, rgb):
+        _burn(self.ms)
+        boxes = scripted_boxes(self.i, self.fps)
+        self.i += 1
+        return boxes
+
+
+class ScriptedEncoder:
+    """Propriétaire à gauche de l'image, intrus à droite."""
+
+    def __init__(self, ms: float, owner, intruder):
+        self.ms = ms
+        self.owner = owner
+        self.intruder = intruder
+
+    def encode(self, rgb, boxes):
+        out = []
+        for top, right, bottom, left in boxes:
+            _burn(self.ms)
+            out.append(self.owner if (left + right) / 2 < WIDTH * 0.6 else self.intruder)
+        return out
+
+
+def run(video, fps, make_stages, gallery, threshold, tracker):
+    detector, encoder = make_stages()
+    identities = []
+    pipeline = FacePipeline(VideoFileSource(video, fps=fps, realtime=False), detector, encoder,
+                            gallery, threshold, drop=False, tracker=tracker,
+                            on_result=lambda f: identities.append(sorted(str(m[1]) for m in f.matches)))
+    cpu0 = time.process_time()
+    pipeline.start()
+    pipeline.wait()
+    pipeline.stop()
+    cpu = time.process_time() - cpu0
+    if pipeline.error:
+        raise pipeline.error
+    return pipeline.metrics(), cpu, identities
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encodages et CPU par minute, avec / sans suivi")
+    parser.add_argument("--video", help="Enregistrement (vidéo OpenCV ou .npy) : étages réels")
+    parser.add_argument("--gallery", help="Galerie pour --video")
+    parser.add_argument("--fps", type=float, default=15.0, help="Cadence de l'enregistrement")
+    parser.add_argument("--seconds", type=int, default=40, help="Durée du scénario synthétique")
+    parser.add_argument("--detect-ms", type=float, default=3.0, help="CPU de détection synthétique")
+    parser.add_argument("--encode-ms", type=float, default=40.0, help="CPU d'encodage synthétique")
+    parser.add_argument("--reverify", type=float, default=DEFAULTS["reverify_interval"],
+                        help="reverify_interval (s)")
+    parser.add_argument("--move-iou", type=float, default=DEFAULTS["track_move_iou"], help="track_move_iou")
+    args = parser.parse_args()
+    threshold = DEFAULTS["recognition_threshold"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.video:
+            from fingerlock.face.pipeline import DlibEncoder, MediaPipeDetector
+            video = args.video
+            gallery = Gallery.load(args.gallery)
+
+            def make_stages():
+                return MediaPipeDetector(DEFAULTS["mediapipe_confidence"]), DlibEncoder()
+        else:
+            video = os.path.join(tmp, "clip.npy")
+            frames = int(args.seconds * args.fps)
+            clip = np.lib.format.open_memmap(video, mode="w+", dtype=np.uint8, shape=(frames, HEIGHT, WIDTH, 3))
+            clip.flush()
+            rng = np.random.default_rng(0)
+            owner, intruder = rng.normal(scale=0.1, size=(2, 128))
+            gallery = Gallery.from_users({"owner": owner})
+
+            def make_stages():
+                return ScriptedDetector(args.fps, args.detect_ms), ScriptedEncoder(args.encode_ms, owner, intruder)
+
+        base, base_cpu, base_ids = run(video, args.fps, make_stages, gallery, threshold, None)
+        tracker = FaceTracker(reverify_interval=args.reverify, move_iou=args.move_iou)
+        tracked, tracked_cpu, tracked_ids = run(video, args.fps, make_stages, gallery, threshold, tracker)
+
+    minutes = base["captured"] / args.fps / 60
+    agree = sum(a == b for a, b in zip(base_ids, tracked_ids)) / max(1, len(base_ids))
+    print(f"\n  Enregistrement : {base['captured']} frames à {args.fps:g} fps ({minutes * 60:.0f} s)\n")
+    print(f"  {'mode':<14} {'encodages':>10} {'évités':>8} {'enc/min':>9} {'CPU s/min':>10}")
+    for name, m, cpu in (("chaque frame", base, base_cpu), ("suivi", tracked, tracked_cpu)):
+        print(f"  {name:<14} {m['encodings']:>10} {m['encodings_skipped']:>8} "
+              f"{m['encodings'] / minutes:>9.0f} {cpu / minutes:>10.2f}")
+    print(f"\n  Gain : ×{base['encodings'] / max(1, tracked['encodings']):.1f} encodages, "
+          f"×{base_cpu / max(tracked_cpu, 1e-9):.1f} CPU ; identités identiques sur {agree * 100:.1f} % des frames\n")
+
+
+if __name__ == "__main__":
+    main()
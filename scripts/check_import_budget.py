@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+scripts/check_import_budget.py
+------------------------------
+Garde-fou de démarrage à froid de la CLI (`python -X importtime`).
+
+Lance chaque sous-commande légère dans un HOME temporaire et vérifie :
+    - le temps d'import cumulé (somme des temps "self" de -X importtime),
+    - le nombre de modules importés,
+    - l'absence des modules lourds (yaml, evdev, tkinter, numpy).
+
+Temps et nombre de modules sont mesurés au-delà de l'interpréteur nu
+(`python -X importtime -c pass`, soustrait) ; le meilleur de --runs
+lancements est retenu pour lisser le bruit.
+
+Scénarios : status / config / logs sans watcher (instantané de config
+déjà écrit), puis status d'un watcher actif (page de statut factice).
+
+Code de sortie 1 si un budget est dépassé : utilisable en CI.
+
+Usage :
+    python scripts/check_import_budget.py
+    python scripts/check_import_budget.py --runs 5 --scale 1.5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# commande → (temps d'import max en ms, nombre de modules max), hors interpréteur
+BUDGETS = {
+    "status":          (120.0, 140),
+    "config":          (70.0, 80),
+    "logs":            (110.0, 125),
+    "status (démon)":  (80.0, 85),
+}
+
+FORBIDDEN = ("yaml", "evdev", "tkinter", "numpy")
+
+CONFIG = "lock_delay_seconds: 30\npattern_hash: abc\nplatform_lock: auto\n"
+
+
+def measure(args, home, runs, command=None):
+    """Meilleur temps (ms) sur `runs` lancements, nb de modules, modules interdits."""
+    env = dict(os.environ, HOME=str(home), PYTHONPATH=str(ROOT))
+    command = command or ["-m", "fingerlock.cli", *args]
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *command],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        total_us, modules = 0, []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            total_us += int(self_us)
+            modules.append(name.strip())
+        if best is None or total_us < best[0]:
+            best = (total_us, modules)
+    total_us, modules = best
+    forbidden = sorted({m for m in modules if m.split(".")[0] in FORBIDDEN})
+    return total_us / 1000, len(modules), forbidden
+
+
+def fake_daemon(home):
+    """Page de statut d'un watcher actif (ce processus), publiée à l'instant."""
+    sys.path.insert(0, str(ROOT))
+    from fingerlock.core.statuspage import StatusWriter
+
+    now = time.time()
+    page = StatusWriter(home / ".fingerlock" / "status.shm", lock_delay=30.0)
+    page.publish(last_activity=now - 1.0, deadline=now + 29.0)
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[4])
+    parser.add_argument("--runs", type=int, default=3, help="lancements par scénario")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiplie les budgets de temps (machine lente)")
+    opts = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        (home / ".fingerlock").mkdir()
+        (home / ".fingerlock" / "config.yaml").write_text(CONFIG)
+        (home / ".fingerlock" / "fingerlock.log").write_text("")
+        # Premier lancement : écrit l'instantané de config
+        measure(["config"], home, 1)
+        base_ms, base_count, _ = measure(None, home, opts.runs, command=["-c", "pass"])
+
+        print(f"\n  {'scénario':<16} {'import ms':>10} {'budget':>8} {'modules':>8} {'budget':>7}")
+        scenarios = [("status", ["status"]), ("config", ["config"]), ("logs", ["logs", "-n", "5"])]
+        for name, args in scenarios + [("status (démon)", ["status"])]:
+            server = fake_daemon(home) if name == "status (démon)" else None
+            try:
+                ms, count, forbidden = measure(args, home, opts.runs)
+            finally:
+                if server:
+                    server.close()
+            ms, count = ms - base_ms, count - base_count
+            max_ms, max_modules = BUDGETS[name]
+            max_ms *= opts.scale
+            ok = ms <= max_ms and count <= max_modules and not forbidden
+            failed |= not ok
+            flag = "✅" if ok else "❌"
+            print(f"  {name:<16} {ms:>10.1f} {max_ms:>8.1f} {count:>8} {max_modules:>7}  {flag}"
+                  + (f"  interdits : {', '.join(forbidden)}" if forbidden else ""))
+
+    print(f"\n  (interpréteur nu : {base_ms:.1f} ms, {base_count} modules, soustraits)\n")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
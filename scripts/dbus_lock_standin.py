@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+scripts/dbus_lock_standin.py
+----------------------------
+Vérification du backend D-Bus (core/dbus_lock.py) sur un bus privé.
+
+Le script :
+    1. Lance un dbus-daemon privé (aucun impact sur la session réelle)
+    2. Y publie un faux service org.freedesktop.ScreenSaver
+    3. Vérifie que DBusLocker.lock() appelle bien Lock et retourne True
+    4. Vérifie qu'une réponse d'erreur du service donne False
+    5. Vérifie qu'un bus sans service donne False (pas de faux positif)
+
+Usages :
+    python scripts/dbus_lock_standin.py          # Scénarios complets
+    python scripts/dbus_lock_standin.py --serve  # Bus + mock seuls (Ctrl+C pour arrêter)
+
+Prérequis : dbus-daemon dans le PATH, jeepney installé.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jeepney import HeaderFields, MessageType, new_error, new_method_return
+from jeepney.bus_messages import message_bus
+from jeepney.io.blocking import open_dbus_connection
+
+from fingerlock.core.dbus_lock import SCREENSAVER_NAME, DBusLocker
+
+
+# ---------------------------------------------------------------------------
+# Bus privé
+# ---------------------------------------------------------------------------
+def start_private_bus():
+    """Lance un dbus-daemon privé ; retourne (process, adresse)."""
+    proc = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--nopidfile", "--print-address=1"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    address = proc.stdout.readline().strip()
+    if not address:
+        proc.kill()
+        raise RuntimeError("dbus-daemon n'a pas fourni d'adresse")
+    return proc, address
+
+
+# ---------------------------------------------------------------------------
+# Faux service ScreenSaver
+# ---------------------------------------------------------------------------
+class MockScreenSaver(threading.Thread):
+    """Répond à org.freedesktop.ScreenSaver.Lock et compte les appels."""
+
+    def __init__(self, address: str, fail: bool = False):
+        super().__init__(daemon=True)
+        self.conn = open_dbus_connection(bus=address)
+        self.conn.send_and_get_reply(message_bus.RequestName(SCREENSAVER_NAME))
+        self.fail = fail
+        self.calls = 0
+        self.ready = threading.Event()
+
+    def run(self):
+        self.ready.set()
+        while True:
+            try:
+                msg = self.conn.receive()
+            except (OSError, ConnectionError):
+                return
+            hdr = msg.header
+            if hdr.message_type != MessageType.method_call:
+                continue
+            member = hdr.fields.get(HeaderFields.member)
+            if member == "Lock":
+                self.calls += 1
+                if self.fail:
+                    reply = new_error(msg, "org.freedesktop.DBus.Error.AccessDenied")
+                else:
+                    reply = new_method_return(msg)
+            else:
+                reply = new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod")
+            self.conn.send(reply)
+
+
+# ---------------------------------------------------------------------------
+# Scénarios
+# ---------------------------------------------------------------------------
+def check(label: str, condition: bool) -> bool:
+    print(f"  {'✅' if condition else '❌'}  {label}")
+    return condition
+
+
+def run_scenarios() -> int:
+    ok = True
+
+    # Service présent → succès, un seul appel
+    proc, address = start_private_bus()
+    try:
+        mock = MockScreenSaver(address)
+        mock.start()
+        mock.ready.wait()
+        locker = DBusLocker(session_bus=address, system_bus=None)
+        ok &= check("Connexion au bus privé", locker.open())
+        ok &= check("Lock() accepté par le service", locker.lock() is True)
+        ok &= check("Un seul appel Lock reçu", mock.calls == 1)
+        ok &= check("Connexion réutilisée (2e verrouillage)", locker.lock() and mock.calls == 2)
+        locker.close()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    # Service qui refuse → échec signalé
+    proc, address = start_private_bus()
+    try:
+        mock = MockScreenSaver(address, fail=True)
+        mock.start()
+        mock.ready.wait()
+        locker = DBusLocker(session_bus=address, system_bus=None)
+        locker.open()
+        ok &= check("Erreur D-Bus → lock() retourne False", locker.lock() is False)
+        locker.close()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    # Aucun service → échec signalé
+    proc, address = start_private_bus()
+    try:
+        locker = DBusLocker(session_bus=address, system_bus=None)
+        locker.open()
+        ok &= check("Service absent → lock() retourne False", locker.lock() is False)
+        locker.close()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print()
+    return 0 if ok else 1
+
+
+def serve() -> int:
+    proc, address = start_private_bus()
+    mock = MockScreenSaver(address)
+    mock.start()
+    print(f"  Bus privé : {address}")
+    print(f"  export DBUS_SESSION_BUS_ADDRESS='{address}'\n")
+    try:
+        proc.wait()
+    except KeyboardInterrupt:
+        proc.terminate()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bus D-Bus privé pour tester le backend de verrouillage")
+    parser.add_argument("--serve", action="store_true", help="Lancer uniquement le bus et le mock")
+    args = parser.parse_args()
+    sys.exit(serve() if args.serve else run_scenarios())
+
+
+if __name__ == "__main__":
+    main()
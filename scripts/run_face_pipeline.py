@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+scripts/run_face_pipeline.py
+----------------------------
+Rejoue un enregistrement dans le pipeline caméra (face/pipeline.py) et
+affiche les temps par étage, la latence bout en bout et les frames jetées.
+
+Étages réels (MediaPipe + face_recognition) par défaut ; --synthetic les
+remplace par des étages de coût fixe (--detect-ms, --encode-ms) pour
+mesurer l'effet du pipeline sans dépendances. --serial exécute les mêmes
+étages l'un après l'autre dans un seul thread, pour comparaison.
+
+Usages :
+    python scripts/run_face_pipeline.py --video clip.mp4
+    python scripts/run_face_pipeline.py --video clip.npy --no-realtime --no-drop
+    python scripts/run_face_pipeline.py --synthetic --frames 150 --fps 30
+    python scripts/run_face_pipeline.py --synthetic --serial
+
+Sans --video, une pile de frames .npy est générée dans un répertoire temporaire.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fingerlock.config.settings import DEFAULTS
+from fingerlock.face.gallery import Gallery
+from fingerlock.face.pipeline import FacePipeline, VideoFileSource
+
+
+class SyntheticDetector:
+    """Un visage centré, au coût fixe `ms`."""
+
+    def __init__(self, ms: float):
+        self.ms = ms
+
+    def detect(self, rgb):
+        time.sleep(self.ms / 1000)
+        return [(0.35, 0.25, 0.3, 0.4, 0.99)]
+
+
+class SyntheticEncoder:
+    """Embedding constant (l'utilisateur "owner"), au coût fixe `ms`."""
+
+    def __init__(self, ms: float, embedding):
+        self.ms = ms
+        self.embedding = embedding
+
+    def encode(self, rgb, boxes):
+        time.sleep(self.ms / 1000)
+        return [self.embedding for _ in boxes]
+
+
+def make_clip(path: str, frames: int, width: int, height: int) -> None:
+    rng = np.random.default_rng(0)
+    clip = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(frames, height, width, 3))
+    clip[:] = rng.integers(0, 255, size=(1, height, width, 3), dtype=np.uint8)
+    clip.flush()
+
+
+def run_serial(source, detector, encoder, matcher, threshold):
+    source.open()
+    count, start = 0, time.monotonic()
+    latencies = []
+    while True:
+        image = source.read()
+        if image is None:
+            break
+        t0 = time.monotonic()
+        h, w = image.shape[:2]
+        boxes = []
+        for x, y, bw, bh, _ in detector.detect(image):
+            boxes.append((int(y * h), int((x + bw) * w), int((y + bh) * h), int(x * w)))
+        for embedding in encoder.encode(image, boxes) if boxes else []:
+            matcher.match(embedding, threshold)
+        latencies.append((time.monotonic() - t0) * 1000)
+        count += 1
+    source.close()
+    elapsed = time.monotonic() - start
+    return {"frames": count, "fps": round(count / elapsed, 2),
+            "latency_mean_ms": round(float(np.mean(latencies)), 3),
+            "latency_max_ms": round(float(np.max(latencies)), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu d'un enregistrement dans le pipeline caméra")
+    parser.add_argument("--video", help="Vidéo (OpenCV) ou pile .npy (N, H, W, 3) RGB")
+    parser.add_argument("--frames", type=int, default=120, help="Frames de la pile générée")
+    parser.add_argument("--fps", type=float, default=30.0, help="Cadence de rejeu")
+    parser.add_argument("--no-realtime", action="store_true", help="Rejouer aussi vite que possible")
+    parser.add_argument("--no-drop", action="store_true", help="Files bloquantes (aucune frame jetée)")
+    parser.add_argument("--detect-width", type=int, default=None, help="Largeur de l'image de détection")
+    parser.add_argument("--synthetic", action="store_true", help="Étages de coût fixe (sans dépendances)")
+    parser.add_argument("--detect-ms", type=float, default=15.0, help="Coût de détection synthétique")
+    parser.add_argument("--encode-ms", type=float, default=60.0, help="Coût d'encodage synthétique")
+    parser.add_argument("--serial", action="store_true", help="Exécution séquentielle (référence)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON brute")
+    args = parser.parse_args()
+
+    threshold = DEFAULTS["recognition_threshold"]
+    owner = np.random.default_rng(1).normal(scale=0.1, size=128)
+    gallery = Gallery.from_users({"owner": owner})
+
+    if args.synthetic:
+        detector = SyntheticDetector(args.detect_ms)
+        encoder = SyntheticEncoder(args.encode_ms, owner)
+    else:
+        from fingerlock.face.pipeline import DlibEncoder, MediaPipeDetector
+        detector = MediaPipeDetector(DEFAULTS["mediapipe_confidence"])
+        encoder = DlibEncoder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = args.video
+        if video is None:
+            video = os.path.join(tmp, "clip.npy")
+            make_clip(video, args.frames, 640, 480)
+        source = VideoFileSource(video, fps=args.fps, realtime=not args.no_realtime)
+
+        if args.serial:
+            result = {"serial": run_serial(source, detector, encoder, gallery, threshold)}
+        else:
+            recognized = []
+            pipeline = FacePipeline(source, detector, encoder, gallery, threshold,
+                                    on_result=lambda f: recognized.append(f.matches),
+                                    drop=not args.no_drop, detect_width=args.detect_width)
+            pipeline.start()
+            pipeline.wait()
+            pipeline.stop()
+            result = pipeline.metrics()
+            result["results"] = len(recognized)
+            if pipeline.error:
+                result["error"] = repr(pipeline.error)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    if args.serial:
+        s = result["serial"]
+        print(f"\n  Séquentiel : {s['frames']} frames, {s['fps']} fps, "
+              f"latence moy {s['latency_mean_ms']} ms / max {s['latency_max_ms']} ms\n")
+        return
+    print(f"\n  Frames capturées : {result['captured']}, résultats : {result['results']}, "
+          f"jetées : détection {result['dropped']['detect']}, reconnaissance {result['dropped']['recognize']}\n")
+    print(f"  {'étage':<10} {'frames':>7} {'fps':>7} {'moy ms':>8} {'max ms':>8}")
+    for name, s in result["stages"].items():
+        print(f"  {name:<10} {s['frames']:>7} {s['fps']:>7} {s['mean_ms']:>8} {s['max_ms']:>8}")
+    if "error" in result:
+        print(f"\n  ❌ {result['error']}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+scripts/simulate_watch.py
+-------------------------
+Simulation déterministe du watcher à horloge virtuelle.
+
+La vraie boucle de décision (core/watch.py : watch_loop, WatchControl)
+et la vraie présence caméra (face/presence.py : PresenceGate, sans
+thread) tournent sur :
+
+    horloge virtuelle     tics entiers de TICK (100 ms), aucune dérive
+    entrées scriptées     rafales de saisie, lecture (visage sans saisie),
+                          absence, pause / reprise / lock par le socket
+    caméra scriptée       confirme le propriétaire quand le scénario le
+                          montre, `--camera-latency` s après l'ouverture
+    écran de verrouillage rend la main au retour de l'utilisateur
+                          (+ `--unlock` s pour tracer le schéma)
+    session scriptée      control.locker (system_lock) : verrouillée, ou
+                          budget dépassé (`--system-lock-timeout`)
+
+Entre deux tours, sleep() saute directement au prochain événement
+(changement du scénario, commande, échéance, ouverture caméra, fin de
+pause) : des milliers d'heures de scénario en quelques secondes. Chaque
+scénario est généré depuis sa graine : même graine, mêmes
+verrouillages (empreinte affichée).
+
+Invariants vérifiés contre un oracle tiré du seul scénario :
+
+    précoce       verrouillage avant lock_delay depuis la dernière saisie
+                  (déverrouillage et reprise comptent comme saisie)
+    tardif        pas de verrouillage TICK après l'échéance
+                  (dernière présence + lock_delay, fin de pause)
+    pause         verrouillage automatique pendant une pause
+    forcé         `lock` appliqué après le tour où il est reçu
+    visage        verrouillage avec le propriétaire devant la caméra
+                  (hors plafond presence_max_extension)
+    caméra        ouverte pendant la saisie, la pause ou le verrouillage
+    extension     report au-delà de presence_max_extension
+    session       écran sans verrouillage de session juste avant, ou
+                  verrouillage de session sans écran
+
+Usages :
+    python scripts/simulate_watch.py
+    python scripts/simulate_watch.py --scenarios 500 --hours 24 --delay 60 --lead 3
+    python scripts/simulate_watch.py --modes fusion --max-extension 600 --camera-failure 0.05
+
+Code de sortie 1 si un invariant est violé.
+"""
+
+import argparse
+import bisect
+import hashlib
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerlock.core.watch import TICK, WatchControl, watch_loop
+from fingerlock.face.presence import PresenceGate
+
+START = 1_700_000_000.0    # origine de l'horloge virtuelle (s)
+EPS = 1e-6                 # tolérance d'arrondi, en tics
+MODES = ("off", "fusion")
+OWNER_FRAME = SimpleNamespace(matches=[((0, 0, 0, 0), "owner", 0.3)])
+
+
+class VirtualClock:
+    """Heure murale START + tick × TICK ; le simulateur avance `tick`."""
+
+    __slots__ = ("tick",)
+
+    def __init__(self):
+        self.tick = 0
+
+    def __call__(self) -> float:
+        return START + self.tick * TICK
+
+
+def tick_of(t: float) -> int:
+    """Premier tic à l'heure t ou après."""
+    return math.ceil((t - START) / TICK - EPS)
+
+
+class Intervals:
+    """Intervalles fermés [a, b] de tics, triés et disjoints."""
+
+    def __init__(self):
+        self.starts, self.ends = [], []
+
+    def add(self, a: int, b: int) -> None:
+        if self.ends and a <= self.ends[-1] + 1:
+            self.ends[-1] = max(self.ends[-1], b)
+        else:
+            self.starts.append(a)
+            self.ends.append(b)
+
+    def last(self, tick: int):
+        """Dernier tic couvert ≤ tick (None si aucun)."""
+        i = bisect.bisect_right(self.starts, tick) - 1
+        return None if i < 0 else min(tick, self.ends[i])
+
+    def covers(self, tick: int) -> bool:
+        i = bisect.bisect_right(self.starts, tick) - 1
+        return i >= 0 and tick <= self.ends[i]
+
+    def next_change(self, tick: int):
+        """Prochain tic > tick où la couverture change (début ou dernier tic couvert)."""
+        i = bisect.bisect_right(self.starts, tick) - 1
+        if i >= 0 and tick < self.ends[i]:
+            return self.ends[i]
+        return self.starts[i + 1] if i + 1 < len(self.starts) else None
+
+    def next_from(self, tick: int):
+        """Premier tic couvert ≥ tick."""
+        if self.covers(tick):
+            return tick
+        i = bisect.bisect_right(self.starts, tick)
+        return self.starts[i] if i < len(self.starts) else None
+
+    def total(self) -> int:
+        return sum(b - a + 1 for a, b in zip(self.starts, self.ends))
+
+
+class Scenario:
+    """
+    Journée type tirée de la graine : rafales de saisie (silences parfois
+    proches du délai), lecture, absences, pauses, verrouillages manuels.
+    """
+
+    def __init__(self, seed: int, hours: float, delay: float):
+        rng = random.Random(seed)
+        d = int(round(delay / TICK))
+        self.seed = seed
+        self.end = int(hours * 3600 / TICK)
+        self.inputs, self.faces = Intervals(), Intervals()
+        self.commands = []     # (tic, nom, argument)
+        t = 0
+        while t < self.end:
+            kind = rng.choices(("saisie", "lecture", "absence", "pause", "lock"), (45, 25, 22, 4, 4))[0]
+            if kind == "saisie":
+                start, stop = t, t + rng.randint(50, 12_000)
+                while t < stop:
+                    burst = rng.randint(1, 600)
+                    self.inputs.add(t, t + burst)
+                    t += burst + rng.choice((rng.randint(1, 50), rng.randint(1, 2 * d),
+                                             max(1, d + rng.randint(-20, 20))))
+                self.faces.add(start, t)
+            elif kind == "lecture":
+                duration = rng.randint(100, 9_000)
+                self.faces.add(t, t + duration)
+                t += duration
+            elif kind == "absence":
+                t += rng.randint(50, 36_000)
+            elif kind == "pause":
+                minutes = rng.randint(1, 60)
+                self.commands.append((t, "pause", minutes))
+                if rng.random() < 0.3:
+                    self.commands.append((t + rng.randint(1, minutes * 600), "resume", None))
+            else:
+                self.commands.append((t, "lock", None))
+                t += rng.randint(50, 6_000)
+        self.commands.sort(key=lambda c: c[0])
+
+
+class ScriptedMonitor:
+    """Interface d'ActivityMonitor lue par watch_loop, alimentée par la simulation."""
+
+    def __init__(self, sim: "Simulation"):
+        self.sim = sim
+        self.last_activity = sim.clock()
+        self.event_count = 0
+        self.devices = []
+        self.histogram = None
+
+    def update(self) -> None:
+        self.sim.on_tick()
+
+
+class ScriptedCamera:
+    """Pipeline caméra (start, stop, done, error, metrics) du scénario."""
+
+    def __init__(self, sim: "Simulation", on_result):
+        self.sim = sim
+        self.on_result = on_result
+        self.done = threading.Event()
+        self.error = None
+        self.ready_at = 0
+
+    def start(self) -> None:
+        sim = self.sim
+        if sim.camera_failure and sim.rng.random() < sim.camera_failure:
+            sim.camera_failed = True
+            raise RuntimeError("caméra occupée")
+        self.ready_at = sim.clock.tick + sim.latency
+        sim.camera = self
+
+    def stop(self) -> None:
+        self.done.set()
+        self.sim.camera = None
+
+    def metrics(self):
+        return {}
+
+
+class Simulation:
+    """Un scénario joué par la vraie boucle du watcher."""
+
+    def __init__(self, scenario: Scenario, args, mode: str):
+        self.scenario = scenario
+        self.delay = int(round(args.delay / TICK))
+        self.lead = int(round(args.lead / TICK)) if mode == "fusion" else 0
+        self.max_extension = int(round(args.max_extension / TICK))
+        self.latency = int(round(args.camera_latency / TICK))
+        self.unlock = int(round(args.unlock / TICK))
+        self.camera_failure = args.camera_failure
+        self.rng = random.Random(scenario.seed ^ 0x5EED)
+        self.clock = VirtualClock()
+        self.monitor = ScriptedMonitor(self)
+        self.system_lock_timeout = args.system_lock_timeout
+        self.session_rng = random.Random(scenario.seed ^ 0x10CC)
+        config = {"lock_delay_seconds": args.delay, "pattern_hash": None, "system_lock": True}
+        self.control = WatchControl(config, self.monitor, clock=self.clock)
+        self.control.locker = self.system_lock
+        self.gate = None
+        if mode == "fusion":
+            self.gate = PresenceGate(config, lead=args.lead, max_extension=args.max_extension,
+                                     factory=lambda on_result: ScriptedCamera(self, on_result),
+                                     clock=self.clock, threaded=False)
+            self.control.presence = self.gate
+        self.camera = None
+        self.camera_failed = False     # échec d'ouverture depuis la dernière saisie
+        self.next_command = 0
+        self.mark = 0                  # dernier déverrouillage / reprise (tic)
+        self.pause_end = 0
+        self.forced_at = None
+        self.iterations = 0
+        self.locks = self.forced = self.skipped = 0
+        self.session_at = None         # tic du verrouillage de session en attente d'écran
+        self.lateness = []             # (tic de verrouillage − échéance de l'oracle) × TICK
+        self.log = []                  # (tic de verrouillage, forcé, tic de déverrouillage)
+        self.violations = []
+
+    def run(self) -> "Simulation":
+        watch_loop(self.control, self.monitor, self.lockscreen, sleep=self.sleep,
+                   verbose=False, dump_interval=None)
+        if self.gate is not None:
+            self.gate.close()
+        control = self.control
+        if control.system_locks + control.system_lock_timeouts != self.locks or control.system_lock_failures:
+            self.violation("session", f"{control.system_locks} + {control.system_lock_timeouts} délai(s) "
+                                      f"pour {self.locks} verrouillage(s)")
+        return self
+
+    # ── Oracle (scénario seul) ──
+    def last_input(self, tick: int) -> int:
+        last = self.scenario.inputs.last(tick)
+        return self.mark if last is None else max(last, self.mark)
+
+    def camera_ready(self, last_input: int) -> float:
+        """Tic où la caméra peut confirmer : ouverte lead avant l'échéance, hors pause."""
+        return max(last_input + self.delay - self.lead, self.pause_end) + self.latency
+
+    def deadline(self, tick: int) -> float:
+        last_input = self.last_input(tick)
+        seen = last_input
+        if self.gate is not None:
+            faces = self.scenario.faces
+            ready = self.camera_ready(last_input)
+            if tick >= ready:
+                confirmed = faces.last(tick)
+                if confirmed is not None and confirmed >= ready:
+                    if self.max_extension:
+                        confirmed = min(confirmed, last_input + self.max_extension)
+                    seen = max(seen, confirmed)
+        return seen + self.delay
+
+    def violation(self, kind: str, detail: str) -> None:
+        self.violations.append((self.scenario.seed, self.clock.tick * TICK, kind, detail))
+
+    # ── Tour de boucle (monitor.update) ──
+    def on_tick(self) -> None:
+        tick, control = self.clock.tick, self.control
+        commands = self.scenario.commands
+        while self.next_command < len(commands) and commands[self.next_command][0] <= tick:
+            at, name, arg = commands[self.next_command]
+            self.next_command += 1
+            if at < tick:
+                self.skipped += 1      # reçue écran verrouillé
+            elif name == "lock":
+                control.cmd_lock(None)
+                self.forced_at = tick
+            elif name == "pause":
+                control.cmd_pause([str(arg)])
+                self.pause_end = tick + arg * int(round(60 / TICK))
+            else:
+                control.cmd_resume(None)
+                self.mark, self.pause_end = tick, 0
+                self.camera_failed = False
+
+        last = self.scenario.inputs.last(tick)
+        if last is not None:
+            at = START + last * TICK
+            if at > self.monitor.last_activity:
+                self.monitor.last_activity = at
+                self.monitor.event_count += 1
+                self.camera_failed = False
+
+        camera = self.camera
+        if camera is not None and tick >= camera.ready_at and self.scenario.faces.covers(tick):
+            camera.on_result(OWNER_FRAME)
+
+        if tick > max(self.deadline(tick), self.pause_end) + 1 + EPS:
+            self.violation("tardif", f"échéance {self.deadline(tick) * TICK:.1f}s dépassée")
+
+    # ── Verrouillage de session puis écran ──
+    def system_lock(self, platform_override: str, budget: float):
+        """Session verrouillée, ou None (budget dépassé) avec --system-lock-timeout."""
+        if self.session_at is not None:
+            self.violation("session", "verrouillage de session sans écran")
+        self.session_at = self.clock.tick
+        if self.session_rng.random() < self.system_lock_timeout:
+            return None
+        return {"success": True, "command": ["simulation"], "latencies": {}, "elapsed_ms": 0.0}
+
+    def lockscreen(self, pattern_hash) -> bool:
+        tick = self.clock.tick
+        self.locks += 1
+        if self.session_at != tick:
+            self.violation("session", "écran sans verrouillage de session")
+        self.session_at = None
+        forced = self.forced_at is not None
+        if forced:
+            if tick != self.forced_at:
+                self.violation("forcé", f"lock reçu à {self.forced_at * TICK:.1f}s")
+            self.forced_at = None
+            self.forced += 1
+        else:
+            last_input = self.last_input(tick)
+            deadline = self.deadline(tick)
+            if tick - last_input < self.delay - EPS:
+                self.violation("précoce", f"{(tick - last_input) * TICK:.1f}s après la dernière saisie")
+            if self.pause_end > tick:
+                self.violation("pause", f"pause jusqu'à {self.pause_end * TICK:.1f}s")
+            if tick > max(deadline, self.pause_end) + 1 + EPS:
+                self.violation("tardif", f"{(tick - deadline) * TICK:.1f}s après l'échéance")
+            capped = self.max_extension and tick - last_input >= self.delay + self.max_extension - EPS
+            if (self.gate is not None and not self.camera_failed and not capped
+                    and tick >= self.camera_ready(last_input) and self.scenario.faces.covers(tick)):
+                self.violation("visage", "propriétaire devant la caméra")
+            self.lateness.append((tick - max(deadline, self.pause_end)) * TICK)
+        if self.gate is not None and self.gate.camera_on:
+            self.violation("caméra", "ouverte écran verrouillé")
+
+        # Retour de l'utilisateur (saisie ou visage), puis tracé du schéma
+        back = [t for t in (self.scenario.inputs.next_from(tick), self.scenario.faces.next_from(tick))
+                if t is not None]
+        if not back:
+            self.clock.tick = self.scenario.end
+            self.log.append((tick, forced, None))
+            self.control.stop.set()
+            return True
+        self.clock.tick = min(back) + self.unlock
+        self.mark = self.clock.tick
+        self.camera_failed = False
+        self.log.append((tick, forced, self.mark))
+        return True
+
+    # ── Fin de tour : contrôles puis saut au prochain événement ──
+    def sleep(self, seconds: float) -> None:
+        self.iterations += 1
+        control, monitor, gate = self.control, self.monitor, self.gate
+        now = self.clock()
+        if gate is not None and gate.camera_on:
+            if now - monitor.last_activity < (self.delay - self.lead - EPS) * TICK:
+                self.violation("caméra", f"ouverte {now - monitor.last_activity:.1f}s après une saisie")
+            if control.paused(now):
+                self.violation("caméra", "ouverte pendant la pause")
+        if gate is not None and self.max_extension and \
+                control.last_seen - monitor.last_activity > (self.max_extension + EPS) * TICK:
+            self.violation("extension", f"report de {control.last_seen - monitor.last_activity:.1f}s")
+        if control.stop.is_set():
+            return
+        tick = self.clock.tick
+        nxt = self.next_event(tick)
+        self.clock.tick = max(tick + 1, nxt)
+        if self.clock.tick >= self.scenario.end:
+            control.stop.set()
+
+    def next_event(self, tick: int) -> int:
+        control, scenario = self.control, self.scenario
+        due = tick_of(control.last_seen + control.lock_delay)
+        if due <= tick and not control.paused(self.clock()):
+            due = tick + 1             # échéance manquée d'un arrondi : tour suivant
+        candidates = [scenario.end, due, math.floor(max(self.deadline(tick), self.pause_end) + 1 + EPS)]
+        for intervals in (scenario.inputs, scenario.faces):
+            change = intervals.next_change(tick)
+            if change is not None:
+                candidates.append(change)
+        if self.next_command < len(scenario.commands):
+            candidates.append(scenario.commands[self.next_command][0])
+        if control.paused_until:
+            candidates.append(tick_of(control.paused_until))
+        gate = self.gate
+        if gate is not None:
+            if self.camera is not None:
+                candidates.append(self.camera.ready_at)
+            else:
+                candidates.append(tick_of(self.monitor.last_activity + (self.delay - self.lead) * TICK))
+                candidates.append(tick_of(gate._retry_at))
+        return min((c for c in candidates if c > tick), default=tick + 1)
+
+
+def simulate(args, mode: str):
+    sims = []
+    started = time.perf_counter()
+    for seed in range(args.seed, args.seed + args.scenarios):
+        sims.append(Simulation(Scenario(seed, args.hours, args.delay), args, mode).run())
+    wall = time.perf_counter() - started
+
+    digest = hashlib.sha256()
+    for sim in sims:
+        digest.update(repr((sim.scenario.seed, sim.log)).encode())
+    lateness = sorted(x for sim in sims for x in sim.lateness)
+    camera_s = sum(sim.gate.camera_seconds for sim in sims if sim.gate is not None)
+    return {
+        "mode":       mode,
+        "hours":      args.scenarios * args.hours,
+        "wall_s":     wall,
+        "iterations": sum(sim.iterations for sim in sims),
+        "locks":      sum(sim.locks for sim in sims),
+        "forced":     sum(sim.forced for sim in sims),
+        "extensions": sum(sim.gate.extensions for sim in sims if sim.gate is not None),
+        "camera_pct": camera_s / (args.scenarios * args.hours * 3600) * 100,
+        "late_p50":   lateness[len(lateness) // 2] if lateness else 0.0,
+        "late_max":   lateness[-1] if lateness else 0.0,
+        "digest":     digest.hexdigest()[:16],
+        "violations": [v for sim in sims for v in sim.violations],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watcher réel sur horloge virtuelle, invariants de verrouillage")
+    parser.add_argument("--scenarios", type=int, default=200, help="Nombre de scénarios (graines)")
+    parser.add_argument("--hours", type=float, default=24.0, help="Durée de chaque scénario (h)")
+    parser.add_argument("--seed", type=int, default=0, help="Première graine")
+    parser.add_argument("--modes", default=",".join(MODES), help="off (evdev seul), fusion (présence caméra)")
+    parser.add_argument("--delay", type=float, default=60.0, help="lock_delay_seconds")
+    parser.add_argument("--lead", type=float, default=3.0, help="presence_lead_seconds")
+    parser.add_argument("--max-extension", type=float, default=0.0, help="presence_max_extension")
+    parser.add_argument("--camera-latency", type=float, default=1.0, help="Ouverture → première reconnaissance (s)")
+    parser.add_argument("--camera-failure", type=float, default=0.0, help="Probabilité d'échec d'ouverture")
+    parser.add_argument("--system-lock-timeout", type=float, default=0.0,
+                        help="Probabilité que le verrouillage de session dépasse son budget")
+    parser.add_argument("--unlock", type=float, default=3.0, help="Durée du tracé du schéma (s)")
+    parser.add_argument("--show", type=int, default=10, help="Violations affichées")
+    args = parser.parse_args()
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"mode inconnu : {mode} ({' | '.join(MODES)})")
+    if args.camera_latency > args.lead and "fusion" in modes:
+        parser.error("--camera-latency doit rester <= --lead")
+
+    # Journal du watcher sans sortie : seules les décisions comptent ici
+    logger = logging.getLogger("facelock")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    rows = [simulate(args, mode) for mode in modes]
+
+    print(f"\n  {args.scenarios} scénarios × {args.hours:g} h, délai {args.delay:g}s, avance {args.lead:g}s, "
+          f"extension max {args.max_extension:g}s, tic {TICK * 1000:g} ms\n")
+    print(f"  {'mode':<7} {'h simulées':>10} {'durée':>7} {'h/s':>8} {'tours':>9} {'verrous':>8} "
+          f"{'forcés':>7} {'reports':>8} {'caméra':>7} {'retard p50/max':>15} {'violations':>10}  empreinte")
+    for r in rows:
+        print(f"  {r['mode']:<7} {r['hours']:>10.0f} {r['wall_s']:>6.2f}s {r['hours'] / r['wall_s']:>8.0f} "
+              f"{r['iterations']:>9} {r['locks']:>8} {r['forced']:>7} {r['extensions']:>8} "
+              f"{r['camera_pct']:>6.2f}% {r['late_p50']:>7.2f}/{r['late_max']:<6.2f}s "
+              f"{len(r['violations']):>10}  {r['digest']}")
+    failed = False
+    for r in rows:
+        if r["violations"]:
+            failed = True
+            print(f"\n  ❌ {r['mode']} : {len(r['violations'])} violation(s)")
+            for seed, at, kind, detail in r["violations"][:args.show]:
+                print(f"     graine {seed:<6} t={at:>10.1f}s  {kind:<10} {detail}")
+    if not failed:
+        print("\n  ✅ Invariants respectés")
+    print()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
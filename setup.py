@@ -19,6 +19,10 @@ setup(
         "PyYAML>=5.4.0",
         "setuptools>=69.0.0",
     ],
+    extras_require={
+        "dbus": ["jeepney>=0.7"],
+        "face": ["numpy>=1.20.0"],
+    },
     entry_points={
         "console_scripts": [
             "fingerlock=fingerlock.cli:main",